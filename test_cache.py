@@ -0,0 +1,68 @@
+"""Testes do cache de trechos: LRU em memória e em disco, e invalidação por conteúdo."""
+
+import os
+
+from zelda_cache import CacheRotasDisco, CacheTrechos, chave_trecho, impressao_digital
+from zelda_grade import GradeCompacta
+from zelda_pathfinder import TERRAIN_COSTS, a_estrela, a_estrela_em_cache
+
+TRECHO = ([(0, 0), (0, 1)], 10)
+
+
+def test_cache_em_memoria_descarta_o_menos_usado():
+    cache = CacheTrechos(max_entradas=2)
+    cache.guardar("a", TRECHO)
+    cache.guardar("b", TRECHO)
+    assert cache.obter("a") == TRECHO
+    cache.guardar("c", TRECHO)
+    assert cache.obter("b") is None
+    assert cache.obter("a") == TRECHO and cache.obter("c") == TRECHO
+    assert cache.estatisticas() == {
+        "acertos": 3, "acertos_proximo": 0, "faltas": 1, "taxa_acerto": 0.75,
+        "entradas": 2, "max_entradas": 2,
+    }
+
+
+def test_cache_em_disco_persiste_e_descarta_o_menos_usado(tmp_path):
+    diretorio = str(tmp_path / "cache")
+    cache = CacheRotasDisco(diretorio, max_entradas=2)
+    cache.guardar("a", TRECHO)
+    cache.guardar("b", ([], 0))
+    cache.guardar("sem-caminho", (None, float("inf")))
+    assert len(cache) == 2
+    assert not os.path.exists(os.path.join(diretorio, "a.json"))
+
+    reaberto = CacheRotasDisco(diretorio, max_entradas=2)
+    assert len(reaberto) == 2
+    assert reaberto.obter("b") == ([], 0)
+    assert reaberto.obter("sem-caminho") == (None, float("inf"))
+    assert reaberto.obter("a") is None
+    reaberto.limpar()
+    assert len(reaberto) == 0 and not os.listdir(diretorio)
+
+
+def test_faltas_em_memoria_vem_do_disco(tmp_path):
+    disco = CacheRotasDisco(str(tmp_path), max_entradas=10)
+    CacheTrechos(proximo=disco).guardar("a", TRECHO)
+
+    memoria = CacheTrechos(proximo=disco)
+    assert memoria.obter("a") == TRECHO
+    assert memoria.obter("a") == TRECHO
+    estatisticas = memoria.estatisticas()
+    assert (estatisticas["acertos"], estatisticas["acertos_proximo"]) == (1, 1)
+
+
+def test_editar_o_mapa_gera_chaves_novas():
+    matriz = [["G", "A", "G"], ["G", "A", "G"], ["G", "G", "G"]]
+    grade = GradeCompacta.de_matriz(matriz)
+    cache = CacheTrechos()
+    assert a_estrela_em_cache(grade, (0, 0), (0, 2), TERRAIN_COSTS, cache=cache)[1] == 60
+    assert a_estrela_em_cache(matriz, (0, 0), (0, 2), TERRAIN_COSTS, cache=cache)[1] == 60
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+    chave_antiga = chave_trecho(impressao_digital(grade), (0, 0), (0, 2), TERRAIN_COSTS)
+    grade.editar({(0, 1): "G"})
+    assert chave_trecho(impressao_digital(grade), (0, 0), (0, 2), TERRAIN_COSTS) != chave_antiga
+    trecho = a_estrela_em_cache(grade, (0, 0), (0, 2), TERRAIN_COSTS, cache=cache)
+    assert trecho == a_estrela(grade, (0, 0), (0, 2), TERRAIN_COSTS)
+    assert trecho[1] == 20 and cache.faltas == 2
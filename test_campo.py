@@ -0,0 +1,62 @@
+"""Testes do campo de custos vetorizado contra o Dijkstra de `zelda_pathfinder`."""
+
+import random
+
+import pytest
+
+from zelda_grade import GradeCompacta
+from zelda_pathfinder import (
+    CUSTOS_MASMORRA,
+    TERRAIN_COSTS,
+    WALKABLE_MASMORRA,
+    custos_a_partir_de,
+)
+
+np = pytest.importorskip("numpy")
+
+from zelda_campo import CampoCustos  # pylint: disable=wrong-import-position
+
+# "Z" custa 0: platôs de custo zero exigem a descida em largura de `caminho`
+CUSTOS_COM_ZERO = {"G": 10, "S": 20, "Z": 0, "A": 180}
+
+CASOS = [
+    (["G", "S", "F", "M", "A", "X"], TERRAIN_COSTS, None),
+    (["G", "S", "F", "M", "A", "X"], TERRAIN_COSTS, {"G", "S", "F", "M", "A"}),
+    (["G", "Z", "Z", "S", "A", "X"], CUSTOS_COM_ZERO, {"G", "S", "Z", "A"}),
+    (["CC", "CC", "X"], CUSTOS_MASMORRA, WALKABLE_MASMORRA),
+]
+
+
+@pytest.mark.parametrize("metodo", ["auto", "baldes", "varreduras"])
+@pytest.mark.parametrize("simbolos, custos, walkable", CASOS)
+def test_campo_igual_ao_dijkstra(metodo, simbolos, custos, walkable):
+    sorteio = random.Random(21)
+    for rodada in range(30):
+        linhas, colunas = sorteio.randint(1, 15), sorteio.randint(1, 15)
+        matriz = [[sorteio.choice(simbolos) for _ in range(colunas)] for _ in range(linhas)]
+        mapa = GradeCompacta.de_matriz(matriz) if rodada % 2 else matriz
+        origem = (sorteio.randrange(linhas), sorteio.randrange(colunas))
+        campo = CampoCustos(mapa, origem, custos, walkable, metodo=metodo)
+        esperados = custos_a_partir_de(matriz, origem, custos, walkable)
+
+        for i in range(linhas):
+            for j in range(colunas):
+                caminho, custo = campo.caminho((i, j))
+                assert custo == campo.custo((i, j)) == esperados.get((i, j), float("inf"))
+                if caminho is None:
+                    continue
+                assert caminho[0] == origem and caminho[-1] == (i, j)
+                assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+                           for a, b in zip(caminho, caminho[1:]))
+                assert sum(custos.get(matriz[x][y], 9999) for x, y in caminho[1:]) == custo
+        assert int(np.isnan(campo.mapa_calor()).sum()) == linhas * colunas - len(esperados)
+
+
+def test_metodo_automatico():
+    masmorra = [["CC", "CC"], ["X", "CC"]]
+    assert CampoCustos(masmorra, (0, 0), CUSTOS_MASMORRA, WALKABLE_MASMORRA).metodo == "varreduras"
+    assert CampoCustos([["G", "S"]], (0, 0), TERRAIN_COSTS).metodo == "baldes"
+    with pytest.raises(ValueError):
+        CampoCustos([["G"]], (0, 0), TERRAIN_COSTS, metodo="dijkstra")
+    with pytest.raises(ValueError):
+        CampoCustos([["G"]], (1, 0), TERRAIN_COSTS)
@@ -0,0 +1,115 @@
+"""Testes do carregador de mapas grandes: texto, binário mapeado e missão."""
+
+import os
+import random
+import shutil
+
+import pytest
+
+from zelda_cache import impressao_digital
+from zelda_carregador import (
+    caminho_binario,
+    carregar_grade,
+    ler_binario,
+    ler_grade,
+    salvar_binario,
+)
+from zelda_grade import GradeCompacta
+from zelda_pathfinder import carregar_missao, ler_mapa, planejar_missao
+
+DIRETORIO_JOGO = os.path.dirname(os.path.abspath(__file__))
+
+
+def gravar_mapa(caminho, matriz, separador=","):
+    with open(caminho, "w", encoding="utf-8") as f:
+        for linha in matriz:
+            f.write(separador.join(linha) + "\n")
+
+
+def mapa_aleatorio(semente, linhas=9, colunas=13):
+    sorteio = random.Random(semente)
+    matriz = [[sorteio.choice(["G", "G", "S", "F", "M", "A", "X"]) for _ in range(colunas)]
+              for _ in range(linhas)]
+    for marcador in ("L", "LW", "M1", "M12"):
+        matriz[sorteio.randrange(linhas)][sorteio.randrange(colunas)] = marcador
+    return matriz
+
+
+def conferir_igual(grade, mapa):
+    assert [list(linha) for linha in grade] == [list(linha) for linha in mapa]
+    assert grade.indice == mapa.indice
+    assert grade.impressao_digital() == impressao_digital(mapa)
+
+
+def test_ler_grade_igual_a_ler_mapa(tmp_path):
+    for semente, separador in enumerate([",", ", ", " ,\t"]):
+        caminho = str(tmp_path / f"mapa{semente}.txt")
+        gravar_mapa(caminho, mapa_aleatorio(semente), separador)
+        conferir_igual(ler_grade(caminho, 9, 13), ler_mapa(caminho))
+
+
+def test_binario_ida_e_volta(tmp_path):
+    texto = str(tmp_path / "mapa.txt")
+    gravar_mapa(texto, mapa_aleatorio(7))
+    grade = ler_grade(texto)
+    binario = str(tmp_path / "mapa.bin")
+    salvar_binario(grade, binario)
+
+    lida = ler_binario(binario)
+    conferir_igual(lida, ler_mapa(texto))
+    assert lida.simbolos == grade.simbolos
+    # Editar a grade mapeada não altera o arquivo
+    lida.editar({(0, 0): "LW"})
+    conferir_igual(ler_binario(binario), ler_mapa(texto))
+
+
+def test_carregar_grade_refaz_o_binario_quando_o_texto_muda(tmp_path):
+    texto = str(tmp_path / "mapa.txt")
+    matriz = mapa_aleatorio(8)
+    gravar_mapa(texto, matriz)
+    conferir_igual(carregar_grade(texto), ler_mapa(texto))
+    assert os.path.exists(caminho_binario(texto))
+    conferir_igual(carregar_grade(texto, 9, 13), ler_mapa(texto))
+
+    matriz[4][4] = "MS"
+    gravar_mapa(texto, matriz)
+    conferir_igual(carregar_grade(texto), ler_mapa(texto))
+    with pytest.raises(ValueError):
+        carregar_grade(texto, 13, 9)
+
+
+@pytest.mark.parametrize("conteudo, trecho", [
+    ("G,G\nG,G,G\n", "linha 2"),
+    ("G,G\nG,Q\n", "'Q'"),
+])
+def test_texto_invalido(tmp_path, conteudo, trecho):
+    caminho = tmp_path / "mapa.txt"
+    caminho.write_text(conteudo, encoding="utf-8")
+    with pytest.raises(ValueError, match=trecho):
+        ler_grade(str(caminho))
+
+
+def test_binario_invalido(tmp_path):
+    caminho = str(tmp_path / "mapa.bin")
+    salvar_binario(GradeCompacta.de_matriz([["G", "L"]]), caminho)
+    with open(caminho, "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ValueError, match="tamanho"):
+        ler_binario(caminho)
+    with open(caminho, "wb") as f:
+        f.write(b"nada")
+    with pytest.raises(ValueError):
+        ler_binario(caminho)
+
+
+def test_missao_compacta_igual_a_missao_em_listas(tmp_path):
+    for nome in os.listdir(DIRETORIO_JOGO):
+        if nome == "Mapa.txt" or nome.startswith("Masmorra "):
+            shutil.copy(os.path.join(DIRETORIO_JOGO, nome), tmp_path)
+    resultados = []
+    for compacto in (False, True, True):
+        mapa, tabela = carregar_missao(str(tmp_path), compacto=compacto)
+        assert isinstance(mapa, GradeCompacta) == compacto
+        resultados.append(planejar_missao(mapa, tabela))
+    assert len({r["custo_total"] for r in resultados}) == 1
+    assert len({tuple(r["ordem"]) for r in resultados}) == 1
@@ -0,0 +1,70 @@
+"""Testes da `GradeCompacta`: mesma leitura e mesmas buscas que a matriz."""
+
+import random
+
+from zelda_cache import impressao_digital
+from zelda_grade import GradeCompacta
+from zelda_pathfinder import (
+    CUSTOS_MASMORRA,
+    TERRAIN_COSTS,
+    WALKABLE_MASMORRA,
+    Mapa,
+    a_estrela,
+    dijkstra_multiplos_alvos,
+)
+
+
+def matriz_aleatoria(sorteio, simbolos, linhas, colunas):
+    return [[sorteio.choice(simbolos) for _ in range(colunas)] for _ in range(linhas)]
+
+
+def test_grade_le_como_a_matriz():
+    sorteio = random.Random(1)
+    for _ in range(50):
+        matriz = matriz_aleatoria(sorteio, ["G", "S", "A", "X", "M1"],
+                                  sorteio.randint(1, 12), sorteio.randint(1, 12))
+        grade = GradeCompacta.de_matriz(matriz)
+        assert len(grade) == len(matriz)
+        assert [list(linha) for linha in grade] == matriz
+        assert all(grade[i][j] == matriz[i][j] == grade.simbolo(i, j)
+                   for i in range(len(matriz)) for j in range(len(matriz[0])))
+        assert grade.impressao_digital() == impressao_digital(matriz)
+        assert grade.posicoes("M1") == Mapa(matriz).posicoes("M1")
+
+
+def test_a_estrela_na_grade_igual_a_matriz():
+    sorteio = random.Random(2)
+    casos = [(["G", "S", "F", "M", "A", "X"], TERRAIN_COSTS, None),
+             (["CC", "CC", "X"], CUSTOS_MASMORRA, WALKABLE_MASMORRA)]
+    for rodada in range(300):
+        simbolos, custos, walkable = casos[rodada % 2]
+        linhas, colunas = sorteio.randint(1, 14), sorteio.randint(1, 14)
+        matriz = matriz_aleatoria(sorteio, simbolos, linhas, colunas)
+        grade = GradeCompacta.de_matriz(matriz)
+        start = (sorteio.randrange(linhas), sorteio.randrange(colunas))
+        goal = (sorteio.randrange(linhas), sorteio.randrange(colunas))
+
+        _, esperado = dijkstra_multiplos_alvos(matriz, start, [goal], custos, walkable)[goal]
+        for fila in ("heap", "baldes"):
+            caminho, custo = a_estrela(grade, start, goal, custos, walkable, fila=fila)
+            assert custo == esperado
+            assert a_estrela(matriz, start, goal, custos, walkable, fila=fila)[1] == esperado
+            if caminho is not None:
+                assert caminho[0] == start and caminho[-1] == goal
+                assert sum(custos.get(grade[i][j], 9999) for i, j in caminho[1:]) == custo
+
+
+def test_editar_atualiza_indice_motor_e_impressao():
+    matriz = [["L", "X", "G"], ["A", "X", "G"], ["G", "X", "LW"]]
+    grade = GradeCompacta.de_matriz(matriz)
+    antes = grade.impressao_digital()
+    assert a_estrela(grade, (0, 0), (2, 0), TERRAIN_COSTS)[1] == 180 + 10
+
+    grade.editar({(1, 0): "G", (0, 0): "G", (0, 2): "L"})
+    assert grade.posicao("L") == (0, 2)
+    assert grade.impressao_digital() != antes
+    assert grade.impressao_digital() == impressao_digital([list(linha) for linha in grade])
+    # O motor já criado enxerga a célula editada
+    assert a_estrela(grade, (0, 0), (2, 0), TERRAIN_COSTS)[1] == 20
+    # A matriz de origem não muda
+    assert matriz[1][0] == "A"
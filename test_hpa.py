@@ -0,0 +1,81 @@
+"""Testes do HPA*: caminhos válidos, nunca abaixo do ótimo, e abstração em dia."""
+
+import json
+import random
+
+import pytest
+
+from zelda_hpa import AbstracaoHPA
+from zelda_pathfinder import TERRAIN_COSTS, custos_a_partir_de
+
+WALKABLE = {"G", "S", "F", "M", "A"}
+
+
+def mapa_aleatorio(sorteio, linhas, colunas):
+    return [[sorteio.choice(["G", "G", "G", "S", "F", "A", "X"]) for _ in range(colunas)]
+            for _ in range(linhas)]
+
+
+def posicao_aleatoria(sorteio, mapa):
+    return sorteio.randrange(len(mapa)), sorteio.randrange(len(mapa[0]))
+
+
+def conferir_busca(mapa, abstracao, start, goal):
+    caminho, custo = abstracao.buscar(start, goal)
+    otimo = custos_a_partir_de(mapa, start, TERRAIN_COSTS, WALKABLE).get(goal, float("inf"))
+    assert (caminho is None) == (otimo == float("inf"))
+    if caminho is None:
+        return
+    assert custo >= otimo
+    assert caminho[0] == start and caminho[-1] == goal
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(caminho, caminho[1:]))
+    assert all(mapa[i][j] in WALKABLE for i, j in caminho[1:])
+    assert sum(TERRAIN_COSTS[mapa[i][j]] for i, j in caminho[1:]) == custo
+
+
+def test_caminho_valido_e_nao_menor_que_o_otimo():
+    sorteio = random.Random(18)
+    for _ in range(40):
+        mapa = mapa_aleatorio(sorteio, sorteio.randint(1, 25), sorteio.randint(1, 25))
+        abstracao = AbstracaoHPA(mapa, TERRAIN_COSTS, WALKABLE, tamanho_cluster=5)
+        for _ in range(10):
+            conferir_busca(mapa, abstracao, posicao_aleatoria(sorteio, mapa),
+                           posicao_aleatoria(sorteio, mapa))
+
+
+def test_atualizar_igual_a_abstracao_nova():
+    sorteio = random.Random(6)
+    for _ in range(20):
+        mapa = mapa_aleatorio(sorteio, 20, 23)
+        abstracao = AbstracaoHPA(mapa, TERRAIN_COSTS, WALKABLE, tamanho_cluster=6)
+        editadas = [posicao_aleatoria(sorteio, mapa) for _ in range(8)]
+        for i, j in editadas:
+            mapa[i][j] = sorteio.choice(["G", "A", "X"])
+        abstracao.atualizar(editadas)
+
+        nova = AbstracaoHPA(mapa, TERRAIN_COSTS, WALKABLE, tamanho_cluster=6)
+        assert abstracao.inter == nova.inter
+        assert abstracao.intra == nova.intra
+        assert ({borda: set(pares) for borda, pares in abstracao.bordas.items() if pares}
+                == {borda: set(pares) for borda, pares in nova.bordas.items() if pares})
+        for _ in range(5):
+            start, goal = posicao_aleatoria(sorteio, mapa), posicao_aleatoria(sorteio, mapa)
+            assert abstracao.buscar(start, goal) == nova.buscar(start, goal)
+            conferir_busca(mapa, abstracao, start, goal)
+
+
+def test_para_dict_ida_e_volta():
+    sorteio = random.Random(9)
+    mapa = mapa_aleatorio(sorteio, 17, 14)
+    abstracao = AbstracaoHPA(mapa, TERRAIN_COSTS, WALKABLE, tamanho_cluster=4)
+    dados = json.loads(json.dumps(abstracao.para_dict()))
+    lida = AbstracaoHPA.de_dict(mapa, dados)
+    assert lida.inter == abstracao.inter
+    assert lida.intra == abstracao.intra
+    for _ in range(10):
+        start, goal = posicao_aleatoria(sorteio, mapa), posicao_aleatoria(sorteio, mapa)
+        assert lida.buscar(start, goal) == abstracao.buscar(start, goal)
+
+    mapa[0][0] = "X" if mapa[0][0] != "X" else "G"
+    with pytest.raises(ValueError):
+        AbstracaoHPA.de_dict(mapa, dados)
@@ -0,0 +1,94 @@
+"""Testes do LPA*: o reparo depois de edições dá o mesmo que uma busca nova."""
+
+import os
+import random
+
+import pytest
+
+from zelda_incremental import BuscaIncremental, PlanejadorIncremental
+from zelda_pathfinder import (
+    TERRAIN_COSTS,
+    a_estrela,
+    descobrir_masmorras,
+    ler_mapa,
+    planejar_missao,
+)
+
+DIRETORIO_JOGO = os.path.dirname(os.path.abspath(__file__))
+
+# "Z" custa 0: platôs de custo zero são o caso difícil do reparo
+CUSTOS_COM_ZERO = {"G": 10, "S": 20, "Z": 0, "A": 180}
+
+
+def conferir_trecho(mapa, busca, custos, walkable):
+    caminho, custo = busca.calcular()
+    _, esperado = a_estrela(mapa, busca.start, busca.goal, custos, walkable,
+                            heuristica=lambda a, b: 0)
+    assert custo == esperado
+    if caminho is not None:
+        assert caminho[0] == busca.start and caminho[-1] == busca.goal
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(caminho, caminho[1:]))
+        assert sum(custos[mapa[i][j]] for i, j in caminho[1:]) == custo
+
+
+@pytest.mark.parametrize("custos, walkable, simbolos", [
+    (TERRAIN_COSTS, None, ["G", "S", "F", "M", "A"]),
+    (CUSTOS_COM_ZERO, set(CUSTOS_COM_ZERO), ["G", "S", "Z", "Z", "A", "X"]),
+])
+def test_reparo_igual_a_busca_nova(custos, walkable, simbolos):
+    sorteio = random.Random(19)
+    for _ in range(300):
+        linhas, colunas = sorteio.randint(1, 10), sorteio.randint(1, 10)
+        presentes = sorteio.sample(simbolos, sorteio.randint(1, 4))
+        mapa = [[sorteio.choice(presentes) for _ in range(colunas)] for _ in range(linhas)]
+        busca = BuscaIncremental(
+            mapa, (sorteio.randrange(linhas), sorteio.randrange(colunas)),
+            (sorteio.randrange(linhas), sorteio.randrange(colunas)), custos, walkable,
+        )
+        for _ in range(5):
+            conferir_trecho(mapa, busca, custos, walkable)
+            editadas = [(sorteio.randrange(linhas), sorteio.randrange(colunas))
+                        for _ in range(sorteio.randint(1, 3))]
+            for i, j in editadas:
+                mapa[i][j] = sorteio.choice(simbolos)
+            busca.notificar(editadas)
+
+
+def test_edicao_longe_do_trecho_nao_expande():
+    mapa = [["G"] * 8 for _ in range(8)]
+    busca = BuscaIncremental(mapa, (0, 0), (0, 7), TERRAIN_COSTS)
+    trecho = busca.calcular()
+    mapa[7][7] = "M"
+    busca.notificar([(7, 7)])
+    estatisticas = {}
+    assert busca.calcular(estatisticas) == trecho
+    assert estatisticas["expandidos"] == 0
+
+
+def test_planejador_igual_a_planejar_missao():
+    mapa = ler_mapa(os.path.join(DIRETORIO_JOGO, "Mapa.txt"))
+    masmorras = {k: ler_mapa(caminho)
+                 for k, caminho in descobrir_masmorras(DIRETORIO_JOGO).items()}
+    planejador = PlanejadorIncremental(mapa, masmorras)
+    assert planejador.resultado["custo_total"] == planejar_missao(mapa, masmorras)["custo_total"]
+
+    sorteio = random.Random(4)
+    terrenos = [(i, j) for i in range(len(mapa)) for j in range(len(mapa[0]))
+                if mapa[i][j] in TERRAIN_COSTS]
+    for _ in range(10):
+        edicoes = {pos: sorteio.choice(["G", "S", "F", "M", "A"])
+                   for pos in sorteio.sample(terrenos, 20)}
+        mudancas = planejador.editar(edicoes)
+        esperado = planejar_missao(mapa, masmorras)
+        assert mudancas["resultado"] is planejador.resultado
+        assert planejador.resultado["custo_total"] == esperado["custo_total"]
+
+    k = min(masmorras)
+    livres = [(i, j) for i, linha in enumerate(masmorras[k]) for j, cel in enumerate(linha)
+              if cel == "CC"]
+    planejador.editar_masmorra(k, {pos: "X" for pos in livres[::3]})
+    esperado = planejar_missao(mapa, masmorras)
+    if esperado is None:
+        assert planejador.resultado is None
+    else:
+        assert planejador.resultado["custo_total"] == esperado["custo_total"]
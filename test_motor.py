@@ -0,0 +1,48 @@
+"""Testes do `MotorAEstrela`: consultas repetidas e reinício das gerações."""
+
+import random
+
+import zelda_motor
+from zelda_grade import GradeCompacta
+from zelda_pathfinder import TERRAIN_COSTS, custos_a_partir_de
+
+
+def grade_aleatoria(semente, linhas=15, colunas=20):
+    sorteio = random.Random(semente)
+    matriz = [[sorteio.choice("GGSFMAX") for _ in range(colunas)] for _ in range(linhas)]
+    return matriz, GradeCompacta.de_matriz(matriz)
+
+
+def conferir_consultas(matriz, motor, origens, walkable=None):
+    for origem in origens:
+        esperados = custos_a_partir_de(matriz, origem, TERRAIN_COSTS, walkable)
+        for destino in [(i, j) for i in range(len(matriz)) for j in range(len(matriz[0]))]:
+            _, custo = motor.buscar(origem, destino, TERRAIN_COSTS, walkable)
+            assert custo == esperados.get(destino, float("inf"))
+
+
+def test_consultas_seguidas_nao_se_misturam():
+    matriz, grade = grade_aleatoria(3)
+    motor = grade.motor()
+    walkable = {"G", "S", "F", "M", "A"}
+    # Consultas intercaladas, com e sem walkable, reaproveitam os mesmos vetores
+    conferir_consultas(matriz, motor, [(0, 0), (7, 9)], walkable)
+    conferir_consultas(matriz, motor, [(14, 19), (0, 0)])
+    assert grade.motor() is motor
+
+
+def test_estouro_da_geracao_zera_os_vetores(monkeypatch):
+    matriz, grade = grade_aleatoria(4)
+    motor = grade.motor()
+    # Muitas consultas deixam marcas de várias gerações nos vetores
+    conferir_consultas(matriz, motor, [(5, 5), (0, 0), (14, 19)])
+
+    # Próxima consulta passa do limite: as marcas antigas não podem vazar
+    monkeypatch.setattr(zelda_motor, "_GERACAO_MAXIMA", motor.geracao_atual)
+    esperados = custos_a_partir_de(matriz, (0, 0), TERRAIN_COSTS)
+    assert motor.buscar((0, 0), (1, 1), TERRAIN_COSTS)[1] == esperados[(1, 1)]
+    assert motor.geracao_atual == 1
+    assert max(motor.geracao) == max(motor.fechado) == 1
+
+    monkeypatch.undo()
+    conferir_consultas(matriz, motor, [(0, 0), (14, 19)])
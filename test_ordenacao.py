@@ -0,0 +1,40 @@
+"""Testes dos resolvedores da ordem de visita contra a força bruta."""
+
+import random
+
+import pytest
+
+from zelda_ordenacao import resolver_ordem
+
+
+def custos_aleatorios(sorteio, n, inviaveis=0.0):
+    custos = [[0] * (n + 2) for _ in range(n + 2)]
+    for a in range(n + 2):
+        for b in range(a + 1, n + 2):
+            custo = float("inf") if sorteio.random() < inviaveis else sorteio.randint(1, 500)
+            custos[a][b] = custos[b][a] = custo
+    return custos
+
+
+def custo_da_ordem(custos, ordem):
+    nos = [0] + ordem + [len(custos) - 1]
+    return sum(custos[a][b] for a, b in zip(nos, nos[1:]))
+
+
+@pytest.mark.parametrize("modo", ["held-karp", "branch-and-bound", "auto"])
+def test_resolvedores_acham_o_custo_da_forca_bruta(modo):
+    sorteio = random.Random(5)
+    for rodada in range(200):
+        n = rodada % 7
+        custos = custos_aleatorios(sorteio, n, inviaveis=0.3 if rodada % 3 == 0 else 0.0)
+        esperado = resolver_ordem(custos, "forca-bruta")["custo"]
+        resultado = resolver_ordem(custos, modo)
+        assert resultado["custo"] == esperado
+        if esperado != float("inf"):
+            assert sorted(resultado["ordem"]) == list(range(1, n + 1))
+            assert custo_da_ordem(custos, resultado["ordem"]) == esperado
+
+
+def test_modo_desconhecido():
+    with pytest.raises(ValueError):
+        resolver_ordem(custos_aleatorios(random.Random(0), 2), "guloso")
@@ -2,9 +2,35 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 import time
-from itertools import permutations
 
-from zelda_pathfinder import ler_mapa, a_estrela, TERRAIN_COSTS, MASMORRA_COST
+from zelda_cache import cache_padrao
+from zelda_desenho import CamadaBlocos, CamadaMapa
+from zelda_reproducao import Reproducao
+from zelda_pathfinder import (
+    a_estrela,
+    custos_mapa_principal,
+    ler_mapa,
+    planejar_missao,
+    TabelaMasmorras,
+    RE_ENTRADA_MASMORRA,
+    TERRAIN_COSTS,
+    MASMORRA_COST,
+)
+
+# Passos por segundo na velocidade 1x
+PASSOS_POR_SEGUNDO = 25
+VELOCIDADES = {"0.5x": 0.5, "1x": 1, "2x": 2, "5x": 5, "20x": 20, "100x": 100}
+# Intervalo entre quadros da animação (ms)
+INTERVALO_QUADRO = 16
+# Zoom do mapa principal: (pixels por célula, células por pixel)
+NIVEIS_ZOOM = {
+    "15 px": (15, 1), "8 px": (8, 1), "4 px": (4, 1), "2 px": (2, 1), "1 px": (1, 1),
+    "1/2 px": (1, 2), "1/4 px": (1, 4), "1/8 px": (1, 8), "1/16 px": (1, 16),
+}
+# Blocos do mapa criados por vez enquanto a vista rola (o resto fica para
+# as próximas voltas do laço do Tk) e margem pré-carregada em volta da vista
+BLOCOS_POR_VEZ = 4
+MARGEM_VISTA = 256
 
 
 class ZeldaPathFinder:
@@ -62,14 +88,32 @@ class ZeldaPathFinder:
 
         self.cell_size = 15
         self.mapa = None
-        self.masmorra1 = None
-        self.masmorra2 = None
-        self.masmorra3 = None
+        self.cache_rotas = cache_padrao()
+        # Soluções das masmorras; recarregar só resolve de novo as que mudaram
+        self.masmorras = TabelaMasmorras(".", cache=self.cache_rotas)
         self.melhor_percurso_completo = None
+        # Células expandidas pelo A* nos trechos do mapa principal; None até
+        # a opção "Mostrar Explorados" pedir (ver desenhar_explorados)
+        self.explorados = None
+        self.estatisticas_busca = {}
+        self._calculando_explorados = False
         self.animando = False
-
-        # Evento para controlar o estado de pausa/continuação da animação
-        self.pause_event = threading.Event()
+        # Grade de itens de cada mapa já desenhado, pela tag (ver desenhar_mapa)
+        self.camadas = {}
+        self._titulos = {}
+        self._explorados_desenhados = None
+
+        # Animação: relógio do percurso e o que já está desenhado dele
+        self.reproducao = None
+        self._quadro_id = None
+        self._instante_quadro = 0.0
+        self._passo_mostrado = -1
+        self._segmento_mostrado = None
+        self._movendo_barra = False
+        # Ícone do Link (um item só, movido com coords) e área de rolagem atual
+        self._link_item = None
+        self._regiao = None
+        self._vista_agendada = None
         self.setup_ui()
         self.carregar_mapas()
 
@@ -127,41 +171,92 @@ class ZeldaPathFinder:
         )
         self.reset_btn.pack(side=tk.LEFT, padx=(0, 5))
 
+        self.mostrar_explorados = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            control_frame,
+            text="Mostrar Explorados",
+            variable=self.mostrar_explorados,
+            command=self.desenhar_explorados,
+        ).pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Label(control_frame, text="Velocidade:").pack(side=tk.LEFT)
+        self.velocidade_var = tk.StringVar(value="1x")
+        velocidade = ttk.Combobox(
+            control_frame,
+            textvariable=self.velocidade_var,
+            values=list(VELOCIDADES),
+            width=5,
+            state="readonly",
+        )
+        velocidade.bind("<<ComboboxSelected>>", self.mudar_velocidade)
+        velocidade.pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Label(control_frame, text="Zoom:").pack(side=tk.LEFT)
+        self.zoom_var = tk.StringVar(value="15 px")
+        zoom = ttk.Combobox(
+            control_frame,
+            textvariable=self.zoom_var,
+            values=list(NIVEIS_ZOOM),
+            width=7,
+            state="readonly",
+        )
+        zoom.bind("<<ComboboxSelected>>", self.mudar_zoom)
+        zoom.pack(side=tk.LEFT, padx=(0, 5))
+
         self.info_label = ttk.Label(main_frame, text="...", font=("Segoe UI", 10))
         self.info_label.pack(fill=tk.X)
 
         self.custos_label = ttk.Label(main_frame, text="", font=("Segoe UI", 9))
         self.custos_label.pack(fill=tk.X)
 
+        # Barra do percurso: mostra o passo atual e permite saltar para outro
+        self.passo_var = tk.DoubleVar(value=0)
+        self.progresso = ttk.Scale(
+            main_frame,
+            orient=tk.HORIZONTAL,
+            from_=0,
+            to=0,
+            variable=self.passo_var,
+            command=self.buscar_passo,
+        )
+        self.progresso.state(["disabled"])
+        self.progresso.pack(fill=tk.X, pady=(5, 0))
+
         canvas_frame = ttk.Frame(main_frame)
         canvas_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
 
         self.canvas = tk.Canvas(canvas_frame, bg="white")
-        h_scroll = ttk.Scrollbar(
+        self.h_scroll = ttk.Scrollbar(
             canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview
         )
-        v_scroll = ttk.Scrollbar(
+        self.v_scroll = ttk.Scrollbar(
             canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview
         )
-        self.canvas.configure(xscrollcommand=h_scroll.set, yscrollcommand=v_scroll.set)
+        # Toda mudança da vista (barras, centralização no Link, tamanho da
+        # janela) carrega os blocos do mapa que ficaram visíveis
+        self.canvas.configure(xscrollcommand=self._rolou_x, yscrollcommand=self._rolou_y)
+        self.canvas.bind("<Configure>", lambda _evento: self._agendar_vista())
 
-        h_scroll.pack(side=tk.BOTTOM, fill=tk.X)
-        v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.h_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
     # Nova função para resetar o estado da aplicação
     def resetar_aplicacao(self):
         """Reseta a aplicação para o estado inicial após carregar os mapas."""
         # Para qualquer animação em andamento
-        self.animando = False
-        self.pause_event.set() # Libera a thread se estiver pausada para que ela termine
+        self.parar_animacao()
 
         # Limpa dados do caminho calculado
         self.melhor_percurso_completo = None
+        self.reproducao = None
+        self.explorados = None
+        self.estatisticas_busca = {}
 
         # Redesenha o mapa original limpo
         self.desenhar_mapa()
-        self.canvas.delete("link_icon")
+        if self._link_item is not None:
+            self.canvas.itemconfigure(self._link_item, state="hidden")
 
         # Reseta os labels de informação
         self.info_label.config(text="Mapas carregados. Clique em 'Calcular Melhor Caminho'.")
@@ -171,70 +266,218 @@ class ZeldaPathFinder:
         self.animar_btn.config(state=tk.DISABLED)
         self.pausar_btn.config(state=tk.DISABLED)
         self.continuar_btn.config(state=tk.DISABLED)
+        self.progresso.configure(to=0)
+        self.progresso.state(["disabled"])
 
     def carregar_mapas(self):
-        """Carrega os mapas a partir de arquivos de texto."""
+        """Carrega os mapas a partir de arquivos de texto.
+
+        O desenho supõe mapas retangulares: `ler_mapa` rejeita linhas de
+        tamanhos diferentes, e um `Mapa.txt` ausente ou vazio também é erro.
+        """
         try:
-            self.mapa = ler_mapa("Mapa.txt", 42)
-            self.masmorra1 = ler_mapa("Masmorra 1.txt", 28)
-            self.masmorra2 = ler_mapa("Masmorra 2.txt", 28)
-            self.masmorra3 = ler_mapa("Masmorra 3.txt", 28)
+            self.mapa = ler_mapa("Mapa.txt")
+            if not self.mapa or not self.mapa[0]:
+                raise ValueError("Mapa.txt não encontrado ou vazio.")
+            self.masmorras.atualizar()
             self.resetar_aplicacao() # Chama o reset para garantir um estado limpo
         except (FileNotFoundError, ValueError) as e:
             messagebox.showerror("Erro ao Carregar Mapas", str(e))
             self.info_label.config(text="Erro ao carregar mapas.")
 
-    def desenhar_mapa(self, mapa_data=None, offset_x=0, offset_y=0, tags="mapa_principal",
-                      dungeon_id=None):
-        """Desenha um mapa (principal ou masmorra) no canvas."""
-        if mapa_data is None:
-            mapa_data = self.mapa
-            if not mapa_data:
-                return
-            self.canvas.delete("all")
-
-        for i, row in enumerate(mapa_data):
-            for j, cel in enumerate(row):
-                x1 = j * self.cell_size + offset_x
-                y1 = i * self.cell_size + offset_y
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                cor = self.cores.get(cel, "#FFFFFF")
-                rect_tags = (tags, f"{tags}-{i}-{j}")
-                # não atribuir a variável se não for usada (remove unused-variable)
+    def _estilo_celula(self, cel, dungeon_id=None):
+        """(cor, imagem) com que um símbolo é desenhado."""
+        if RE_ENTRADA_MASMORRA.fullmatch(cel):
+            cel = "MA"  # Qualquer entrada M<k> é desenhada como entrada de masmorra
+        cor = self.cores.get(cel, "#FFFFFF")
+
+        img_to_draw = None
+        if cel == "LW" and self.lost_woods_img:
+            img_to_draw = self.lost_woods_img
+        elif cel == "MA" and self.ma_img:
+            img_to_draw = self.ma_img
+        elif cel == "MS" and self.ms_img:
+            img_to_draw = self.ms_img
+        elif cel == "L" and self.link_img:
+            img_to_draw = self.link_img
+        elif cel == "E" and self.entrada_img:
+            img_to_draw = self.entrada_img
+        elif cel == "P" and dungeon_id is not None:
+            img_to_draw = self.pingente_imgs[(dungeon_id - 1) % len(self.pingente_imgs)]
+        return cor, img_to_draw
+
+    def desenhar_mapa(self):
+        """Deixa no canvas só o mapa principal, sem destaques.
+
+        O mapa é desenhado em blocos (ver `CamadaBlocos`), criados só quando
+        aparecem na vista, e a camada só é refeita quando o mapa carregado
+        muda; nas demais chamadas, apenas as células destacadas voltam à cor
+        do terreno e as masmorras são escondidas.
+        """
+        if not self.mapa:
+            return
+        self._passo_mostrado = -1
+        self._segmento_mostrado = None
+        camada = self.camadas.get("mapa_principal")
+        if camada is None or camada.mapa is not self.mapa:
+            # Mapa novo: as masmorras dependem da largura dele para a posição
+            for antiga in self.camadas.values():
+                antiga.remover()
+            self.camadas.clear()
+            self._titulos.clear()
+            self.camadas["mapa_principal"] = CamadaBlocos(
+                self.canvas, self.mapa, *NIVEIS_ZOOM[self.zoom_var.get()],
+                self._estilo_celula, "mapa_principal",
+            )
+            self.canvas.tag_raise("explorados")
+            self._erguer_link()
+        else:
+            camada.limpar_destaques()
+            for tag, outra in self.camadas.items():
+                if tag != "mapa_principal" and outra.visivel:
+                    outra.esconder()
+
+        self.desenhar_explorados()
+        self._atualizar_regiao()
+        self._agendar_vista()
+
+    def mudar_zoom(self, _evento=None):
+        """Desenha o mapa principal no nível de zoom escolhido."""
+        principal = self.camadas.get("mapa_principal")
+        if principal is None:
+            return
+        principal.definir_nivel(*NIVEIS_ZOOM[self.zoom_var.get()])
+        # As masmorras ficam à direita do mapa, que mudou de largura
+        for tag in [tag for tag in self.camadas if tag != "mapa_principal"]:
+            self.camadas.pop(tag).remover()
+        self._titulos.clear()
+        self._explorados_desenhados = None
+
+        passo = self._passo_mostrado
+        self.desenhar_mapa()
+        if self.reproducao and passo >= 0:
+            self._ir_para_passo(passo)
+
+    def _rolou_x(self, *args):
+        self.h_scroll.set(*args)
+        self._agendar_vista()
+
+    def _rolou_y(self, *args):
+        self.v_scroll.set(*args)
+        self._agendar_vista()
+
+    def _agendar_vista(self):
+        if self._vista_agendada is None:
+            self._vista_agendada = self.root.after_idle(self._atualizar_vista)
+
+    def _atualizar_vista(self):
+        """Cria os blocos do mapa principal que estão (ou quase estão) na vista.
+
+        Cria poucos blocos por vez e se agenda de novo enquanto faltarem,
+        para a interface não travar.
+        """
+        self._vista_agendada = None
+        principal = self.camadas.get("mapa_principal")
+        if principal is None:
+            return
+        faltam = principal.ver(
+            self.canvas.canvasx(0) - MARGEM_VISTA,
+            self.canvas.canvasy(0) - MARGEM_VISTA,
+            self.canvas.canvasx(self.canvas.winfo_width()) + MARGEM_VISTA,
+            self.canvas.canvasy(self.canvas.winfo_height()) + MARGEM_VISTA,
+            limite=BLOCOS_POR_VEZ,
+        )
+        if faltam:
+            self._vista_agendada = self.root.after(1, self._atualizar_vista)
+
+    def _atualizar_regiao(self):
+        """Ajusta a área de rolagem às camadas desenhadas, sem varrer os itens."""
+        caixas = [camada.caixa() for camada in self.camadas.values()]
+        if caixas:
+            self._regiao = (
+                min(c[0] for c in caixas),
+                min(c[1] for c in caixas),
+                max(c[2] for c in caixas),
+                max(c[3] for c in caixas),
+            )
+            self.canvas.configure(scrollregion=self._regiao)
+
+    def _erguer_link(self):
+        """Põe o ícone do Link acima dos demais itens."""
+        if self._link_item is not None:
+            self.canvas.tag_raise(self._link_item)
+
+    def _mostrar_masmorra(self, masmorra_info):
+        """Mostra a masmorra do segmento ao lado do mapa principal.
+
+        A grade da masmorra é desenhada na primeira visita e reaproveitada
+        nas seguintes enquanto o mapa dela for o mesmo.
+        """
+        tag = f"dungeon_display_{masmorra_info['id']}"
+        camada = self.camadas.get(tag)
+        if camada is None or camada.mapa is not masmorra_info["mapa"]:
+            if camada is not None:
+                camada.remover()
+            offset_x = self.camadas["mapa_principal"].caixa()[2] + 3 * self.cell_size
+            offset_y = 5 * self.cell_size
+            camada = self.camadas[tag] = CamadaMapa(
+                self.canvas,
+                masmorra_info["mapa"],
+                self.cell_size,
+                lambda cel, k=masmorra_info["id"]: self._estilo_celula(cel, k),
+                tag,
+                (offset_x, offset_y),
+            )
+            self._titulos[tag] = self._desenhar_titulo_masmorra(
+                masmorra_info, offset_x, offset_y, tag
+            )
+            self._atualizar_regiao()
+        else:
+            camada.limpar_destaques()
+            camada.mostrar()
+            # O custo pode ter mudado desde a última visita
+            self.canvas.itemconfigure(
+                self._titulos[tag], text=self._titulo_masmorra(masmorra_info)
+            )
+        self._erguer_link()
+
+    def desenhar_explorados(self):
+        """Mostra ou esconde, sobre o mapa principal, as células expandidas pelo A*.
+
+        As células só são calculadas (numa thread, ver `_regiao_explorada`)
+        quando a opção é marcada pela primeira vez após um cálculo, e os
+        itens são criados uma vez; depois, marcar e desmarcar a opção só
+        muda o estado deles.
+        """
+        if not self.mostrar_explorados.get():
+            self.canvas.itemconfigure("explorados", state="hidden")
+            return
+        if self.explorados is None:
+            self.canvas.delete("explorados")
+            self._explorados_desenhados = None
+            if self.melhor_percurso_completo and not self._calculando_explorados:
+                self._calculando_explorados = True
+                thread = threading.Thread(
+                    target=self._worker_explorados, args=(self.melhor_percurso_completo,)
+                )
+                thread.daemon = True
+                thread.start()
+            return
+        if self._explorados_desenhados is not self.explorados:
+            self.canvas.delete("explorados")
+            principal = self.camadas["mapa_principal"]
+            for pos in self.explorados:
                 self.canvas.create_rectangle(
-                    x1, y1, x2, y2, fill=cor, outline="#E0E0E0", width=1, tags=rect_tags
+                    *principal.retangulo(pos),
+                    fill="#ff4500", stipple="gray25", outline="", tags="explorados",
                 )
-
-                img_to_draw = None
-                if cel == "LW" and self.lost_woods_img:
-                    img_to_draw = self.lost_woods_img
-                elif cel in ["MA", "M1", "M2", "M3"] and self.ma_img:
-                    img_to_draw = self.ma_img
-                elif cel == "MS" and self.ms_img:
-                    img_to_draw = self.ms_img
-                elif cel == "L" and self.link_img:
-                    img_to_draw = self.link_img
-                elif cel == "E" and self.entrada_img:
-                    img_to_draw = self.entrada_img
-                elif cel == "P" and dungeon_id is not None and self.pingente_imgs[dungeon_id-1]:
-                    img_to_draw = self.pingente_imgs[dungeon_id-1]
-
-
-                if img_to_draw:
-                    img_tag = (tags, f"{tags}-img-{i}-{j}")
-                    self.canvas.create_image(
-                        x1 + self.cell_size / 2,
-                        y1 + self.cell_size / 2,
-                        image=img_to_draw,
-                        tags=img_tag,
-                    )
-
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            self._explorados_desenhados = self.explorados
+        self.canvas.itemconfigure("explorados", state="normal")
+        self._erguer_link()
 
     def calcular_caminho(self):
         """Inicia thread para calcular o melhor caminho entre masmorras."""
-        if not all([self.mapa, self.masmorra1, self.masmorra2, self.masmorra3]):
+        if not self.mapa or not self.masmorras or not all(self.masmorras.values()):
             messagebox.showerror("Erro", "Mapas não foram carregados corretamente.")
             return
         self.info_label.config(text="Calculando melhor caminho...")
@@ -246,134 +489,69 @@ class ZeldaPathFinder:
     def _worker_calcular_caminho(self):
         """Worker que calcula em background (thread) o melhor percurso."""
         try:
-            start = next(
-                (i, j)
-                for i, r in enumerate(self.mapa)
-                for j, c in enumerate(r)
-                if c == "L"
+            melhor_percurso_final = planejar_missao(
+                self.mapa, self.masmorras, cache=self.cache_rotas
             )
-            lost_woods = next(
-                (i, j)
-                for i, r in enumerate(self.mapa)
-                for j, c in enumerate(r)
-                if c == "LW"
-            )
-            try:
-                entrada1 = next((i, j) for i,
-                                r in enumerate(self.mapa) for j,
-                                c in enumerate(r) if c == "M1")
-                entrada2 = next((i, j) for i,
-                                r in enumerate(self.mapa) for j,
-                                c in enumerate(r) if c == "M2")
-                entrada3 = next((i, j) for i,
-                                r in enumerate(self.mapa) for j,
-                                c in enumerate(r) if c == "M3")
-                entradas = [entrada1, entrada2, entrada3]
-            except StopIteration as exc:
-                raise ValueError("Erro: Não foi possível encontrar as entradas M1, M2 e M3 "
-                                 "no Mapa.txt.") from exc
-            pingentes = [
-                next(
-                    (i, j)
-                    for i, r in enumerate(m)
-                    for j, c in enumerate(r)
-                    if c == "P"
-                )
-                for m in [self.masmorra1, self.masmorra2, self.masmorra3]
-            ]
-
-            menor_custo = float("inf")
-            melhor_percurso_final = None
-
-            for ordem in permutations([0, 1, 2]):
-                pos = start
-                total_custo_atual = 0
-                percurso_completo_atual = []
-                mapas = [self.masmorra1, self.masmorra2, self.masmorra3]
-                caminho_inviavel = False
-
-                for i_idx in range(3):
-                    masmorra_idx = ordem[i_idx]
-                    caminho_mapa, custo_mapa = a_estrela(
-                        self.mapa, pos, entradas[masmorra_idx], self.terrain_costs
-                    )
-                    if caminho_mapa is None:
-                        caminho_inviavel = True
-                        break
-
-                    total_custo_atual += custo_mapa
-
-                    if i_idx == 0:
-                        percurso_completo_atual.append(
-                            {"type": "main_map", "path": caminho_mapa}
-                        )
-                    else:
-                        percurso_completo_atual.append(
-                            {"type": "main_map", "path": caminho_mapa[1:]}
-                        )
-
-                    masmorra_atual = mapas[masmorra_idx]
-                    entrada_m = next(
-                        (ii, jj)
-                        for ii, rr in enumerate(masmorra_atual)
-                        for jj, cc in enumerate(rr)
-                        if cc == "E"
-                    )
-                    custos_m = {
-                        "CC": self.masmorra_cost,
-                        "P": self.masmorra_cost,
-                        "E": self.masmorra_cost
-                    }
-                    walkable_m = {"CC", "P", "E"}
-
-                    caminho_ida, custo_ida = a_estrela(
-                        masmorra_atual, entrada_m, pingentes[masmorra_idx], custos_m, walkable_m
-                    )
-                    if caminho_ida is None:
-                        caminho_inviavel = True
-                        break
-
-                    caminho_volta = caminho_ida[::-1]
-                    custo_volta = custo_ida
-
-                    total_custo_atual += custo_ida + custo_volta
-                    percurso_completo_atual.append(
-                        {
-                            "type": "dungeon",
-                            "id": masmorra_idx + 1,
-                            "mapa": masmorra_atual,
-                            "custo_total": custo_ida + custo_volta,
-                            "path": caminho_ida + caminho_volta[1:],
-                        }
-                    )
-                    pos = entradas[masmorra_idx]
-
-                if caminho_inviavel:
-                    continue
-
-                caminho_final, custo_final = a_estrela(self.mapa, pos, lost_woods, self.terrain_costs)
-                if caminho_final is None:
-                    continue
-
-                total_custo_atual += custo_final
-                percurso_completo_atual.append({"type": "main_map", "path": caminho_final[1:]})
-
-                if total_custo_atual < menor_custo:
-                    menor_custo = total_custo_atual
-                    melhor_percurso_final = {
-                        "custo_total": menor_custo,
-                        "ordem": [o + 1 for o in ordem],
-                        "segmentos": percurso_completo_atual,
-                    }
-
             if melhor_percurso_final is None:
                 raise ValueError("Nenhum caminho válido encontrado.")
-
-            self.melhor_percurso_completo = melhor_percurso_final
-            self.root.after(0, self.update_ui_apos_calculo)
+            # O estado da interface só muda na thread do Tk
+            self.root.after(0, self._caminho_calculado, melhor_percurso_final)
         except (ValueError, FileNotFoundError) as e:
             self.root.after(0, lambda: messagebox.showerror("Erro de Cálculo", str(e)))
 
+    def _caminho_calculado(self, percurso):
+        """Guarda o percurso calculado pelo worker e atualiza a interface."""
+        self.melhor_percurso_completo = percurso
+        # A região explorada só é refeita se a opção estiver marcada
+        self.explorados = None
+        self.estatisticas_busca = {}
+        self.update_ui_apos_calculo()
+
+    def _worker_explorados(self, percurso):
+        """Worker que calcula em background a região explorada de `percurso`."""
+        explorados = estatisticas = None
+        try:
+            explorados, estatisticas = self._regiao_explorada(percurso)
+        finally:
+            # Mesmo se o cálculo falhar, o pedido é encerrado na thread do Tk
+            self.root.after(0, self._explorados_prontos, percurso, explorados, estatisticas)
+
+    def _explorados_prontos(self, percurso, explorados, estatisticas):
+        """Guarda a região explorada calculada e a desenha, se ainda valer.
+
+        Sem `explorados` (o cálculo falhou), a opção é desmarcada; marcá-la
+        de novo tenta outra vez.
+        """
+        self._calculando_explorados = False
+        if explorados is None:
+            self.mostrar_explorados.set(False)
+            self.info_label.config(text="Não foi possível calcular a região explorada.")
+            return
+        if percurso is self.melhor_percurso_completo:
+            self.explorados, self.estatisticas_busca = explorados, estatisticas
+            self._atualizar_custos_label()
+        # Se o percurso mudou no meio do cálculo, isto calcula o novo
+        self.desenhar_explorados()
+
+    def _regiao_explorada(self, percurso):
+        """Refaz com A* os trechos do mapa principal registrando as células expandidas.
+
+        A matriz de trechos do planejador usa Dijkstra com vários alvos; aqui
+        cada trecho escolhido é buscado de novo, como uma consulta isolada,
+        para mostrar a região que o A* precisa explorar.
+        """
+        custos = custos_mapa_principal(self.masmorras)
+        trechos = [s["path"] for s in percurso["segmentos"] if s["type"] == "main_map"]
+        explorados = set()
+        estatisticas = {}
+        origem = trechos[0][0]
+        for caminho in trechos:
+            destino = caminho[-1]
+            a_estrela(self.mapa, origem, destino, custos,
+                      estatisticas=estatisticas, ao_expandir=explorados.add)
+            origem = destino
+        return explorados, estatisticas
+
     def update_ui_apos_calculo(self):
         """Atualiza UI com o resultado do cálculo do caminho."""
         data = self.melhor_percurso_completo
@@ -382,192 +560,222 @@ class ZeldaPathFinder:
             text=f"Cálculo concluído! Ordem: {ordem_str}. Custo total: {data['custo_total']}"
         )
 
-        dungeons = [s for s in data["segmentos"] if s["type"] == "dungeon"]
-        custos_str = " | ".join([f"Masmorra {d['id']}: {d['custo_total']}" for d in dungeons])
-        self.custos_label.config(text=f"Custos: {custos_str}")
+        self._atualizar_custos_label()
 
         self.desenhar_mapa()
+        self.reproducao = Reproducao(
+            data["segmentos"], PASSOS_POR_SEGUNDO * VELOCIDADES[self.velocidade_var.get()]
+        )
+        self._mover_barra(0)
+        self.progresso.configure(to=max(self.reproducao.total - 1, 0))
+        self.progresso.state(["!disabled"])
         self.animar_btn.config(state=tk.NORMAL)
 
+    def _atualizar_custos_label(self):
+        """Mostra os custos do percurso, o uso do cache e, se já calculada, a busca A*."""
+        data = self.melhor_percurso_completo
+        dungeons = [s for s in data["segmentos"] if s["type"] == "dungeon"]
+        custos_str = " | ".join([f"Masmorra {d['id']}: {d['custo_total']}" for d in dungeons])
+        uso_cache = self.cache_rotas.estatisticas()
+        texto = (
+            f"Custos: {custos_str} | Cache: "
+            f"{uso_cache['acertos'] + uso_cache['acertos_proximo']} acertos, "
+            f"{uso_cache['faltas']} faltas"
+        )
+        if self.estatisticas_busca:
+            texto += (
+                f" | A*: {self.estatisticas_busca.get('expandidos', 0)} expandidos, "
+                f"heap máx. {self.estatisticas_busca.get('heap_maximo', 0)}"
+            )
+        self.custos_label.config(text=texto)
+
     def animar_caminho(self):
-        """Inicia a animação do caminho encontrado."""
-        if not self.melhor_percurso_completo:
+        """Inicia a animação do caminho encontrado.
+
+        A animação roda no laço do Tk: cada quadro é agendado com `after`
+        e desenha só as células entre o passo anterior e o atual.
+        """
+        if not self.reproducao:
             return
         if self.animando:
             return
         self.animando = True
-        self.pause_event.set() # Garante que a animação comece (não pausada)
+        if self.reproducao.terminou:
+            self.reproducao.ir_para(0)
+        self._ir_para_passo(self.reproducao.passo)
 
         self.animar_btn.config(state=tk.DISABLED)
         self.pausar_btn.config(state=tk.NORMAL)
         self.continuar_btn.config(state=tk.DISABLED)
-
-        thread = threading.Thread(target=self._executar_animacao)
-        thread.daemon = True
-        thread.start()
+        self._iniciar_relogio()
 
     def pausar_animacao(self):
         """Pausa a animação."""
-        self.pause_event.clear() # Bloqueia a thread na próxima verificação
+        self._parar_relogio()
         self.info_label.config(text="Animação pausada.")
         self.pausar_btn.config(state=tk.DISABLED)
         self.continuar_btn.config(state=tk.NORMAL)
 
     def continuar_animacao(self):
         """Continua a animação."""
-        self.pause_event.set() # Desbloqueia a thread
         self.info_label.config(text="Continuando animação...")
+        self._segmento_mostrado = None  # O próximo quadro volta a descrever o trecho
         self.pausar_btn.config(state=tk.NORMAL)
         self.continuar_btn.config(state=tk.DISABLED)
+        self._iniciar_relogio()
+
+    def mudar_velocidade(self, _evento=None):
+        """Aplica a velocidade escolhida, mesmo no meio da animação."""
+        if self.reproducao:
+            self.reproducao.velocidade = (
+                PASSOS_POR_SEGUNDO * VELOCIDADES[self.velocidade_var.get()]
+            )
+
+    def buscar_passo(self, valor):
+        """Salta para o passo escolhido na barra do percurso."""
+        if self._movendo_barra or not self.reproducao:
+            return
+        passo = self.reproducao.ir_para(int(float(valor)))
+        if passo != self._passo_mostrado:
+            self._ir_para_passo(passo)
 
-    def _executar_animacao(self):
-        """Executa a animação de cada segmento do percurso."""
+    def _mover_barra(self, passo):
+        self._movendo_barra = True
         try:
-            self.root.after(0, self.desenhar_mapa)
-            time.sleep(0.2)
-
-            for segment in self.melhor_percurso_completo["segmentos"]:
-                if not self.animando:
-                    break
-
-                if segment["type"] == "main_map":
-                    self.info_label.config(text="Percorrendo Hyrule...")
-                    for pos in segment["path"]:
-                        self.pause_event.wait() # ALTERAÇÃO: Ponto de pausa
-                        if not self.animando:
-                            break
-                        self.root.after(0, self._atualizar_posicao_link, pos, "mapa_principal")
-                        time.sleep(0.04)
-
-                elif segment["type"] == "dungeon":
-                    masmorra_info = segment
-                    self.info_label.config(text=f"Entrando na Masmorra {masmorra_info['id']}...")
-                    time.sleep(0.5)
-
-                    offset_x = (42 + 3) * self.cell_size
-                    offset_y = 5 * self.cell_size
-                    tag_masmorra = f"dungeon_display_{masmorra_info['id']}"
-
-                    self.root.after(
-                        0,
-                        self.desenhar_mapa,
-                        masmorra_info["mapa"],
-                        offset_x,
-                        offset_y,
-                        tag_masmorra,
-                        masmorra_info['id']
-                    )
-                    self.root.after(
-                        0,
-                        self._desenhar_titulo_masmorra,
-                        masmorra_info,
-                        offset_x,
-                        offset_y,
-                        tag_masmorra,
-                    )
-                    time.sleep(0.2)
-
-                    for pos in masmorra_info["path"]:
-                        self.pause_event.wait() # ALTERAÇÃO: Ponto de pausa
-                        if not self.animando:
-                            break
-                        self.root.after(
-                            0,
-                            self._atualizar_posicao_link,
-                            pos,
-                            tag_masmorra,
-                            offset_x,
-                            offset_y,
-                        )
-                        time.sleep(0.04)
-
-                    if not self.animando:
-                        break
-                    self.info_label.config(text=f"Saindo da Masmorra {masmorra_info['id']}...")
-                    time.sleep(0.5)
-                    # fix: evita problemas com lambda capturando var do loop
-                    self.root.after(0, lambda tag=tag_masmorra: self.canvas.delete(tag))
-
-            if self.animando:
-                self.root.after(0, lambda: self.info_label.config(text="Animação concluída!"))
-        except InterruptedError:
-            self.root.after(0, lambda: self.info_label.config(text="Animação interrompida."))
-        except tk.TclError as e:
-            self.root.after(0, lambda: messagebox.showerror("Erro de Animação", str(e)))
+            self.passo_var.set(passo)
         finally:
-            self.animando = False
-            # Lógica para resetar o estado dos botões ao final
-            self.root.after(0, lambda: self.animar_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.pausar_btn.config(state=tk.DISABLED))
-            self.root.after(0, lambda: self.continuar_btn.config(state=tk.DISABLED))
+            self._movendo_barra = False
+
+    def _iniciar_relogio(self):
+        self._parar_relogio()
+        self._instante_quadro = time.perf_counter()
+        self._quadro_id = self.root.after(INTERVALO_QUADRO, self._quadro)
+
+    def _parar_relogio(self):
+        if self._quadro_id is not None:
+            self.root.after_cancel(self._quadro_id)
+            self._quadro_id = None
+
+    def _quadro(self):
+        """Um quadro da animação: avança o relógio e desenha o passo atual."""
+        agora = time.perf_counter()
+        passo = self.reproducao.avancar(agora - self._instante_quadro)
+        self._instante_quadro = agora
+        if passo != self._passo_mostrado:
+            self._ir_para_passo(passo)
+            self._mover_barra(passo)
+
+        if self.reproducao.terminou:
+            self._quadro_id = None
+            self.info_label.config(text="Animação concluída!")
+            self._encerrar_animacao()
+        else:
+            self._quadro_id = self.root.after(INTERVALO_QUADRO, self._quadro)
+
+    def _ir_para_passo(self, alvo):
+        """Leva o desenho do passo mostrado até o passo `alvo`.
+
+        Para a frente, só as células do intervalo são destacadas; masmorras
+        que ficam para trás no intervalo nem chegam a ser mostradas. Para
+        trás, o desenho recomeça do mapa limpo.
+        """
+        reproducao = self.reproducao
+        if alvo < self._passo_mostrado:
+            self.desenhar_mapa()
+        principal = self.camadas["mapa_principal"]
+
+        k = self._passo_mostrado + 1
+        while k <= alvo:
+            indice = reproducao.segmento(k)
+            inicio, fim = reproducao.limites(indice)
+            segmento = reproducao.segmentos[indice]
+            trecho = segmento["path"][k - inicio:min(fim, alvo + 1) - inicio]
+            if segmento["type"] == "main_map":
+                principal.destacar(trecho, "yellow")
+            elif alvo < fim:
+                # Link está nesta masmorra
+                if k == inicio:
+                    self._mostrar_masmorra(segmento)
+                self.camadas[f"dungeon_display_{segmento['id']}"].destacar(trecho, "yellow")
+            elif k > inicio:
+                # Link saiu da masmorra que estava sendo mostrada
+                self.camadas[f"dungeon_display_{segmento['id']}"].esconder()
+            k = fim
+        self._passo_mostrado = alvo
+
+        indice, pos = reproducao.posicao(alvo)
+        segmento = reproducao.segmentos[indice]
+        if segmento["type"] == "main_map":
+            self._atualizar_posicao_link(pos, "mapa_principal")
+            texto = "Percorrendo Hyrule..."
+        else:
+            self._atualizar_posicao_link(pos, f"dungeon_display_{segmento['id']}")
+            texto = f"Percorrendo a Masmorra {segmento['id']}..."
+        if indice != self._segmento_mostrado:
+            self._segmento_mostrado = indice
+            self.info_label.config(text=texto)
+
+    def _encerrar_animacao(self):
+        self.animando = False
+        self.animar_btn.config(state=tk.NORMAL)
+        self.pausar_btn.config(state=tk.DISABLED)
+        self.continuar_btn.config(state=tk.DISABLED)
+
+    def _titulo_masmorra(self, masmorra_info):
+        """Texto do título de uma masmorra."""
+        return f"Masmorra {masmorra_info['id']} (Custo: {masmorra_info['custo_total']})"
 
     def _desenhar_titulo_masmorra(self, masmorra_info, offset_x, offset_y, tags):
-        """Desenha o título da masmorra próximo à visualização desenhada."""
-        msg = (
-            f"Masmorra {masmorra_info['id']} "
-            f"(Custo: {masmorra_info['custo_total']})"
-        )
-        self.canvas.create_text(
-            offset_x + 14 * self.cell_size,
+        """Desenha o título da masmorra acima dela e retorna o item."""
+        return self.canvas.create_text(
+            offset_x + len(masmorra_info["mapa"][0]) * self.cell_size / 2,
             offset_y - 15,
-            text=msg,
+            text=self._titulo_masmorra(masmorra_info),
             font=("Segoe UI", 10, "bold"),
             fill="black",
             anchor=tk.CENTER,
             tags=tags,
         )
 
-    def _atualizar_posicao_link(self, pos, tag, offset_x=0, offset_y=0):
-        """Atualiza a posição visual do Link e destaca a célula atual."""
-        self.canvas.delete("link_icon")
-        i, j = pos
-        x = j * self.cell_size + self.cell_size / 2 + offset_x
-        y = i * self.cell_size + self.cell_size / 2 + offset_y
-
-        # Encontra todos os itens com a tag da célula
-        itens = self.canvas.find_withtag(f"{tag}-{i}-{j}")
-        for item in itens:
-            t = self.canvas.type(item)
-            # Só configure 'fill' em tipos que aceitam essa opção
-            if t in ("rectangle", "oval", "polygon", "arc", "text"):
-                try:
-                    self.canvas.itemconfigure(item, fill="yellow")
-                except tk.TclError:
-                    # Caso algum tipo específico ainda não aceite, ignore sem quebrar
-                    pass
-
-        # Desenha o ícone do Link por cima
-        self.canvas.create_oval(
-            x - 5,
-            y - 5,
-            x + 5,
-            y + 5,
-            fill="#228B22",
-            outline="darkgreen",
-            width=1.5,
-            tags="link_icon",
-        )
+    def _atualizar_posicao_link(self, pos, tag):
+        """Move o ícone do Link para a célula `pos` da camada `tag`.
+
+        O ícone é um único item, criado na primeira chamada e depois só
+        movido; a centralização usa a área de rolagem guardada. O custo não
+        depende do tamanho do mapa.
+        """
+        x, y = self.camadas[tag].centro(pos)
+        caixa = (x - 5, y - 5, x + 5, y + 5)
+        if self._link_item is None:
+            self._link_item = self.canvas.create_oval(
+                *caixa,
+                fill="#228B22",
+                outline="darkgreen",
+                width=1.5,
+                tags="link_icon",
+            )
+        else:
+            self.canvas.coords(self._link_item, *caixa)
+            self.canvas.itemconfigure(self._link_item, state="normal")
 
-        if self.animando:
+        if self.animando and self._regiao:
             # Tenta centralizar a visão no Link
+            x1, y1, x2, y2 = self._regiao
             try:
-                bbox = self.canvas.bbox("all")
-                if bbox:
-                    total_width = bbox[2] - bbox[0]
-                    total_height = bbox[3] - bbox[1]
-                    if total_width > 0 and total_height > 0:
-                        self.canvas.xview_moveto(
-                            max(0, (x - self.canvas.winfo_width() / 2) / total_width)
-                        )
-                        self.canvas.yview_moveto(
-                            max(0, (y - self.canvas.winfo_height() / 2) / total_height)
-                        )
-            except (tk.TclError, ZeroDivisionError):
+                if x2 > x1 and y2 > y1:
+                    self.canvas.xview_moveto(
+                        max(0, (x - x1 - self.canvas.winfo_width() / 2) / (x2 - x1))
+                    )
+                    self.canvas.yview_moveto(
+                        max(0, (y - y1 - self.canvas.winfo_height() / 2) / (y2 - y1))
+                    )
+            except tk.TclError:
                 # Ignora erros que podem ocorrer durante o setup inicial do canvas
                 pass
 
     def parar_animacao(self):
-        """Sinaliza para a animação parar (o loop verifica esse flag)."""
+        """Para a animação, mantendo o desenho do passo atual."""
+        self._parar_relogio()
         self.animando = False
 
 
@@ -0,0 +1,382 @@
+"""
+Benchmarks do projeto Zelda.
+
+Mede `ler_mapa`, `ler_grade`, `ler_binario`, `a_estrela` (sobre a matriz
+e sobre a `GradeCompacta`), `a_estrela_bidirecional`, `a_estrela_jps`, as
+consultas à `AbstracaoHPA`, o `CampoCustos` (com NumPy), os resolvedores
+de ordem e o planejamento completo da missão, com os mapas do jogo e com
+mapas sintéticos de vários tamanhos:
+
+- terreno aleatório (todos os terrenos do mapa principal);
+- labirintos de `X`/`CC`, como os das masmorras;
+- campos de água, em que a heurística só acerta por usar o menor custo
+  entre os símbolos do mapa (180), e não o da tabela (10).
+
+Para cada caso são registrados o menor tempo entre as repetições, os nós
+expandidos e empilhados e o pico de memória (tracemalloc, numa execução à
+parte para não distorcer o tempo). Os resultados podem ser salvos como
+linha de base em JSON e comparados com uma linha de base anterior:
+
+    python zelda_benchmark.py --salvar base.json
+    python zelda_benchmark.py --comparar base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from zelda_bidirecional import a_estrela_bidirecional
+from zelda_campo import NUMPY_DISPONIVEL, CampoCustos
+from zelda_carregador import caminho_binario, ler_binario, ler_grade, salvar_binario
+from zelda_grade import GradeCompacta
+from zelda_hpa import AbstracaoHPA
+from zelda_jps import a_estrela_jps, custo_uniforme
+from zelda_ordenacao import resolver_ordem
+from zelda_pathfinder import (
+    CUSTOS_MASMORRA,
+    TERRAIN_COSTS,
+    WALKABLE_MASMORRA,
+    a_estrela,
+    carregar_missao,
+    ler_mapa,
+    planejar_missao,
+)
+
+TAMANHOS_PADRAO = (42, 100, 250)
+TAMANHOS_COMPLETOS = (42, 250, 500, 1000, 2000)
+
+# Contadores determinísticos: qualquer aumento é uma regressão
+CONTADORES = ("expandidos", "empilhados", "obsoletos", "heap_maximo", "estados")
+
+# Casos gerados por `_casos_busca` e `_casos_leitura` para cada prefixo
+CASOS_BUSCA = ("a_estrela", "a_estrela-grade", "a_estrela-baldes", "a_estrela-bidirecional",
+               "jps", "campo")
+CASOS_LEITURA = ("ler_mapa", "ler_grade", "ler_binario")
+
+# Proporção de cada terreno nos mapas aleatórios
+PESOS_TERRENO = {"G": 50, "S": 20, "F": 15, "M": 10, "A": 5}
+
+
+def mapa_aleatorio(tamanho, semente=42):
+    """Mapa tamanho x tamanho com terrenos sorteados segundo PESOS_TERRENO."""
+    sorteio = random.Random(semente)
+    simbolos = list(PESOS_TERRENO)
+    pesos = list(PESOS_TERRENO.values())
+    return [sorteio.choices(simbolos, pesos, k=tamanho) for _ in range(tamanho)]
+
+
+def labirinto(tamanho, semente=42):
+    """Labirinto perfeito de `CC` entre paredes `X` (busca em profundidade).
+
+    As células de corredor ficam nas coordenadas ímpares; há um único
+    caminho entre quaisquer duas delas.
+    """
+    sorteio = random.Random(semente)
+    mapa = [["X"] * tamanho for _ in range(tamanho)]
+    limite = tamanho - 1
+    mapa[1][1] = "CC"
+    pilha = [(1, 1)]
+    while pilha:
+        x, y = pilha[-1]
+        livres = [
+            (x + dx, y + dy)
+            for dx, dy in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < x + dx < limite and 0 < y + dy < limite and mapa[x + dx][y + dy] == "X"
+        ]
+        if not livres:
+            pilha.pop()
+            continue
+        nx, ny = sorteio.choice(livres)
+        mapa[(x + nx) // 2][(y + ny) // 2] = "CC"
+        mapa[nx][ny] = "CC"
+        pilha.append((nx, ny))
+    return mapa
+
+
+def campo_agua(tamanho):
+    """Mapa só de água: com o fator da tabela, a Manhattan subestimaria cada passo 18 vezes."""
+    return [["A"] * tamanho for _ in range(tamanho)]
+
+
+def _ultima_impar(tamanho):
+    """Maior coordenada ímpar que é corredor num `labirinto(tamanho)`."""
+    return tamanho - 2 if tamanho % 2 else tamanho - 3
+
+
+def _medir(funcao, repeticoes):
+    """Executa `funcao(estatisticas)` e mede tempo, contadores e memória."""
+    estatisticas = {}
+    tempos = []
+    for _ in range(repeticoes):
+        estatisticas = {}
+        inicio = time.perf_counter()
+        funcao(estatisticas)
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao({})
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # O "tempo" das estatísticas da busca é substituído pelo medido aqui
+    return {
+        **estatisticas,
+        "tempo": min(tempos),
+        "tempo_medio": sum(tempos) / len(tempos),
+        "memoria_pico": pico,
+    }
+
+
+def _casos_busca(prefixo, mapa, start, goal, terrain_costs, walkable=None):
+    """Casos de `a_estrela` (matriz, grade com heap e com baldes), bidirecional, JPS e campo."""
+    grade = GradeCompacta.de_matriz(mapa)
+    grade.motor()
+
+    def na_matriz(estatisticas):
+        a_estrela(mapa, start, goal, terrain_costs, walkable, estatisticas=estatisticas)
+
+    def na_grade(estatisticas):
+        a_estrela(grade, start, goal, terrain_costs, walkable, estatisticas=estatisticas)
+
+    def bidirecional(estatisticas):
+        a_estrela_bidirecional(mapa, start, goal, terrain_costs, walkable,
+                               estatisticas=estatisticas)
+
+    def com_baldes(estatisticas):
+        a_estrela(grade, start, goal, terrain_costs, walkable, estatisticas=estatisticas,
+                  fila="baldes")
+
+    yield f"{prefixo}/a_estrela", na_matriz
+    yield f"{prefixo}/a_estrela-grade", na_grade
+    yield f"{prefixo}/a_estrela-baldes", com_baldes
+    yield f"{prefixo}/a_estrela-bidirecional", bidirecional
+
+    if custo_uniforme(terrain_costs, walkable) is not None:
+        def jps(estatisticas):
+            a_estrela_jps(grade, start, goal, terrain_costs, walkable,
+                          estatisticas=estatisticas)
+
+        yield f"{prefixo}/jps", jps
+
+    if NUMPY_DISPONIVEL:
+        def campo(estatisticas):
+            CampoCustos(grade, start, terrain_costs, walkable)
+
+        yield f"{prefixo}/campo", campo
+
+
+def _casos_leitura(prefixo, mapa, diretorio):
+    """Casos de `ler_mapa`, `ler_grade` e `ler_binario` para `mapa` gravado em disco."""
+    caminho = os.path.join(diretorio, f"{prefixo.replace('/', '-')}.txt")
+    with open(caminho, "w", encoding="utf-8") as f:
+        for linha in mapa:
+            f.write(",".join(linha) + "\n")
+
+    binario = caminho_binario(caminho)
+    salvar_binario(ler_grade(caminho), binario)
+
+    def ler(estatisticas):
+        ler_mapa(caminho)
+
+    def ler_texto(estatisticas):
+        ler_grade(caminho)
+
+    def mapear(estatisticas):
+        ler_binario(binario)
+
+    yield f"{prefixo}/ler_mapa", ler
+    yield f"{prefixo}/ler_grade", ler_texto
+    yield f"{prefixo}/ler_binario", mapear
+
+
+def _matriz_ordenacao(n, semente=42):
+    """Matriz de custos entre n+2 pontos aleatórios (distância de Manhattan)."""
+    sorteio = random.Random(semente)
+    pontos = [(sorteio.randrange(200), sorteio.randrange(200)) for _ in range(n + 2)]
+    return [[10 * (abs(a[0] - b[0]) + abs(a[1] - b[1])) for b in pontos] for a in pontos]
+
+
+def _caso_ordenacao(modo, n):
+    custos = _matriz_ordenacao(n)
+
+    def ordenar(estatisticas):
+        estatisticas["estados"] = resolver_ordem(custos, modo)["estados"]
+
+    return f"ordenacao-{n}/{modo}", ordenar
+
+
+def _selecionado(filtro, prefixo, casos):
+    """True se algum caso `prefixo/caso` passa pelo `filtro` (sem filtro, todos)."""
+    return filtro is None or any(filtro in f"{prefixo}/{caso}" for caso in casos)
+
+
+def montar_casos(tamanhos, diretorio_temporario, diretorio_jogo=".", filtro=None):
+    """Gera os pares (nome, funcao) de cada caso, um tamanho de cada vez.
+
+    Os mapas de um tamanho só são criados quando o gerador chega nele, então
+    os mapas grandes não ficam todos na memória ao mesmo tempo. Com
+    `filtro`, os grupos sem nenhum caso cujo nome contém o texto são
+    pulados antes de montar os mapas e estruturas deles.
+    """
+    casos_jogo = [*CASOS_LEITURA, *CASOS_BUSCA, "hpa", "planejar_missao"]
+    if _selecionado(filtro, "jogo", casos_jogo) or _selecionado(filtro, "jogo-masmorra",
+                                                                CASOS_BUSCA):
+        yield from _casos_jogo(diretorio_temporario, diretorio_jogo, filtro)
+
+    for n, modos in ((8, ("forca-bruta", "held-karp", "branch-and-bound")),
+                     (14, ("held-karp", "branch-and-bound"))):
+        for modo in modos:
+            if _selecionado(filtro, f"ordenacao-{n}", (modo,)):
+                yield _caso_ordenacao(modo, n)
+
+    for tamanho in tamanhos:
+        canto = (tamanho - 1, tamanho - 1)
+
+        prefixo = f"aleatorio-{tamanho}"
+        if _selecionado(filtro, prefixo, CASOS_LEITURA + CASOS_BUSCA):
+            terreno = mapa_aleatorio(tamanho)
+            if _selecionado(filtro, prefixo, CASOS_LEITURA):
+                yield from _casos_leitura(prefixo, terreno, diretorio_temporario)
+            if _selecionado(filtro, prefixo, CASOS_BUSCA):
+                yield from _casos_busca(prefixo, terreno, (0, 0), canto, TERRAIN_COSTS)
+            del terreno
+
+        if _selecionado(filtro, f"labirinto-{tamanho}", CASOS_BUSCA):
+            ultima = _ultima_impar(tamanho)
+            yield from _casos_busca(
+                f"labirinto-{tamanho}", labirinto(tamanho), (1, 1), (ultima, ultima),
+                CUSTOS_MASMORRA, WALKABLE_MASMORRA,
+            )
+        if _selecionado(filtro, f"agua-{tamanho}", CASOS_BUSCA):
+            yield from _casos_busca(f"agua-{tamanho}", campo_agua(tamanho), (0, 0), canto,
+                                    TERRAIN_COSTS)
+
+
+def _casos_jogo(diretorio_temporario, diretorio_jogo, filtro):
+    """Casos com os mapas do jogo, montando só os grupos que passam pelo `filtro`."""
+    mapa, masmorras = carregar_missao(diretorio_jogo)
+    if not (mapa and masmorras):
+        return
+    if _selecionado(filtro, "jogo", CASOS_LEITURA):
+        yield from _casos_leitura("jogo", mapa, diretorio_temporario)
+    if _selecionado(filtro, "jogo", CASOS_BUSCA):
+        yield from _casos_busca(
+            "jogo", mapa, mapa.posicao("L"), mapa.posicao("LW"), TERRAIN_COSTS
+        )
+    if _selecionado(filtro, "jogo", ("hpa",)):
+        # Só a consulta é medida: a abstração é calculada uma vez, aqui
+        abstracao = AbstracaoHPA(mapa, TERRAIN_COSTS, tamanho_cluster=10)
+
+        def hpa(estatisticas):
+            abstracao.buscar(mapa.posicao("L"), mapa.posicao("LW"), estatisticas)
+
+        yield "jogo/hpa", hpa
+    if _selecionado(filtro, "jogo-masmorra", CASOS_BUSCA):
+        masmorra = masmorras[min(masmorras)]
+        yield from _casos_busca(
+            "jogo-masmorra", masmorra, masmorra.posicao("E"), masmorra.posicao("P"),
+            CUSTOS_MASMORRA, WALKABLE_MASMORRA,
+        )
+    if _selecionado(filtro, "jogo", ("planejar_missao",)):
+        # Mapas crus: a missão é resolvida inteira a cada execução
+        brutas = {k: masmorras[k] for k in masmorras}
+
+        def planejar(estatisticas):
+            resultado = planejar_missao(mapa, brutas)
+            estatisticas["estados"] = resultado["ordenacao"]["estados"]
+
+        yield "jogo/planejar_missao", planejar
+
+
+def executar(casos, repeticoes=3, filtro=None, saida=sys.stdout):
+    """Mede cada caso e retorna {nome: medida}, mostrando o progresso em `saida`."""
+    resultados = {}
+    for nome, funcao in casos:
+        if filtro and filtro not in nome:
+            continue
+        medida = _medir(funcao, repeticoes)
+        resultados[nome] = medida
+        contadores = "".join(
+            f"  {chave}={medida[chave]}"
+            for chave in CONTADORES
+            if chave in medida
+        )
+        print(f"{nome:<36} {medida['tempo'] * 1000:10.2f} ms "
+              f"{medida['memoria_pico'] / 2 ** 20:8.2f} MiB{contadores}", file=saida)
+    return resultados
+
+
+def comparar(atual, base, tolerancia=0.10):
+    """Lista as regressões de `atual` em relação à linha de base `base`.
+
+    Tempo e memória são regressões quando passam de (1 + tolerancia) vezes
+    a base; os contadores de nós são determinísticos e não podem aumentar.
+    """
+    regressoes = []
+    for nome, medida in atual.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+        for chave in ("tempo", "memoria_pico"):
+            if anterior.get(chave) and medida[chave] > anterior[chave] * (1 + tolerancia):
+                regressoes.append(
+                    f"{nome}: {chave} {anterior[chave]:.6g} -> {medida[chave]:.6g} "
+                    f"(+{(medida[chave] / anterior[chave] - 1) * 100:.0f}%)"
+                )
+        for chave in CONTADORES:
+            if chave in anterior and medida.get(chave, 0) > anterior[chave]:
+                regressoes.append(f"{nome}: {chave} {anterior[chave]} -> {medida[chave]}")
+    return regressoes
+
+
+def main(argv=None):
+    """Executa os benchmarks e salva ou compara a linha de base."""
+    parser = argparse.ArgumentParser(description="Benchmarks da busca e do planejamento.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=None,
+                        help=f"lados dos mapas sintéticos (padrão: {TAMANHOS_PADRAO})")
+    parser.add_argument("--completo", action="store_true",
+                        help=f"usa os tamanhos {TAMANHOS_COMPLETOS}")
+    parser.add_argument("--repeticoes", type=int, default=3,
+                        help="execuções cronometradas por caso")
+    parser.add_argument("--filtro", help="só executa os casos cujo nome contém este texto")
+    parser.add_argument("--salvar", help="grava os resultados como linha de base JSON")
+    parser.add_argument("--comparar", help="linha de base JSON para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="folga relativa de tempo e memória na comparação")
+    args = parser.parse_args(argv)
+
+    tamanhos = args.tamanhos or (TAMANHOS_COMPLETOS if args.completo else TAMANHOS_PADRAO)
+    with tempfile.TemporaryDirectory() as temporario:
+        resultados = executar(montar_casos(tamanhos, temporario, filtro=args.filtro),
+                              args.repeticoes, args.filtro)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(
+                {"python": platform.python_version(), "casos": resultados}, f, indent=2
+            )
+        print(f"\nLinha de base gravada em {args.salvar}.")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)["casos"]
+        regressoes = comparar(resultados, base, args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressões em relação a {args.comparar}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            return 1
+        print(f"\nSem regressões em relação a {args.comparar}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+A* bidirecional para trechos longos do projeto Zelda.
+
+Uma busca parte de `start` e outra de `goal` (sobre as arestas invertidas)
+até que se encontrem. O custo de um passo é o da célula de chegada, então
+no sentido inverso ir de v para u custa c(v), e u precisa ser transitável
+(ou ser o próprio `start`, que nunca é pisado).
+
+As duas buscas usam potenciais balanceados: com hf(v) estimando d(v, goal)
+e hr(v) estimando d(start, v), cada lado ordena os abertos por
+
+    kf(v) = 2 gf(v) + hf(v) - hr(v)      kr(v) = 2 gr(v) + hr(v) - hf(v)
+
+(o dobro do custo reduzido, para continuar em inteiros). Os dois lados
+veem então o mesmo grafo de custos reduzidos não negativos, e a busca pode
+parar assim que min kf + min kr >= 2 * mu, em que mu é o custo do melhor
+caminho já encontrado passando por uma célula alcançada pelos dois lados.
+"""
+
+import heapq
+import time
+
+from zelda_motor import somar_estatisticas
+from zelda_pathfinder import custo_minimo, simbolos_presentes
+
+
+def a_estrela_bidirecional(mapa, start, goal, terrain_costs, walkable=None, estatisticas=None,
+                           ao_expandir=None):
+    """A* bidirecional que retorna (caminho, custo) ou (None, inf), como `a_estrela`.
+
+    Usa a Manhattan escalada pelo menor custo entre os símbolos do mapa
+    nos dois sentidos, como `a_estrela`.
+    `estatisticas` e `ao_expandir` funcionam como em `a_estrela`, somando
+    as expansões dos dois lados.
+    """
+    linhas = len(mapa)
+    colunas = len(mapa[0]) if linhas else 0
+    if not (0 <= start[0] < linhas and 0 <= start[1] < colunas
+            and 0 <= goal[0] < linhas and 0 <= goal[1] < colunas):
+        return None, float("inf")
+    if start == goal:
+        return [start], 0
+
+    inicio = time.perf_counter()
+    fator = custo_minimo(terrain_costs, walkable, simbolos_presentes(mapa))
+    sx, sy = start
+    tx, ty = goal
+
+    def custo(pos):
+        """Custo de pisar em `pos`, ou None se ela não for transitável."""
+        cel = mapa[pos[0]][pos[1]]
+        if walkable and cel not in walkable:
+            return None
+        return terrain_costs.get(cel, 9999)
+
+    def potencial(pos):
+        """hf(pos) - hr(pos)."""
+        x, y = pos
+        return fator * (abs(x - tx) + abs(y - ty) - abs(x - sx) - abs(y - sy))
+
+    # Índice 0: busca a partir de start; índice 1: busca a partir de goal
+    g = ({start: 0}, {goal: 0})
+    pais = ({start: None}, {goal: None})
+    fechados = (set(), set())
+    abertos = ([(potencial(start), 0, start)], [(-potencial(goal), 0, goal)])
+    melhor = float("inf")
+    encontro = None
+    expandidos = 0
+    empilhados = 2
+    obsoletos = 0
+    heap_maximo = 1
+
+    while abertos[0] and abertos[1]:
+        topo_f, topo_r = abertos[0][0][0], abertos[1][0][0]
+        if topo_f + topo_r >= 2 * melhor:
+            break
+        # Expande o lado com menos abertos: as duas fronteiras crescem juntas
+        lado = 0 if len(abertos[0]) <= len(abertos[1]) else 1
+        _, _, atual = heapq.heappop(abertos[lado])
+        if atual in fechados[lado]:
+            obsoletos += 1
+            continue
+        fechados[lado].add(atual)
+        expandidos += 1
+        if ao_expandir is not None:
+            ao_expandir(atual)
+
+        g_lado, g_outro = g[lado], g[1 - lado]
+        g_atual = g_lado[atual]
+        if lado == 1:
+            # Toda aresta que chega em `atual` custa c(atual)
+            custo_atual = custo(atual)
+            if custo_atual is None:
+                continue
+
+        x, y = atual
+        for vizinho in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if not (0 <= vizinho[0] < linhas and 0 <= vizinho[1] < colunas):
+                continue
+            if vizinho in fechados[lado]:
+                continue
+            if lado == 0:
+                passo = custo(vizinho)
+                if passo is None:
+                    continue
+            else:
+                if vizinho != start and custo(vizinho) is None:
+                    continue
+                passo = custo_atual
+            novo_g = g_atual + passo
+            if novo_g < g_lado.get(vizinho, float("inf")):
+                g_lado[vizinho] = novo_g
+                pais[lado][vizinho] = atual
+                p = potencial(vizinho)
+                chave = 2 * novo_g + (p if lado == 0 else -p)
+                heapq.heappush(abertos[lado], (chave, -novo_g, vizinho))
+                empilhados += 1
+                if len(abertos[lado]) > heap_maximo:
+                    heap_maximo = len(abertos[lado])
+                if vizinho in g_outro and novo_g + g_outro[vizinho] < melhor:
+                    melhor = novo_g + g_outro[vizinho]
+                    encontro = vizinho
+
+    somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                       time.perf_counter() - inicio)
+    if encontro is None:
+        return None, float("inf")
+
+    caminho = []
+    pos = encontro
+    while pos is not None:
+        caminho.append(pos)
+        pos = pais[0][pos]
+    caminho.reverse()
+    pos = pais[1][encontro]
+    while pos is not None:
+        caminho.append(pos)
+        pos = pais[1][pos]
+    return caminho, melhor
@@ -0,0 +1,216 @@
+"""
+Cache de rotas do projeto Zelda.
+
+Cada trecho (caminho e custo) é identificado por uma chave que resume o
+conteúdo da grade, a tabela de custos, o conjunto de terrenos transitáveis
+e as duas pontas. Como a chave depende do conteúdo do mapa, editar um
+arquivo de mapa gera chaves novas: as entradas antigas deixam de ser
+encontradas e acabam descartadas pela política LRU.
+
+Há dois níveis com a mesma interface (`obter`/`guardar`): `CacheTrechos`,
+em memória, e `CacheRotasDisco`, persistente. O cache em memória pode usar
+o de disco como próximo nível; `cache_padrao()` devolve essa combinação,
+compartilhada por todo o processo.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+DIRETORIO_CACHE = ".zelda_cache"
+
+_cache_padrao = None
+
+
+def impressao_digital(mapa):
+    """Hash SHA-256 do conteúdo de um mapa (independe de como ele foi lido)."""
+    if hasattr(mapa, "impressao_digital"):
+        return mapa.impressao_digital()
+    h = hashlib.sha256()
+    for linha in mapa:
+        h.update(",".join(linha).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def chave_trecho(impressao, start, goal, terrain_costs, walkable=None):
+    """Chave de um trecho a partir da impressão digital do mapa."""
+    dados = json.dumps(
+        [
+            impressao,
+            sorted(terrain_costs.items()),
+            sorted(walkable) if walkable else None,
+            list(start),
+            list(goal),
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+
+class CacheRotasDisco:
+    """Cache persistente de trechos em disco, com limite de tamanho e LRU.
+
+    Cada entrada é um arquivo JSON `<chave>.json` em `diretorio`; a data de
+    modificação do arquivo registra o último uso, de modo que a ordem LRU
+    sobrevive entre execuções. Acima de `max_entradas`, os arquivos usados
+    há mais tempo são removidos.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE, max_entradas=4096):
+        """Abre (ou cria) o diretório do cache e carrega a ordem de uso."""
+        self.diretorio = diretorio
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.faltas = 0
+        os.makedirs(diretorio, exist_ok=True)
+
+        entradas = []
+        for nome in os.listdir(diretorio):
+            if nome.endswith(".json"):
+                try:
+                    mtime = os.stat(os.path.join(diretorio, nome)).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                entradas.append((mtime, nome[:-5]))
+        self._uso = OrderedDict((chave, None) for _, chave in sorted(entradas))
+
+    def _arquivo(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def obter(self, chave):
+        """Retorna (caminho, custo) guardado para `chave`, ou None."""
+        arquivo = self._arquivo(chave)
+        try:
+            with open(arquivo, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            os.utime(arquivo)
+        except (FileNotFoundError, ValueError):
+            self._uso.pop(chave, None)
+            self.faltas += 1
+            return None
+
+        self._uso[chave] = None
+        self._uso.move_to_end(chave)
+        self.acertos += 1
+        caminho = dados["caminho"]
+        if caminho is not None:
+            caminho = [tuple(p) for p in caminho]
+        return caminho, dados["custo"]
+
+    def guardar(self, chave, valor):
+        """Grava (caminho, custo) para `chave`, descartando as entradas mais antigas."""
+        caminho, custo = valor
+        arquivo = self._arquivo(chave)
+        temporario = f"{arquivo}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"caminho": caminho, "custo": custo}, f, separators=(",", ":"))
+        os.replace(temporario, arquivo)
+
+        self._uso[chave] = None
+        self._uso.move_to_end(chave)
+        while len(self._uso) > self.max_entradas:
+            antiga, _ = self._uso.popitem(last=False)
+            try:
+                os.remove(self._arquivo(antiga))
+            except FileNotFoundError:
+                pass
+
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        for chave in list(self._uso):
+            try:
+                os.remove(self._arquivo(chave))
+            except FileNotFoundError:
+                pass
+        self._uso.clear()
+
+    def __len__(self):
+        return len(self._uso)
+
+
+class CacheTrechos:
+    """Cache LRU de trechos em memória, com contagem de acertos e faltas.
+
+    Guarda no máximo `max_entradas` trechos; ao passar do limite descarta o
+    usado há mais tempo. Se `proximo` for outro cache (por exemplo um
+    `CacheRotasDisco`), as faltas são procuradas nele e as gravações são
+    repassadas a ele.
+    """
+
+    def __init__(self, max_entradas=1024, proximo=None):
+        """Cria um cache vazio."""
+        if max_entradas <= 0:
+            raise ValueError("max_entradas deve ser positivo.")
+        self.max_entradas = max_entradas
+        self.proximo = proximo
+        self.acertos = 0
+        self.acertos_proximo = 0
+        self.faltas = 0
+        self._entradas = OrderedDict()
+
+    def obter(self, chave):
+        """Retorna (caminho, custo) guardado para `chave`, ou None."""
+        valor = self._entradas.get(chave)
+        if valor is not None:
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+        if self.proximo is not None:
+            valor = self.proximo.obter(chave)
+            if valor is not None:
+                self.acertos_proximo += 1
+                self._inserir(chave, valor)
+                return valor
+        self.faltas += 1
+        return None
+
+    def guardar(self, chave, valor):
+        """Guarda (caminho, custo) para `chave` (e no próximo nível, se houver)."""
+        self._inserir(chave, valor)
+        if self.proximo is not None:
+            self.proximo.guardar(chave, valor)
+
+    def _inserir(self, chave, valor):
+        self._entradas[chave] = valor
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def limpar(self):
+        """Esvazia o cache em memória e zera as estatísticas."""
+        self._entradas.clear()
+        self.acertos = 0
+        self.acertos_proximo = 0
+        self.faltas = 0
+
+    def estatisticas(self):
+        """Resumo do uso do cache: acertos, faltas, taxa de acerto e ocupação.
+
+        "acertos" conta os encontrados em memória e "acertos_proximo" os que
+        vieram do próximo nível; "faltas" são os que não estavam em nenhum.
+        """
+        consultas = self.acertos + self.acertos_proximo + self.faltas
+        return {
+            "acertos": self.acertos,
+            "acertos_proximo": self.acertos_proximo,
+            "faltas": self.faltas,
+            "taxa_acerto": (
+                (self.acertos + self.acertos_proximo) / consultas if consultas else 0.0
+            ),
+            "entradas": len(self._entradas),
+            "max_entradas": self.max_entradas,
+        }
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+def cache_padrao():
+    """Cache de trechos do processo: memória na frente do cache em disco."""
+    global _cache_padrao  # pylint: disable=global-statement
+    if _cache_padrao is None:
+        _cache_padrao = CacheTrechos(proximo=CacheRotasDisco())
+    return _cache_padrao
@@ -0,0 +1,267 @@
+"""
+Campo de custos vetorizado (NumPy) do projeto Zelda.
+
+Calcula de uma vez o custo de uma origem até *todas* as células do mapa,
+para mapas de calor de alcance ou para responder a muitos destinos com uma
+única conta. O NumPy é opcional: só este módulo depende dele.
+
+Há dois métodos, ambos exatos (contas em inteiros, os custos são os de
+`a_estrela`):
+
+- "baldes": um Dijkstra em que cada passo trata, de uma vez, todas as
+  células da fronteira com custo até o mínimo da fronteira mais o menor
+  custo de passo. Nenhuma delas pode melhorar passando por outra célula
+  da fronteira, então todas ficam prontas juntas (ao menos as de custo
+  mínimo, mesmo com passos de custo 0) e os vizinhos são
+  relaxados em operações vetoriais. O número de passos acompanha o custo
+  máximo, não o número de células.
+
+- "varreduras": relaxação por linhas inteiras. Numa passada da esquerda
+  para a direita, o custo de chegar em j vindo de k <= j pela mesma linha
+  é d[k] + S[j] - S[k], com S a soma acumulada dos custos da linha; então
+
+      d[j] = min(d[j], S[j] + min_{k <= j} (d[k] - S[k]))
+
+  e o mínimo acumulado faz a passada de todas as linhas de uma vez. As
+  passadas horizontais e verticais (nos dois sentidos) se alternam até
+  nada mudar, cada uma só sobre as linhas ou colunas que a anterior
+  alterou. Cada rodada corrige os caminhos com uma curva a mais, o que
+  favorece labirintos de custo uniforme, com corredores longos.
+
+Células intransitáveis custam BLOQUEIO, maior que qualquer caminho real;
+o que passa por elas é descartado.
+"""
+
+from collections import deque
+
+from zelda_grade import GradeCompacta
+from zelda_jps import custo_uniforme
+from zelda_pathfinder import custo_minimo
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_DISPONIVEL = np is not None
+
+# Custo de pisar numa célula intransitável: maior que qualquer caminho real
+# e pequeno o bastante para as somas acumuladas não estourarem em int64
+BLOQUEIO = 2 ** 44
+# Custo das células inalcançáveis
+INALCANCAVEL = 2 ** 62
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError("O campo de custos precisa do NumPy (pip install numpy).")
+
+
+def matriz_custos(mapa, terrain_costs, walkable=None):
+    """Matriz int64 com o custo de pisar em cada célula (BLOQUEIO se não puder).
+
+    Para uma `GradeCompacta`, é uma consulta vetorial à tabela de custos da
+    grade, sem passar pelos símbolos.
+    """
+    _exigir_numpy()
+    if isinstance(mapa, GradeCompacta):
+        tabela = np.array(
+            [BLOQUEIO if c is None else c for c in mapa.tabela_custos(terrain_costs, walkable)],
+            dtype=np.int64,
+        )
+        codigos = np.frombuffer(mapa.codigos, dtype=np.uint8)
+        return tabela[codigos].reshape(mapa.linhas, mapa.colunas)
+
+    custos = {}
+    linhas = []
+    for linha in mapa:
+        for cel in linha:
+            if cel not in custos:
+                bloqueada = walkable and cel not in walkable
+                custos[cel] = BLOQUEIO if bloqueada else terrain_costs.get(cel, 9999)
+        linhas.append([custos[cel] for cel in linha])
+    return np.array(linhas, dtype=np.int64).reshape(len(linhas), -1)
+
+
+def _passada(d, c):
+    """Relaxa todas as linhas da esquerda para a direita."""
+    s = np.cumsum(c, axis=1)
+    return np.minimum(d, s + np.minimum.accumulate(d - s, axis=1))
+
+
+def _relaxar_linhas(d, c, ativas):
+    """Varre as linhas `ativas` de `d` nos dois sentidos, no próprio `d`.
+
+    Retorna, por coluna, se alguma célula dela mudou.
+    """
+    indices = np.flatnonzero(ativas)
+    if not len(indices):
+        return np.zeros(d.shape[1], dtype=bool)
+    antes = d[indices]
+    custos = c[indices]
+    depois = _passada(antes, custos)
+    depois = _passada(depois[:, ::-1], custos[:, ::-1])[:, ::-1]
+    depois[depois >= BLOQUEIO] = INALCANCAVEL
+    mudou = depois != antes
+    d[indices] = depois
+    return mudou.any(axis=0)
+
+
+def _campo_varreduras(c, origem):
+    """Campo por varreduras; retorna (custos, rodadas)."""
+    linhas, colunas = c.shape
+    d = np.full(c.shape, INALCANCAVEL, dtype=np.int64)
+    d[origem] = 0
+    # Só as linhas (colunas) com alguma célula alterada desde a última
+    # passada horizontal (vertical) precisam ser varridas de novo
+    linhas_ativas = np.zeros(linhas, dtype=bool)
+    colunas_ativas = np.zeros(colunas, dtype=bool)
+    linhas_ativas[origem[0]] = colunas_ativas[origem[1]] = True
+    rodadas = 0
+    while linhas_ativas.any() or colunas_ativas.any():
+        rodadas += 1
+        colunas_ativas |= _relaxar_linhas(d, c, linhas_ativas)
+        linhas_ativas[:] = False
+        linhas_ativas |= _relaxar_linhas(d.T, c.T, colunas_ativas)
+        colunas_ativas[:] = False
+    return d, rodadas
+
+
+def _campo_baldes(c, origem, passo_minimo):
+    """Campo pelo Dijkstra em lotes; retorna (custos, passos)."""
+    linhas, colunas = c.shape
+    # Grade plana com borda intransitável, como a do motor A*
+    largura = colunas + 2
+    custos = np.full((linhas + 2, largura), BLOQUEIO, dtype=np.int64)
+    custos[1:-1, 1:-1] = c
+    custos = custos.ravel()
+    passavel = custos < BLOQUEIO
+    d = np.full(custos.shape, INALCANCAVEL, dtype=np.int64)
+    pronta = np.zeros(custos.shape, dtype=bool)
+    na_fronteira = np.zeros(custos.shape, dtype=bool)
+
+    inicio = (origem[0] + 1) * largura + origem[1] + 1
+    d[inicio] = 0
+    na_fronteira[inicio] = True
+    fronteira = np.array([inicio])
+    deslocamentos = np.array([-largura, largura, -1, 1])
+    passos = 0
+    while fronteira.size:
+        passos += 1
+        d_fronteira = d[fronteira]
+        lote = d_fronteira <= d_fronteira.min() + passo_minimo
+        atuais = fronteira[lote]
+        pronta[atuais] = True
+        na_fronteira[atuais] = False
+        # Os quatro vizinhos de todas as células do lote, numa operação só
+        vizinhos = (atuais[:, None] + deslocamentos).ravel()
+        origens = np.repeat(d[atuais], 4)
+        validos = passavel[vizinhos] & ~pronta[vizinhos]
+        vizinhos = vizinhos[validos]
+        antes = d[vizinhos]
+        np.minimum.at(d, vizinhos, origens[validos] + custos[vizinhos])
+        melhorados = np.unique(vizinhos[d[vizinhos] < antes])
+        melhorados = melhorados[~na_fronteira[melhorados]]
+        na_fronteira[melhorados] = True
+        fronteira = np.concatenate((fronteira[~lote], melhorados))
+    return d.reshape(linhas + 2, largura)[1:-1, 1:-1].copy(), passos
+
+
+METODOS = ("auto", "baldes", "varreduras")
+
+
+class CampoCustos:
+    """Custo de `origem` até todas as células, com as regras de `a_estrela`.
+
+    `custos` é a matriz (linhas x colunas) de custos, com INALCANCAVEL nas
+    células que não podem ser alcançadas. `metodo` é "baldes",
+    "varreduras" ou "auto" (varreduras quando todos os terrenos
+    transitáveis custam o mesmo, como nas masmorras; baldes nos demais);
+    `iteracoes` conta os passos ou rodadas do método usado. Lança
+    ImportError sem NumPy.
+    """
+
+    def __init__(self, mapa, origem, terrain_costs, walkable=None, metodo="auto"):
+        """Calcula o campo de custos a partir de `origem`."""
+        _exigir_numpy()
+        if metodo not in METODOS:
+            raise ValueError(f"Método de campo desconhecido: {metodo!r}.")
+        self.origem = origem
+        self.passos = matriz_custos(mapa, terrain_costs, walkable)
+        linhas, colunas = self.passos.shape
+        if not (0 <= origem[0] < linhas and 0 <= origem[1] < colunas):
+            raise ValueError(f"Origem {origem} fora do mapa.")
+
+        if metodo == "auto":
+            uniforme = custo_uniforme(terrain_costs, walkable) is not None
+            metodo = "varreduras" if uniforme else "baldes"
+        self.metodo = metodo
+        if metodo == "varreduras":
+            self.custos, self.iteracoes = _campo_varreduras(self.passos, origem)
+        else:
+            self.custos, self.iteracoes = _campo_baldes(
+                self.passos, origem, custo_minimo(terrain_costs, walkable)
+            )
+
+    def custo(self, destino):
+        """Custo até `destino`, ou inf se ele for inalcançável."""
+        custo = int(self.custos[destino])
+        return float("inf") if custo == INALCANCAVEL else custo
+
+    def caminho(self, destino):
+        """(caminho, custo) até `destino`, ou (None, inf), como `a_estrela`.
+
+        O caminho é refeito do destino até a origem, sempre por um vizinho
+        que seja predecessor válido (custo dele mais o passo dá o custo da
+        célula); ver `_descer`.
+        """
+        linhas, colunas = self.custos.shape
+        if not (0 <= destino[0] < linhas and 0 <= destino[1] < colunas):
+            return None, float("inf")
+        custo = self.custo(destino)
+        if custo == float("inf"):
+            return None, custo
+
+        caminho = [destino]
+        while caminho[-1] != self.origem:
+            caminho.extend(self._descer(caminho[-1]))
+        caminho.reverse()
+        return caminho, custo
+
+    def _descer(self, pos):
+        """Células depois de `pos`, rumo à origem, até uma de custo menor (ou a origem).
+
+        Em geral é um vizinho só. Em platôs de passos de custo 0, vários
+        vizinhos têm o mesmo custo e podem apontar uns para os outros; a
+        busca em largura pelo platô acha a saída sem andar em círculos.
+        """
+        d, c = self.custos, self.passos
+        linhas, colunas = d.shape
+        anterior = {pos: None}
+        fila = deque([pos])
+        while fila:
+            v = fila.popleft()
+            x, y = v
+            for u in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if (not (0 <= u[0] < linhas and 0 <= u[1] < colunas) or u in anterior
+                        or d[u] + c[v] != d[v]):
+                    continue
+                anterior[u] = v
+                if d[u] < d[v] or u == self.origem:
+                    trecho = [u]
+                    while anterior[trecho[-1]] != pos:
+                        trecho.append(anterior[trecho[-1]])
+                    trecho.reverse()
+                    return trecho
+                fila.append(u)
+        raise RuntimeError(f"Campo de custos inconsistente em {pos}.")
+
+    def consultar(self, destinos):
+        """{destino: (caminho, custo)} para vários destinos, como `dijkstra_multiplos_alvos`."""
+        return {destino: self.caminho(destino) for destino in destinos}
+
+    def mapa_calor(self):
+        """Custos em float64, com NaN nas células inalcançáveis (para desenhar)."""
+        calor = self.custos.astype(np.float64)
+        calor[self.custos == INALCANCAVEL] = np.nan
+        return calor
@@ -0,0 +1,235 @@
+"""
+Carregamento rápido de mapas grandes do projeto Zelda.
+
+`ler_grade` lê o texto (células separadas por vírgula) direto para uma
+`GradeCompacta`, uma linha de bytes por vez, sem criar strings por célula,
+e valida o número de linhas e colunas e os símbolos. Linhas em que todos
+os símbolos têm um byte (o caso comum) viram códigos com um único
+`translate`; as demais, com um `split` e uma consulta por célula.
+
+`salvar_binario` grava a grade num arquivo binário, que `ler_binario`
+abre com `mmap`: os códigos são usados direto do arquivo mapeado, sem
+cópia nem análise de texto. `carregar_grade` junta os dois, mantendo um
+arquivo `<mapa>.grade` ao lado do texto e refazendo-o quando o texto muda.
+
+Formato binário (inteiros little-endian):
+
+    "ZGRD" | versão (u16) | tamanho do cabeçalho (u32) | cabeçalho JSON
+    | zeros até múltiplo de 8 | linhas * colunas códigos (1 byte cada)
+
+O cabeçalho JSON tem as dimensões, os símbolos, o índice de marcadores, a
+impressão digital do conteúdo e o tamanho/data do texto de origem.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from zelda_grade import CODIGO_BORDA, GradeCompacta
+from zelda_indice import SIMBOLOS_TERRENO
+from zelda_pathfinder import RE_ENTRADA_MASMORRA
+
+MAGICO = b"ZGRD"
+VERSAO_BINARIO = 1
+_INICIO = struct.Struct("<4sHI")
+
+# Marcadores do jogo, além das entradas M<k>
+MARCADORES = frozenset({"L", "LW", "MA", "MS", "E", "P"})
+
+
+def simbolo_conhecido(simbolo):
+    """True para terrenos, marcadores e entradas M<k> do jogo."""
+    return (simbolo in SIMBOLOS_TERRENO or simbolo in MARCADORES
+            or RE_ENTRADA_MASMORRA.fullmatch(simbolo) is not None)
+
+
+def ler_grade(caminho, linhas=None, colunas=None, simbolos_validos=None):
+    """Lê um mapa texto e retorna uma `GradeCompacta`.
+
+    Todas as linhas não vazias precisam ter o mesmo número de células (e
+    `linhas`/`colunas`, se informados). `simbolos_validos` é o conjunto de
+    símbolos aceitos; sem ele, vale `simbolo_conhecido`. Lança ValueError
+    indicando linha e coluna do primeiro problema encontrado.
+    """
+    codigos = bytearray()
+    tabela = {}
+    # Código de cada símbolo de um byte; CODIGO_BORDA marca bytes sem símbolo
+    tabela_bytes = bytearray([CODIGO_BORDA]) * 256
+    simbolos = []
+    impressao = hashlib.sha256()
+    n_linhas = 0
+    with open(caminho, "rb") as f:
+        for numero, linha in enumerate(f, start=1):
+            linha = linha.translate(None, b" \t\r\n")
+            if not linha:
+                continue
+            codigos_linha = None
+            if (colunas is not None and len(linha) == 2 * colunas - 1
+                    and linha[1::2] == b"," * (colunas - 1)):
+                codigos_linha = linha[::2].translate(tabela_bytes)
+                if CODIGO_BORDA in codigos_linha:
+                    codigos_linha = None
+            if codigos_linha is None:
+                celulas = linha.split(b",")
+                if colunas is None:
+                    colunas = len(celulas)
+                elif len(celulas) != colunas:
+                    raise ValueError(
+                        f"{caminho}, linha {numero}: {len(celulas)} colunas; esperado {colunas}."
+                    )
+                try:
+                    codigos_linha = bytes(map(tabela.__getitem__, celulas))
+                except KeyError:
+                    for coluna, celula in enumerate(celulas, start=1):
+                        if celula not in tabela:
+                            simbolo = celula.decode("utf-8")
+                            valido = (simbolo in simbolos_validos if simbolos_validos is not None
+                                      else simbolo_conhecido(simbolo))
+                            if not valido:
+                                raise ValueError(
+                                    f"{caminho}, linha {numero}, coluna {coluna}: "
+                                    f"símbolo desconhecido {simbolo!r}."
+                                ) from None
+                            if len(simbolos) >= CODIGO_BORDA:
+                                raise ValueError(
+                                    f"A grade compacta suporta no máximo {CODIGO_BORDA} símbolos."
+                                ) from None
+                            tabela[celula] = len(simbolos)
+                            if len(celula) == 1:
+                                tabela_bytes[celula[0]] = len(simbolos)
+                            simbolos.append(simbolo)
+                    codigos_linha = bytes(map(tabela.__getitem__, celulas))
+            codigos += codigos_linha
+            # A linha sem espaços é exatamente a que `impressao_digital` resume
+            impressao.update(linha)
+            impressao.update(b"\n")
+            n_linhas += 1
+
+    if linhas is not None and n_linhas != linhas:
+        raise ValueError(f"{caminho}: {n_linhas} linhas; esperado {linhas}.")
+    return GradeCompacta(n_linhas, colunas or 0, codigos, simbolos, caminho,
+                         impressao=impressao.hexdigest())
+
+
+def salvar_binario(grade, caminho, origem=None):
+    """Grava `grade` no formato binário.
+
+    `origem` é o arquivo texto de onde a grade veio; o tamanho e a data dele
+    ficam no cabeçalho para `carregar_grade` saber se o binário está velho.
+    """
+    cabecalho = {
+        "linhas": grade.linhas,
+        "colunas": grade.colunas,
+        "simbolos": grade.simbolos,
+        "indice": {s: [list(p) for p in posicoes] for s, posicoes in grade.indice.items()},
+        "impressao": grade.impressao_digital(),
+        "origem": _assinatura(origem) if origem else None,
+    }
+    dados = json.dumps(cabecalho, separators=(",", ":")).encode("utf-8")
+    inicio = _INICIO.pack(MAGICO, VERSAO_BINARIO, len(dados)) + dados
+    inicio += bytes(-len(inicio) % 8)
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(inicio)
+        f.write(grade.codigos)
+    os.replace(temporario, caminho)
+
+
+def ler_binario(caminho, nome=None):
+    """Abre um arquivo de `salvar_binario` como `GradeCompacta`, sem copiar os códigos.
+
+    Os códigos ficam num mapeamento copy-on-write do arquivo: editar a grade
+    não altera o arquivo. Lança ValueError se o arquivo não for válido.
+    """
+    grade, _ = _abrir_binario(caminho, nome)
+    return grade
+
+
+def _abrir_binario(caminho, nome=None):
+    """(grade, cabeçalho) de um arquivo binário de grade."""
+    with open(caminho, "rb") as f:
+        mapeado = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        cabecalho, inicio = _ler_cabecalho(mapeado, caminho)
+    except Exception:
+        # Arquivo inválido: nenhuma grade vai usar o mapeamento
+        mapeado.close()
+        raise
+
+    indice = {s: [tuple(p) for p in posicoes] for s, posicoes in cabecalho["indice"].items()}
+    grade = GradeCompacta(
+        cabecalho["linhas"], cabecalho["colunas"], memoryview(mapeado)[inicio:],
+        cabecalho["simbolos"], nome or caminho, indice, cabecalho["impressao"],
+    )
+    return grade, cabecalho
+
+
+def _ler_cabecalho(mapeado, caminho):
+    """(cabeçalho, início dos códigos) de um arquivo de grade mapeado."""
+    if len(mapeado) < _INICIO.size:
+        raise ValueError(f"{caminho} não é um arquivo de grade.")
+    magico, versao, tamanho = _INICIO.unpack_from(mapeado)
+    if magico != MAGICO:
+        raise ValueError(f"{caminho} não é um arquivo de grade.")
+    if versao != VERSAO_BINARIO:
+        raise ValueError(f"{caminho}: versão {versao} do formato de grade não suportada.")
+    fim_cabecalho = _INICIO.size + tamanho
+    cabecalho = json.loads(mapeado[_INICIO.size:fim_cabecalho])
+    inicio = fim_cabecalho + (-fim_cabecalho % 8)
+    total = cabecalho["linhas"] * cabecalho["colunas"]
+    if len(mapeado) != inicio + total:
+        raise ValueError(f"{caminho}: tamanho não confere com as dimensões do cabeçalho.")
+    return cabecalho, inicio
+
+
+def _assinatura(caminho):
+    estado = os.stat(caminho)
+    return {"tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+
+def caminho_binario(caminho):
+    """Arquivo binário mantido ao lado do mapa texto `caminho`."""
+    return f"{caminho}.grade"
+
+
+def carregar_grade(caminho, linhas=None, colunas=None, simbolos_validos=None):
+    """Lê o mapa texto `caminho` usando (e mantendo) o binário ao lado dele.
+
+    Se o binário existir e o texto não tiver mudado desde que ele foi
+    gravado, a grade vem do binário; senão o texto é lido com `ler_grade` e
+    o binário é regravado (se o diretório não permitir, a leitura segue sem
+    ele). As dimensões pedidas são conferidas nos dois casos.
+    """
+    binario = caminho_binario(caminho)
+    try:
+        grade, cabecalho = _abrir_binario(binario, caminho)
+    except (FileNotFoundError, ValueError):
+        grade = None
+    else:
+        if cabecalho["origem"] != _assinatura(caminho):
+            grade = None
+
+    if grade is None:
+        grade = ler_grade(caminho, linhas, colunas, simbolos_validos)
+        try:
+            salvar_binario(grade, binario, origem=caminho)
+        except OSError:
+            pass
+        return grade
+
+    for simbolo in grade.simbolos:
+        if not (simbolo in simbolos_validos if simbolos_validos is not None
+                else simbolo_conhecido(simbolo)):
+            raise ValueError(f"{caminho}: símbolo desconhecido {simbolo!r}.")
+    if (linhas is not None and grade.linhas != linhas) or (
+        colunas is not None and grade.colunas != colunas
+    ):
+        raise ValueError(
+            f"{caminho}: {grade.linhas}x{grade.colunas}; esperado "
+            f"{linhas if linhas is not None else grade.linhas}x"
+            f"{colunas if colunas is not None else grade.colunas}."
+        )
+    return grade
@@ -0,0 +1,398 @@
+"""
+Camadas de desenho dos mapas na interface do projeto Zelda.
+
+`CamadaMapa` transforma um mapa pequeno (as masmorras), uma única vez, numa
+grade persistente de itens do canvas: um retângulo por célula e, por cima,
+as imagens dos marcadores. A camada guarda o item de cada célula e, depois
+de desenhada, só altera as células que mudam (destaque do caminho, edições
+de terreno); esconder e mostrar uma masmorra não recria nada.
+
+`CamadaBlocos` serve para mapas de qualquer tamanho. O mapa é dividido em
+blocos, e cada bloco vira uma imagem (`PhotoImage`) com um item só no
+canvas. Só os blocos que aparecem na janela são criados, à medida que a
+vista rola; os criados ficam num cache LRU. Nos níveis de zoom afastados,
+cada pixel da imagem representa um quadrado de células (uma amostra dele).
+As duas camadas têm a mesma interface de destaques.
+"""
+
+from collections import OrderedDict
+
+import tkinter as tk
+
+
+class CamadaMapa:
+    """Grade persistente de itens do canvas para um mapa.
+
+    `estilo(simbolo)` retorna (cor, imagem ou None) de um símbolo; é
+    consultado uma vez por símbolo distinto. Todos os itens levam a tag
+    `tag`, e a célula (i, j) fica em `deslocamento` + (j, i) * `tamanho`.
+    """
+
+    def __init__(self, canvas, mapa, tamanho, estilo, tag, deslocamento=(0, 0)):
+        """Desenha o mapa inteiro no canvas."""
+        self.canvas = canvas
+        self.mapa = mapa
+        self.tamanho = tamanho
+        self.tag = tag
+        self.x0, self.y0 = deslocamento
+        self.linhas = len(mapa)
+        self.colunas = len(mapa[0]) if self.linhas else 0
+        self._estilo = estilo
+        self._estilos = {}
+        # Item do retângulo de cada célula, linha a linha
+        self.retangulos = []
+        # Item da imagem das células que têm uma
+        self.imagens = {}
+        # Cor aplicada por cima do terreno em cada célula destacada
+        self.destaques = {}
+        self.visivel = True
+        self._desenhar()
+
+    def estilo(self, simbolo):
+        """(cor, imagem) do símbolo, guardado após a primeira consulta."""
+        if simbolo not in self._estilos:
+            self._estilos[simbolo] = self._estilo(simbolo)
+        return self._estilos[simbolo]
+
+    def _desenhar(self):
+        criar = self.canvas.create_rectangle
+        t = self.tamanho
+        com_imagem = []
+        for i, linha in enumerate(self.mapa):
+            y = self.y0 + i * t
+            for j, simbolo in enumerate(linha):
+                x = self.x0 + j * t
+                cor, imagem = self.estilo(simbolo)
+                self.retangulos.append(
+                    criar(x, y, x + t, y + t, fill=cor, outline="#E0E0E0", width=1,
+                          tags=self.tag)
+                )
+                if imagem:
+                    com_imagem.append((i, j, imagem))
+        # As imagens vêm depois de todos os retângulos para ficarem por cima
+        for i, j, imagem in com_imagem:
+            self._criar_imagem(i, j, imagem)
+
+    def _criar_imagem(self, i, j, imagem):
+        self.imagens[(i, j)] = self.canvas.create_image(
+            *self.centro((i, j)), image=imagem, tags=self.tag
+        )
+
+    def item(self, pos):
+        """Item do retângulo da célula `pos`."""
+        return self.retangulos[pos[0] * self.colunas + pos[1]]
+
+    def centro(self, pos):
+        """Coordenadas (x, y) do centro da célula `pos` no canvas."""
+        i, j = pos
+        return (self.x0 + j * self.tamanho + self.tamanho / 2,
+                self.y0 + i * self.tamanho + self.tamanho / 2)
+
+    def retangulo(self, pos):
+        """(x1, y1, x2, y2) da célula `pos` no canvas."""
+        x, y = self.x0 + pos[1] * self.tamanho, self.y0 + pos[0] * self.tamanho
+        return x, y, x + self.tamanho, y + self.tamanho
+
+    def caixa(self):
+        """(x1, y1, x2, y2) ocupado pela camada, sem consultar o canvas."""
+        return (self.x0, self.y0, self.x0 + self.colunas * self.tamanho,
+                self.y0 + self.linhas * self.tamanho)
+
+    def destacar(self, celulas, cor):
+        """Pinta `celulas` com `cor` por cima do terreno."""
+        configurar = self.canvas.itemconfigure
+        for pos in celulas:
+            if self.destaques.get(pos) != cor:
+                configurar(self.item(pos), fill=cor)
+                self.destaques[pos] = cor
+
+    def limpar_destaques(self):
+        """Volta as células destacadas à cor do terreno."""
+        configurar = self.canvas.itemconfigure
+        for i, j in self.destaques:
+            configurar(self.item((i, j)), fill=self.estilo(self.mapa[i][j])[0])
+        self.destaques.clear()
+
+    def atualizar(self, celulas):
+        """Redesenha só `celulas`, depois de o terreno delas mudar no mapa."""
+        configurar = self.canvas.itemconfigure
+        for pos in celulas:
+            i, j = pos
+            cor, imagem = self.estilo(self.mapa[i][j])
+            configurar(self.item(pos), fill=self.destaques.get(pos, cor))
+            item_imagem = self.imagens.pop(pos, None)
+            if item_imagem is not None:
+                self.canvas.delete(item_imagem)
+            if imagem:
+                self._criar_imagem(i, j, imagem)
+                if not self.visivel:
+                    configurar(self.imagens[pos], state="hidden")
+
+    def mostrar(self):
+        """Torna a camada visível."""
+        self.canvas.itemconfigure(self.tag, state="normal")
+        self.visivel = True
+
+    def esconder(self):
+        """Esconde a camada sem apagar os itens."""
+        self.canvas.itemconfigure(self.tag, state="hidden")
+        self.visivel = False
+
+    def remover(self):
+        """Apaga todos os itens da camada do canvas."""
+        self.canvas.delete(self.tag)
+        self.retangulos = []
+        self.imagens.clear()
+        self.destaques.clear()
+
+
+# Lado aproximado, em pixels, da imagem de um bloco
+PIXELS_BLOCO = 512
+# Cor das linhas da grade nas imagens dos blocos
+COR_GRADE = "#E0E0E0"
+# Menor tamanho de célula (pixels) com linhas de grade e imagens de marcadores
+PIXELS_GRADE = 4
+PIXELS_MARCADORES = 10
+
+
+class CamadaBlocos:
+    """Mapa desenhado em blocos de imagem, criados só quando ficam visíveis.
+
+    O nível de zoom é (`pixels`, `passo`): cada célula ocupa `pixels`
+    pixels de lado, ou, com `passo` > 1, cada pixel representa `passo` x
+    `passo` células (a do canto superior esquerdo); `definir_nivel` muda o
+    nível. `ver` cria os blocos que cruzam a área visível; `capacidade`
+    limita quantos ficam no cache. `estilo`, `tag` e `deslocamento` são como
+    em `CamadaMapa`.
+    """
+
+    def __init__(self, canvas, mapa, pixels, passo, estilo, tag, deslocamento=(0, 0),
+                 capacidade=64):
+        """Prepara a camada; nenhum bloco é criado antes de `ver`."""
+        self.canvas = canvas
+        self.mapa = mapa
+        self.tag = tag
+        self.x0, self.y0 = deslocamento
+        self.linhas = len(mapa)
+        self.colunas = len(mapa[0]) if self.linhas else 0
+        self.capacidade = capacidade
+        self._estilo = estilo
+        self._estilos = {}
+        self._cores_rgb = {}
+        self.destaques = {}
+        self.visivel = True
+        # (bi, bj) -> dados do bloco criado, do usado há mais tempo ao mais recente
+        self.blocos = OrderedDict()
+        self.definir_nivel(pixels, passo)
+
+    def estilo(self, simbolo):
+        """(cor, imagem) do símbolo, guardado após a primeira consulta."""
+        if simbolo not in self._estilos:
+            self._estilos[simbolo] = self._estilo(simbolo)
+        return self._estilos[simbolo]
+
+    def definir_nivel(self, pixels, passo=1):
+        """Muda o zoom; os blocos já criados são descartados."""
+        self._descartar_blocos()
+        self.pixels = pixels
+        self.passo = passo
+        self.escala = pixels / passo
+        # Células por lado de bloco (múltiplo do passo)
+        self.celulas_bloco = max(1, PIXELS_BLOCO // pixels) * passo
+
+    def centro(self, pos):
+        """Coordenadas (x, y) do centro da célula `pos` no canvas."""
+        return (self.x0 + (pos[1] + 0.5) * self.escala,
+                self.y0 + (pos[0] + 0.5) * self.escala)
+
+    def retangulo(self, pos):
+        """(x1, y1, x2, y2) da célula `pos` no canvas."""
+        x, y = self.x0 + pos[1] * self.escala, self.y0 + pos[0] * self.escala
+        return x, y, x + self.escala, y + self.escala
+
+    def caixa(self):
+        """(x1, y1, x2, y2) ocupado pela camada, sem consultar o canvas."""
+        return (self.x0, self.y0,
+                self.x0 + -(-self.colunas // self.passo) * self.pixels,
+                self.y0 + -(-self.linhas // self.passo) * self.pixels)
+
+    def ver(self, x1, y1, x2, y2, limite=None):
+        """Garante os blocos que cruzam o retângulo (x1, y1)-(x2, y2) do canvas.
+
+        Os mais próximos do centro são criados primeiro; com `limite`, no
+        máximo esse número é criado nesta chamada. Retorna quantos ainda
+        faltam, para a interface chamar de novo sem travar.
+        """
+        lado = self.celulas_bloco * self.escala
+        n_i = -(-self.linhas // self.celulas_bloco)
+        n_j = -(-self.colunas // self.celulas_bloco)
+        bi1, bi2 = max(0, int((y1 - self.y0) // lado)), min(n_i - 1, int((y2 - self.y0) // lado))
+        bj1, bj2 = max(0, int((x1 - self.x0) // lado)), min(n_j - 1, int((x2 - self.x0) // lado))
+        visiveis = [(bi, bj) for bi in range(bi1, bi2 + 1) for bj in range(bj1, bj2 + 1)]
+        for chave in visiveis:
+            if chave in self.blocos:
+                self.blocos.move_to_end(chave)
+
+        faltam = [chave for chave in visiveis if chave not in self.blocos]
+        meio_i, meio_j = (bi1 + bi2) / 2, (bj1 + bj2) / 2
+        faltam.sort(key=lambda b: abs(b[0] - meio_i) + abs(b[1] - meio_j))
+        criar = faltam if limite is None else faltam[:limite]
+        for chave in criar:
+            self._criar_bloco(chave)
+
+        # Descarta os usados há mais tempo, sem tirar os que estão na vista
+        sobra = len(self.blocos) - max(self.capacidade, len(visiveis))
+        for chave in list(self.blocos)[:max(0, sobra)]:
+            self._descartar_bloco(chave)
+        return len(faltam) - len(criar)
+
+    def _limites(self, chave):
+        """(i0, i1, j0, j1) das células do bloco."""
+        n = self.celulas_bloco
+        i0, j0 = chave[0] * n, chave[1] * n
+        return i0, min(i0 + n, self.linhas), j0, min(j0 + n, self.colunas)
+
+    def _rgb(self, cor):
+        """Bytes (r, g, b) de uma cor do Tk."""
+        if cor not in self._cores_rgb:
+            self._cores_rgb[cor] = bytes(v >> 8 for v in self.canvas.winfo_rgb(cor))
+        return self._cores_rgb[cor]
+
+    def _pixels_bloco(self, i0, i1, j0, j1):
+        """Pixels RGB do bloco, um por célula (ou por amostra, com passo > 1)."""
+        codigos = getattr(self.mapa, "codigos", None)
+        if codigos is None:
+            return b"".join(
+                self._rgb(self.estilo(simbolo)[0])
+                for i in range(i0, i1, self.passo)
+                for simbolo in self.mapa[i][j0:j1:self.passo]
+            )
+        # Grade compacta: fatia os códigos de cada linha e troca cada código
+        # pelos componentes da cor com `translate`, sem laço por célula
+        planos = b"".join(
+            bytes(codigos[i * self.colunas + j0:i * self.colunas + j1:self.passo])
+            for i in range(i0, i1, self.passo)
+        )
+        cores = [self._rgb(self.estilo(simbolo)[0]) for simbolo in self.mapa.simbolos]
+        pixels = bytearray(3 * len(planos))
+        for componente in range(3):
+            tabela = bytearray(256)
+            tabela[:len(cores)] = bytes(cor[componente] for cor in cores)
+            pixels[componente::3] = planos.translate(tabela)
+        return pixels
+
+    def _criar_bloco(self, chave):
+        i0, i1, j0, j1 = self._limites(chave)
+        p = self.pixels
+        colunas = -(-(j1 - j0) // self.passo)
+        linhas = -(-(i1 - i0) // self.passo)
+
+        # Imagem PPM com um pixel por célula, ampliada depois pelo próprio Tk
+        ppm = b"P6 %d %d 255\n" % (colunas, linhas) + self._pixels_bloco(i0, i1, j0, j1)
+        imagem = tk.PhotoImage(master=self.canvas, data=ppm, format="PPM")
+        if p > 1:
+            imagem = imagem.zoom(p)
+        if self.passo == 1 and p >= PIXELS_GRADE:
+            # Linhas da grade na borda direita e de baixo de cada célula
+            for k in range(1, colunas + 1):
+                imagem.put(COR_GRADE, to=(k * p - 1, 0, k * p, linhas * p))
+            for k in range(1, linhas + 1):
+                imagem.put(COR_GRADE, to=(0, k * p - 1, colunas * p, k * p))
+
+        x, y = self.x0 + j0 * self.escala, self.y0 + i0 * self.escala
+        estado = "normal" if self.visivel else "hidden"
+        item = self.canvas.create_image(x, y, image=imagem, anchor="nw", tags=self.tag,
+                                        state=estado)
+        marcadores = []
+        if self.passo == 1 and p >= PIXELS_MARCADORES:
+            for i in range(i0, i1):
+                linha = self.mapa[i]
+                for j in range(j0, j1):
+                    figura = self.estilo(linha[j])[1]
+                    if figura:
+                        marcadores.append(self.canvas.create_image(
+                            *self.centro((i, j)), image=figura, tags=self.tag, state=estado
+                        ))
+        # Blocos ficam por baixo de tudo (destaques extras, ícone do Link),
+        # e os marcadores logo acima do bloco
+        for marcador in marcadores:
+            self.canvas.tag_lower(marcador)
+        self.canvas.tag_lower(item)
+
+        bloco = self.blocos[chave] = {"imagem": imagem, "item": item, "marcadores": marcadores}
+        for pos, cor in self.destaques.items():
+            if i0 <= pos[0] < i1 and j0 <= pos[1] < j1:
+                self._pintar(bloco, chave, pos, cor)
+
+    def _pintar(self, bloco, chave, pos, cor):
+        """Pinta na imagem do bloco o pixel (ou quadrado de pixels) da célula."""
+        i0, _, j0, _ = self._limites(chave)
+        p = self.pixels
+        x = (pos[1] - j0) // self.passo * p
+        y = (pos[0] - i0) // self.passo * p
+        borda = 1 if self.passo == 1 and p >= PIXELS_GRADE else 0
+        bloco["imagem"].put(cor, to=(x, y, x + p - borda, y + p - borda))
+
+    def _bloco_de(self, pos):
+        chave = (pos[0] // self.celulas_bloco, pos[1] // self.celulas_bloco)
+        return chave, self.blocos.get(chave)
+
+    def _cor_base(self, pos):
+        """Cor do terreno no pixel da célula (a amostra do quadrado no zoom afastado)."""
+        i = pos[0] - pos[0] % self.passo
+        j = pos[1] - pos[1] % self.passo
+        return self.estilo(self.mapa[i][j])[0]
+
+    def destacar(self, celulas, cor):
+        """Pinta `celulas` com `cor` por cima do terreno.
+
+        Células de blocos ainda não criados recebem a cor quando o bloco for criado.
+        """
+        for pos in celulas:
+            if self.destaques.get(pos) != cor:
+                self.destaques[pos] = cor
+                chave, bloco = self._bloco_de(pos)
+                if bloco is not None:
+                    self._pintar(bloco, chave, pos, cor)
+
+    def limpar_destaques(self):
+        """Volta as células destacadas à cor do terreno."""
+        for pos in self.destaques:
+            chave, bloco = self._bloco_de(pos)
+            if bloco is not None:
+                self._pintar(bloco, chave, pos, self._cor_base(pos))
+        self.destaques.clear()
+
+    def atualizar(self, celulas):
+        """Refaz os blocos criados que contêm `celulas`, depois de o terreno delas mudar."""
+        chaves = {self._bloco_de(pos)[0] for pos in celulas}
+        for chave in chaves:
+            if chave in self.blocos:
+                self._descartar_bloco(chave)
+                self._criar_bloco(chave)
+
+    def mostrar(self):
+        """Torna a camada visível."""
+        self.canvas.itemconfigure(self.tag, state="normal")
+        self.visivel = True
+
+    def esconder(self):
+        """Esconde a camada sem apagar os blocos."""
+        self.canvas.itemconfigure(self.tag, state="hidden")
+        self.visivel = False
+
+    def _descartar_bloco(self, chave):
+        bloco = self.blocos.pop(chave)
+        self.canvas.delete(bloco["item"])
+        for marcador in bloco["marcadores"]:
+            self.canvas.delete(marcador)
+
+    def _descartar_blocos(self):
+        if self.blocos:
+            self.canvas.delete(self.tag)
+            self.blocos.clear()
+
+    def remover(self):
+        """Apaga todos os itens da camada do canvas."""
+        self._descartar_blocos()
+        self.destaques.clear()
@@ -0,0 +1,214 @@
+"""
+Representação compacta de mapas para o projeto Zelda.
+
+O terreno é guardado como códigos inteiros pequenos num `bytearray` plano
+(uma posição por célula, linha a linha) e os custos de cada conjunto de
+terrenos viram uma tabela indexada pelo código, evitando strings e
+consultas a dicionário no laço da busca.
+"""
+
+import hashlib
+
+from zelda_indice import SIMBOLOS_TERRENO, ComIndice
+
+# Último código possível; fica reservado para células fora do mapa
+CODIGO_BORDA = 255
+
+
+def _copiar_indice(indice):
+    """Cópia do índice de marcadores (editar a grade não altera o mapa de origem)."""
+    if indice is None:
+        return None
+    return {simbolo: list(posicoes) for simbolo, posicoes in indice.items()}
+
+
+class _LinhaGrade:
+    """Visão de uma linha da grade (sem copiar os códigos)."""
+
+    __slots__ = ("_codigos", "_simbolos", "_inicio", "_colunas")
+
+    def __init__(self, codigos, simbolos, inicio, colunas):
+        self._codigos = codigos
+        self._simbolos = simbolos
+        self._inicio = inicio
+        self._colunas = colunas
+
+    def __len__(self):
+        return self._colunas
+
+    def __getitem__(self, j):
+        if not 0 <= j < self._colunas:
+            raise IndexError(j)
+        return self._simbolos[self._codigos[self._inicio + j]]
+
+    def __iter__(self):
+        simbolos = self._simbolos
+        for c in self._codigos[self._inicio:self._inicio + self._colunas]:
+            yield simbolos[c]
+
+
+class GradeCompacta(ComIndice):
+    """Mapa com o terreno codificado num bytearray plano.
+
+    `codigos[i * colunas + j]` é o índice, em `simbolos`, do símbolo da
+    célula (i, j). A grade também se comporta como a matriz de `ler_mapa`
+    (`len(grade)`, `grade[i][j]`, iteração por linhas), de modo que o
+    código que espera uma lista de listas continua funcionando, e tem o
+    mesmo índice de marcadores de `Mapa` (`posicao`, `posicoes`). `editar`
+    troca células mantendo em dia o índice, o motor e a impressão digital.
+    """
+
+    def __init__(self, linhas, colunas, codigos, simbolos, nome="mapa", indice=None,
+                 impressao=None):
+        """Cria a grade a partir dos códigos já prontos.
+
+        `codigos` pode ser um bytearray ou qualquer buffer gravável de bytes
+        (como a visão de um arquivo mapeado). Sem `indice`, os marcadores são
+        localizados varrendo os códigos uma única vez. `impressao` é a
+        impressão digital do conteúdo, se já for conhecida.
+        """
+        if len(codigos) != linhas * colunas:
+            raise ValueError(
+                f"Grade {linhas}x{colunas} precisa de {linhas * colunas} códigos "
+                f"(recebeu {len(codigos)})."
+            )
+        self.linhas = linhas
+        self.colunas = colunas
+        self.codigos = codigos
+        self.simbolos = list(simbolos)
+        self.indice_simbolos = {s: k for k, s in enumerate(self.simbolos)}
+        self._tabelas = {}
+        self._motor = None
+        self._impressao = impressao
+        self.nome = nome
+        self.indice = indice if indice is not None else self._indexar()
+
+    @classmethod
+    def de_matriz(cls, mapa):
+        """Converte uma matriz (lista de listas de símbolos) numa grade compacta."""
+        linhas = len(mapa)
+        colunas = len(mapa[0]) if linhas else 0
+        simbolos = []
+        indice = {}
+        codigos = bytearray(linhas * colunas)
+        pos = 0
+        for i, linha in enumerate(mapa):
+            if len(linha) != colunas:
+                raise ValueError(
+                    f"Linha {i} tem {len(linha)} colunas; esperado {colunas}."
+                )
+            for cel in linha:
+                codigo = indice.get(cel)
+                if codigo is None:
+                    codigo = indice[cel] = len(simbolos)
+                    if codigo >= CODIGO_BORDA:
+                        raise ValueError(
+                            f"A grade compacta suporta no máximo {CODIGO_BORDA} símbolos."
+                        )
+                    simbolos.append(cel)
+                codigos[pos] = codigo
+                pos += 1
+        return cls(
+            linhas, colunas, codigos, simbolos,
+            getattr(mapa, "nome", "mapa"), _copiar_indice(getattr(mapa, "indice", None)),
+        )
+
+    def _indexar(self):
+        """Monta o índice de marcadores procurando cada código de marcador."""
+        indice = {}
+        codigos = bytes(self.codigos)
+        for codigo, simbolo in enumerate(self.simbolos):
+            if simbolo in SIMBOLOS_TERRENO:
+                continue
+            posicoes = []
+            alvo = bytes([codigo])
+            pos = codigos.find(alvo)
+            while pos >= 0:
+                posicoes.append(divmod(pos, self.colunas))
+                pos = codigos.find(alvo, pos + 1)
+            if posicoes:
+                indice[simbolo] = posicoes
+        return indice
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        # Visões de arquivos mapeados não são serializáveis; o motor é refeito no destino
+        estado["codigos"] = bytearray(self.codigos)
+        estado["_motor"] = None
+        return estado
+
+    def __len__(self):
+        return self.linhas
+
+    def __getitem__(self, i):
+        """Retorna uma visão da linha i (compatível com `mapa[i][j]`)."""
+        if not 0 <= i < self.linhas:
+            raise IndexError(i)
+        return _LinhaGrade(self.codigos, self.simbolos, i * self.colunas, self.colunas)
+
+    def __iter__(self):
+        for i in range(self.linhas):
+            yield self[i]
+
+    def simbolo(self, i, j):
+        """Símbolo da célula (i, j)."""
+        return self.simbolos[self.codigos[i * self.colunas + j]]
+
+    def _trocar(self, i, j, simbolo):
+        """Grava o código de `simbolo` na grade e na cópia com borda do motor."""
+        codigo = self.indice_simbolos.get(simbolo)
+        if codigo is None:
+            codigo = len(self.simbolos)
+            if codigo >= CODIGO_BORDA:
+                raise ValueError(f"A grade compacta suporta no máximo {CODIGO_BORDA} símbolos.")
+            self.simbolos.append(simbolo)
+            self.indice_simbolos[simbolo] = codigo
+            # As tabelas de custo só cobrem os símbolos conhecidos quando foram criadas
+            self._tabelas.clear()
+        pos = i * self.colunas + j
+        antigo = self.simbolos[self.codigos[pos]]
+        self.codigos[pos] = codigo
+        if self._motor is not None:
+            self._motor.codigos[(i + 1) * self._motor.largura + j + 1] = codigo
+        self._impressao = None
+        return antigo
+
+    def impressao_digital(self):
+        """Hash SHA-256 do conteúdo, igual ao de `zelda_cache.impressao_digital`."""
+        if self._impressao is None:
+            h = hashlib.sha256()
+            for linha in self:
+                h.update(",".join(linha).encode("utf-8"))
+                h.update(b"\n")
+            self._impressao = h.hexdigest()
+        return self._impressao
+
+    def tabela_custos(self, terrain_costs, walkable=None):
+        """Tabela código -> custo de entrar na célula (None = intransitável).
+
+        Segue as mesmas regras de `a_estrela`: símbolos fora de `walkable`
+        são bloqueados e símbolos sem custo definido custam 9999. A tabela
+        cobre todos os códigos possíveis (os não usados e CODIGO_BORDA são
+        None) e é calculada uma vez por conjunto de custos.
+        """
+        chave = (
+            tuple(sorted(terrain_costs.items())),
+            frozenset(walkable) if walkable else None,
+        )
+        tabela = self._tabelas.get(chave)
+        if tabela is None:
+            tabela = [
+                None if walkable and s not in walkable else terrain_costs.get(s, 9999)
+                for s in self.simbolos
+            ]
+            tabela += [None] * (CODIGO_BORDA + 1 - len(tabela))
+            self._tabelas[chave] = tabela
+        return tabela
+
+    def motor(self):
+        """Motor A* da grade (criado na primeira consulta e reaproveitado)."""
+        if self._motor is None:
+            from zelda_motor import MotorAEstrela  # pylint: disable=import-outside-toplevel
+
+            self._motor = MotorAEstrela(self)
+        return self._motor
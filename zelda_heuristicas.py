@@ -0,0 +1,146 @@
+"""
+Heuristicas plugáveis para o A* do projeto Zelda.
+
+Todas seguem a assinatura `h(pos, goal)` aceita por `a_estrela`:
+
+- `heuristica` (Manhattan pura, comportamento original);
+- `heuristica_escalada` (Manhattan vezes o menor custo de passo, padrão);
+- `HeuristicaALT` (limites inferiores por landmarks pré-calculados);
+- `heuristica_ponderada` (A* ponderado, custo até `peso` vezes o ótimo).
+"""
+
+import time
+
+from zelda_pathfinder import (
+    a_estrela,
+    custos_a_partir_de,
+    heuristica,
+    heuristica_escalada,
+)
+
+
+class HeuristicaALT:
+    """Heurística ALT (A*, Landmarks e desigualdade Triangular).
+
+    Para cada landmark L guarda o custo d(L, x) até todas as células. Pela
+    desigualdade triangular, d(L, goal) - d(L, n) <= d(n, goal). Como o custo
+    de um passo é o da célula de chegada, o caminho inverso de n até L custa
+    d(L, n) + c(L) - c(n), o que dá um segundo limite inferior sem precisar
+    de uma busca no grafo reverso. O resultado é o maior desses limites e
+    da Manhattan escalada, e continua admissível e consistente.
+    """
+
+    def __init__(self, mapa, terrain_costs, walkable=None, quantidade=4, landmarks=None):
+        """Escolhe os landmarks (os mais afastados entre si) e calcula suas distâncias."""
+        self.mapa = mapa
+        self.terrain_costs = terrain_costs
+        self.walkable = walkable
+        self.base = heuristica_escalada(terrain_costs, walkable)
+        self.landmarks = []
+        self.distancias = []
+
+        if landmarks is None:
+            landmarks = self._escolher_landmarks(quantidade)
+        for landmark in landmarks:
+            self._adicionar(landmark)
+
+    def _custo_celula(self, pos):
+        cel = self.mapa[pos[0]][pos[1]]
+        if self.walkable and cel not in self.walkable:
+            return None
+        return self.terrain_costs.get(cel, 9999)
+
+    def _adicionar(self, landmark):
+        self.landmarks.append(landmark)
+        self.distancias.append(
+            custos_a_partir_de(self.mapa, landmark, self.terrain_costs, self.walkable)
+        )
+
+    def _escolher_landmarks(self, quantidade):
+        """Seleção gulosa pelo ponto mais distante dos landmarks já escolhidos."""
+        transitaveis = [
+            (i, j)
+            for i, linha in enumerate(self.mapa)
+            for j, _ in enumerate(linha)
+            if self._custo_celula((i, j)) is not None
+        ]
+        if not transitaveis or quantidade <= 0:
+            return []
+
+        escolhidos = [transitaveis[0]]
+        menor = custos_a_partir_de(self.mapa, escolhidos[0], self.terrain_costs, self.walkable)
+        while len(escolhidos) < quantidade:
+            candidato = max(menor, key=menor.get, default=None)
+            if candidato is None or candidato in escolhidos:
+                break
+            escolhidos.append(candidato)
+            novas = custos_a_partir_de(self.mapa, candidato, self.terrain_costs, self.walkable)
+            menor = {pos: min(d, novas.get(pos, d)) for pos, d in menor.items()}
+        return escolhidos
+
+    def __call__(self, pos, goal):
+        melhor = self.base(pos, goal)
+        c_pos = self._custo_celula(pos)
+        c_goal = self._custo_celula(goal)
+        for landmark, dist in zip(self.landmarks, self.distancias):
+            d_pos = dist.get(pos)
+            d_goal = dist.get(goal)
+            if d_pos is None or d_goal is None:
+                continue
+            # L -> goal passando por pos
+            if d_goal - d_pos > melhor:
+                melhor = d_goal - d_pos
+            # pos -> L -> goal, usando o caminho inverso para d(pos, L) e d(goal, L)
+            if c_pos is not None and c_goal is not None:
+                limite = (d_pos - c_pos) - (d_goal - c_goal)
+                if limite > melhor:
+                    melhor = limite
+        return melhor
+
+
+def heuristica_ponderada(h, peso):
+    """A* ponderado: f = g + peso * h. O custo fica no máximo `peso` vezes o ótimo."""
+    if peso < 1:
+        raise ValueError("O peso do A* ponderado deve ser >= 1.")
+
+    def ponderada(pos, goal):
+        return peso * h(pos, goal)
+
+    return ponderada
+
+
+def comparar_heuristicas(mapa, start, goal, terrain_costs, walkable=None, pesos=(1.5, 2.0)):
+    """Executa o mesmo trecho com cada heurística e compara os nós expandidos.
+
+    Retorna {nome: {"custo", "expandidos", "empilhados", "obsoletos",
+    "heap_maximo", "tempo", "expandidos_relativos"}}, em que
+    "expandidos_relativos" é a fração dos nós expandidos em relação à
+    Manhattan pura (o comportamento original).
+    """
+    escalada = heuristica_escalada(terrain_costs, walkable)
+    candidatas = {
+        "manhattan": heuristica,
+        "manhattan-escalada": escalada,
+        "alt": HeuristicaALT(mapa, terrain_costs, walkable),
+    }
+    for peso in pesos:
+        candidatas[f"ponderada-{peso:g}"] = heuristica_ponderada(escalada, peso)
+
+    resultados = {}
+    for nome, h in candidatas.items():
+        estatisticas = {}
+        inicio = time.perf_counter()
+        _, custo = a_estrela(mapa, start, goal, terrain_costs, walkable, h, estatisticas)
+        resultados[nome] = {
+            "custo": custo,
+            "expandidos": estatisticas["expandidos"],
+            "empilhados": estatisticas["empilhados"],
+            "obsoletos": estatisticas["obsoletos"],
+            "heap_maximo": estatisticas["heap_maximo"],
+            "tempo": time.perf_counter() - inicio,
+        }
+
+    referencia = resultados["manhattan"]["expandidos"] or 1
+    for resultado in resultados.values():
+        resultado["expandidos_relativos"] = resultado["expandidos"] / referencia
+    return resultados
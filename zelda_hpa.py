@@ -0,0 +1,425 @@
+"""
+Busca hierárquica (HPA*) para mapas grandes do projeto Zelda.
+
+O mapa é dividido em clusters quadrados. Em cada fronteira entre dois
+clusters vizinhos, cada trecho contínuo de pares de células transitáveis
+vira uma ou duas transições (no meio do trecho, ou nas pontas se ele for
+longo); as duas células de uma transição são nós do grafo abstrato. Dentro
+de cada cluster, o custo entre cada par de nós é calculado uma vez, com
+uma busca restrita ao cluster.
+
+Uma consulta liga `start` e `goal` aos nós dos seus clusters, busca no
+grafo abstrato (pequeno) e refina cada aresta escolhida no caminho de
+células. O resultado é um caminho válido cujo custo pode ficar um pouco
+acima do ótimo, pois ele precisa passar pelas transições escolhidas.
+
+Como no A*, o custo de um passo é o da célula de chegada; arestas
+abstratas são direcionadas (a -> b custa c(b), b -> a custa c(a)).
+"""
+
+import heapq
+import json
+import time
+
+from zelda_cache import impressao_digital
+from zelda_motor import somar_estatisticas
+from zelda_pathfinder import custo_minimo
+
+# Trechos de fronteira com pelo menos esse tamanho ganham duas transições
+TRECHO_LONGO = 6
+
+
+class AbstracaoHPA:
+    """Grafo abstrato de um mapa para uma tabela de custos.
+
+    `nos` de cada cluster, arestas `inter` (entre células vizinhas de
+    clusters diferentes) e `intra` (custos dentro de um cluster) são
+    calculados no construtor. Depois de editar células do mapa (no próprio
+    objeto passado ao construtor), chame `atualizar` com as posições
+    alteradas.
+    """
+
+    def __init__(self, mapa, terrain_costs, walkable=None, tamanho_cluster=16):
+        """Divide o mapa em clusters e calcula o grafo abstrato."""
+        self._preparar(mapa, terrain_costs, walkable, tamanho_cluster)
+        for borda in self._todas_bordas():
+            self._criar_borda(borda)
+        for cluster in self._todos_clusters():
+            self._calcular_intra(cluster)
+
+    def _preparar(self, mapa, terrain_costs, walkable, tamanho_cluster):
+        """Inicializa os atributos com o grafo abstrato vazio."""
+        if tamanho_cluster < 2:
+            raise ValueError("tamanho_cluster deve ser pelo menos 2.")
+        self.mapa = mapa
+        self.terrain_costs = terrain_costs
+        self.walkable = walkable
+        self.tamanho_cluster = tamanho_cluster
+        self.linhas = len(mapa)
+        self.colunas = len(mapa[0]) if self.linhas else 0
+        self.clusters_linhas = -(-self.linhas // tamanho_cluster)
+        self.clusters_colunas = -(-self.colunas // tamanho_cluster)
+        self.fator = custo_minimo(terrain_costs, walkable)
+        # custos[i][j]: custo de pisar na célula, ou None se não for transitável
+        self.custos = [[self._custo_celula(cel) for cel in linha] for linha in mapa]
+        # inter[a] = {b: custo}; intra[cluster][a] = {b: custo}
+        self.inter = {}
+        self.intra = {}
+        # bordas[(c1, c2)] = pares (a, b) de transições da fronteira c1 | c2
+        self.bordas = {}
+
+    # --- Estrutura dos clusters ---
+
+    def cluster(self, pos):
+        """Cluster (ci, cj) que contém a posição."""
+        return pos[0] // self.tamanho_cluster, pos[1] // self.tamanho_cluster
+
+    def _limites(self, cluster):
+        """(linha inicial, linha final, coluna inicial, coluna final) do cluster."""
+        t = self.tamanho_cluster
+        ci, cj = cluster
+        return (ci * t, min((ci + 1) * t, self.linhas),
+                cj * t, min((cj + 1) * t, self.colunas))
+
+    def _vizinhanca(self, cluster):
+        """Limites do bloco formado pelo cluster e pelos seus 8 vizinhos."""
+        ci, cj = cluster
+        l0, _, c0, _ = self._limites((max(ci - 1, 0), max(cj - 1, 0)))
+        _, l1, _, c1 = self._limites((min(ci + 1, self.clusters_linhas - 1),
+                                      min(cj + 1, self.clusters_colunas - 1)))
+        return l0, l1, c0, c1
+
+    def _nos_em(self, limites):
+        """Nós abstratos dentro de `limites`."""
+        l0, l1, c0, c1 = limites
+        t = self.tamanho_cluster
+        nos = []
+        for ci in range(l0 // t, -(-l1 // t)):
+            for cj in range(c0 // t, -(-c1 // t)):
+                nos += self.nos((ci, cj))
+        return nos
+
+    def _todos_clusters(self):
+        return [(ci, cj) for ci in range(self.clusters_linhas)
+                for cj in range(self.clusters_colunas)]
+
+    def _todas_bordas(self):
+        bordas = []
+        for ci, cj in self._todos_clusters():
+            if ci + 1 < self.clusters_linhas:
+                bordas.append(((ci, cj), (ci + 1, cj)))
+            if cj + 1 < self.clusters_colunas:
+                bordas.append(((ci, cj), (ci, cj + 1)))
+        return bordas
+
+    def _vizinhos_cluster(self, cluster):
+        ci, cj = cluster
+        for vizinho in ((ci - 1, cj), (ci + 1, cj), (ci, cj - 1), (ci, cj + 1)):
+            if 0 <= vizinho[0] < self.clusters_linhas and 0 <= vizinho[1] < self.clusters_colunas:
+                yield vizinho
+
+    def nos(self, cluster):
+        """Nós abstratos (células de transição) de um cluster."""
+        return list(self.intra.get(cluster, ()))
+
+    def _custo_celula(self, cel):
+        if self.walkable and cel not in self.walkable:
+            return None
+        return self.terrain_costs.get(cel, 9999)
+
+    def _custo(self, pos):
+        """Custo de pisar em `pos`, ou None se ela não for transitável."""
+        return self.custos[pos[0]][pos[1]]
+
+    # --- Construção ---
+
+    def _criar_borda(self, borda):
+        """Encontra as transições da fronteira entre dois clusters vizinhos."""
+        (ci, cj), (di, dj) = borda
+        l0, l1, c0, c1 = self._limites((ci, cj))
+        if di > ci:
+            # Fronteira horizontal: última linha de um, primeira do outro
+            pares = [((l1 - 1, j), (l1, j)) for j in range(c0, c1)]
+        else:
+            pares = [((i, c1 - 1), (i, c1)) for i in range(l0, l1)]
+
+        # Trechos contínuos de pares transitáveis com os mesmos custos
+        transicoes = []
+        trecho = []
+        anterior = None
+        for a, b in pares + [(None, None)]:
+            custos = (self._custo(a), self._custo(b)) if a is not None else (None, None)
+            if None in custos or custos != anterior:
+                if trecho:
+                    if len(trecho) >= TRECHO_LONGO:
+                        transicoes += [trecho[0], trecho[-1]]
+                    else:
+                        transicoes.append(trecho[len(trecho) // 2])
+                trecho = []
+            if None not in custos:
+                trecho.append((a, b))
+            anterior = custos
+
+        self.bordas[borda] = transicoes
+        for a, b in transicoes:
+            self.inter.setdefault(a, {})[b] = self._custo(b)
+            self.inter.setdefault(b, {})[a] = self._custo(a)
+
+    def _remover_borda(self, borda):
+        for a, b in self.bordas.pop(borda, ()):
+            for x, y in ((a, b), (b, a)):
+                vizinhos = self.inter.get(x)
+                if vizinhos is not None:
+                    vizinhos.pop(y, None)
+                    if not vizinhos:
+                        del self.inter[x]
+
+    def _dijkstra(self, origem, limites, alvos=None, reverso=False):
+        """Dijkstra dentro de `limites`; retorna (g, pais).
+
+        Para quando todos os `alvos` forem fechados; com um único alvo, vira
+        um A* guiado pela Manhattan até ele. Com `reverso`, g[u] é o custo
+        de u *até* `origem`; como cada passo custa a célula de chegada, a
+        própria `origem` precisa ser transitável.
+        """
+        l0, l1, c0, c1 = limites
+        custos = self.custos
+        fator = 0
+        tx = ty = 0
+        if alvos is not None and len(alvos) == 1 and not reverso:
+            fator = self.fator
+            (tx, ty), = alvos
+        g = {origem: 0}
+        pais = {origem: None}
+        fechados = set()
+        pendentes = set(alvos) if alvos is not None else None
+        open_set = [(0, 0, origem)]
+        while open_set and (pendentes is None or pendentes):
+            _, g_atual, atual = heapq.heappop(open_set)
+            if atual in fechados:
+                continue
+            fechados.add(atual)
+            if pendentes is not None:
+                pendentes.discard(atual)
+            if reverso:
+                # Entrar em `atual` custa c(atual), pago por quem vem de fora
+                passo_reverso = custos[atual[0]][atual[1]]
+                if passo_reverso is None:
+                    continue
+            x, y = atual
+            for vizinho in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                vx, vy = vizinho
+                if not (l0 <= vx < l1 and c0 <= vy < c1):
+                    continue
+                passo = custos[vx][vy]
+                if passo is None:
+                    continue
+                if reverso:
+                    passo = passo_reverso
+                novo_g = g_atual + passo
+                if novo_g < g.get(vizinho, float("inf")):
+                    g[vizinho] = novo_g
+                    pais[vizinho] = atual
+                    h = fator * (abs(vx - tx) + abs(vy - ty))
+                    heapq.heappush(open_set, (novo_g + h, novo_g, vizinho))
+        return g, pais
+
+    def _calcular_intra(self, cluster):
+        """Custos entre todos os pares de nós de um cluster."""
+        nos = set()
+        for vizinho in self._vizinhos_cluster(cluster):
+            for par in self.bordas.get(tuple(sorted((cluster, vizinho))), ()):
+                nos.update(n for n in par if self.cluster(n) == cluster)
+        limites = self._limites(cluster)
+        arestas = {}
+        for no in nos:
+            g, _ = self._dijkstra(no, limites, nos)
+            arestas[no] = {outro: g[outro] for outro in nos if outro != no and outro in g}
+        if arestas:
+            self.intra[cluster] = arestas
+        else:
+            self.intra.pop(cluster, None)
+
+    def atualizar(self, celulas):
+        """Recalcula a abstração depois de alterar as células `celulas` do mapa.
+
+        Só são refeitas as fronteiras dos clusters alterados e os custos
+        internos desses clusters e dos seus vizinhos.
+        """
+        for i, j in celulas:
+            self.custos[i][j] = self._custo_celula(self.mapa[i][j])
+        alterados = {self.cluster(pos) for pos in celulas}
+        bordas = {
+            tuple(sorted((cluster, vizinho)))
+            for cluster in alterados
+            for vizinho in self._vizinhos_cluster(cluster)
+        }
+        for borda in bordas:
+            self._remover_borda(borda)
+            self._criar_borda(borda)
+        for cluster in alterados | {c for borda in bordas for c in borda}:
+            self._calcular_intra(cluster)
+
+    # --- Consulta ---
+
+    def buscar(self, start, goal, estatisticas=None):
+        """Retorna (caminho, custo) de start até goal, ou (None, inf).
+
+        `estatisticas` recebe os contadores da busca no grafo abstrato.
+        """
+        if not (0 <= start[0] < self.linhas and 0 <= start[1] < self.colunas
+                and 0 <= goal[0] < self.linhas and 0 <= goal[1] < self.colunas):
+            return None, float("inf")
+        if start == goal:
+            return [start], 0
+
+        inicio = time.perf_counter()
+        # Liga start e goal aos nós do seu cluster e dos clusters vizinhos
+        # (start pode nem ser transitável e sair direto para outro cluster)
+        limites_start = self._vizinhanca(self.cluster(start))
+        limites_goal = self._vizinhanca(self.cluster(goal))
+        g_start, pais_start = self._dijkstra(start, limites_start)
+        saidas = {n: g_start[n] for n in self._nos_em(limites_start)
+                  if n in g_start and n != start}
+        g_goal, _ = self._dijkstra(goal, limites_goal, reverso=True)
+        chegadas = {n: g_goal[n] for n in self._nos_em(limites_goal) if n in g_goal}
+        direto = g_start.get(goal, float("inf"))
+
+        gx, gy = goal
+        g = {start: 0}
+        pais = {start: None}
+        fechados = set()
+        open_set = [(0, 0, start)]
+        expandidos = 0
+        empilhados = 1
+        obsoletos = 0
+        heap_maximo = 1
+        while open_set:
+            _, _, atual = heapq.heappop(open_set)
+            if atual in fechados:
+                obsoletos += 1
+                continue
+            if atual == goal:
+                break
+            fechados.add(atual)
+            expandidos += 1
+
+            if atual == start:
+                arestas = list(saidas.items()) + list(self.inter.get(start, {}).items())
+            else:
+                arestas = list(self.intra[self.cluster(atual)][atual].items())
+                arestas += self.inter.get(atual, {}).items()
+                if atual in chegadas:
+                    arestas.append((goal, chegadas[atual]))
+            for vizinho, custo in arestas:
+                if vizinho in fechados:
+                    continue
+                novo_g = g[atual] + custo
+                if novo_g < g.get(vizinho, float("inf")):
+                    g[vizinho] = novo_g
+                    pais[vizinho] = atual
+                    h = self.fator * (abs(vizinho[0] - gx) + abs(vizinho[1] - gy))
+                    heapq.heappush(open_set, (novo_g + h, -novo_g, vizinho))
+                    empilhados += 1
+                    if len(open_set) > heap_maximo:
+                        heap_maximo = len(open_set)
+        somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                           time.perf_counter() - inicio)
+
+        custo = g.get(goal, float("inf"))
+        if direto <= custo:
+            if direto == float("inf"):
+                return None, float("inf")
+            return self._caminho(pais_start, goal), direto
+
+        abstrato = []
+        no = goal
+        while no is not None:
+            abstrato.append(no)
+            no = pais[no]
+        abstrato.reverse()
+        return self._refinar(abstrato, pais_start, limites_goal), custo
+
+    def _caminho(self, pais, destino):
+        caminho = []
+        while destino is not None:
+            caminho.append(destino)
+            destino = pais[destino]
+        caminho.reverse()
+        return caminho
+
+    def _refinar(self, abstrato, pais_start, limites_goal):
+        """Transforma o caminho abstrato no caminho de células."""
+        start, goal = abstrato[0], abstrato[-1]
+        caminho = [start]
+        for a, b in zip(abstrato, abstrato[1:]):
+            if a == start:
+                pais = pais_start
+            elif b == goal and not (a in self.inter and goal in self.inter[a]):
+                _, pais = self._dijkstra(a, limites_goal, (goal,))
+            elif self.cluster(a) != self.cluster(b):
+                caminho.append(b)
+                continue
+            else:
+                _, pais = self._dijkstra(a, self._limites(self.cluster(a)), (b,))
+            caminho += self._caminho(pais, b)[1:]
+        return caminho
+
+    # --- Serialização ---
+
+    def para_dict(self):
+        """Representação serializável em JSON da abstração."""
+        return {
+            "versao": 1,
+            "impressao": impressao_digital(self.mapa),
+            "tamanho_cluster": self.tamanho_cluster,
+            "terrain_costs": self.terrain_costs,
+            "walkable": sorted(self.walkable) if self.walkable else None,
+            "bordas": [
+                [list(c1), list(c2), [[list(a), list(b)] for a, b in pares]]
+                for (c1, c2), pares in self.bordas.items()
+            ],
+            "intra": [
+                [list(a), list(b), custo]
+                for arestas in self.intra.values()
+                for a, destinos in arestas.items()
+                for b, custo in destinos.items()
+            ],
+        }
+
+    @classmethod
+    def de_dict(cls, mapa, dados):
+        """Reconstrói a abstração salva por `para_dict` para o mesmo mapa.
+
+        Lança ValueError se o conteúdo do mapa mudou desde que ela foi salva.
+        """
+        if dados.get("versao") != 1:
+            raise ValueError("Versão de abstração HPA* desconhecida.")
+        if impressao_digital(mapa) != dados["impressao"]:
+            raise ValueError("A abstração HPA* foi calculada para outro conteúdo de mapa.")
+        walkable = set(dados["walkable"]) if dados["walkable"] is not None else None
+        abstracao = cls.__new__(cls)
+        abstracao._preparar(mapa, dados["terrain_costs"], walkable, dados["tamanho_cluster"])
+        for c1, c2, pares in dados["bordas"]:
+            transicoes = [(tuple(a), tuple(b)) for a, b in pares]
+            abstracao.bordas[(tuple(c1), tuple(c2))] = transicoes
+            for a, b in transicoes:
+                abstracao.inter.setdefault(a, {})[b] = abstracao._custo(b)
+                abstracao.inter.setdefault(b, {})[a] = abstracao._custo(a)
+        for a, b, custo in dados["intra"]:
+            a, b = tuple(a), tuple(b)
+            abstracao.intra.setdefault(abstracao.cluster(a), {}).setdefault(a, {})[b] = custo
+        for no in abstracao.inter:
+            abstracao.intra.setdefault(abstracao.cluster(no), {}).setdefault(no, {})
+        return abstracao
+
+    def salvar(self, caminho):
+        """Grava a abstração em JSON."""
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.para_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def carregar(cls, mapa, caminho):
+        """Lê uma abstração gravada por `salvar` para `mapa`."""
+        with open(caminho, "r", encoding="utf-8") as f:
+            return cls.de_dict(mapa, json.load(f))
@@ -0,0 +1,358 @@
+"""
+Replanejamento incremental (LPA*) do projeto Zelda.
+
+Cada trecho da missão guarda o estado da sua busca (g, rhs e a fila de
+células inconsistentes). Quando uma célula muda de terreno, só os custos
+das arestas que *chegam* nela mudam (cada passo custa a célula de chegada),
+então basta recalcular o rhs dela; a busca seguinte corrige apenas as
+células cujo custo mínimo realmente mudou, em vez de refazer o trecho
+inteiro. Edições longe de um trecho custam uma consulta à fila.
+
+`PlanejadorIncremental` mantém todos os trechos do mapa principal e de
+cada masmorra, aplica edições de células e informa quais trechos e se a
+ordem das masmorras mudaram:
+
+    planejador = PlanejadorIncremental(mapa, masmorras)
+    mudancas = planejador.editar({(12, 30): "G"})   # ponte: A -> G
+    mudancas["trechos"], mudancas["ordem_alterada"]
+"""
+
+import heapq
+import time
+from collections import deque
+from collections.abc import Mapping
+
+from zelda_motor import somar_estatisticas
+from zelda_pathfinder import (
+    CUSTOS_MASMORRA,
+    RE_ENTRADA_MASMORRA,
+    WALKABLE_MASMORRA,
+    com_indice,
+    custo_minimo,
+    custos_mapa_principal,
+    montar_missao,
+    montar_solucao_masmorra,
+    pontos_masmorra,
+)
+
+
+class BuscaIncremental:
+    """LPA* de `start` até `goal` que se repara depois de edições no mapa.
+
+    `calcular` retorna (caminho, custo) ou (None, inf), como `a_estrela`.
+    Depois de alterar células do mapa, passe as posições para `notificar` e
+    chame `calcular` de novo.
+    """
+
+    def __init__(self, mapa, start, goal, terrain_costs, walkable=None):
+        """Prepara a busca; nada é calculado até a primeira chamada a `calcular`."""
+        self.mapa = mapa
+        self.start = start
+        self.goal = goal
+        self.terrain_costs = terrain_costs
+        self.walkable = walkable
+        self.linhas = len(mapa)
+        self.colunas = len(mapa[0]) if self.linhas else 0
+        self.fator = custo_minimo(terrain_costs, walkable)
+        self.caminho = None
+        self.custo = float("inf")
+        self.empilhados = 0
+        self._valido = self._dentro(start) and self._dentro(goal)
+        self._reiniciar()
+
+    def _reiniciar(self):
+        """Descarta o estado da busca; o próximo `calcular` refaz o trecho inteiro."""
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.open_set = [(self._chave(self.start), self.start)]
+        self.empilhados += 1
+        # Células do caminho atual (e o goal): só corrigir uma delas muda o caminho
+        self._no_caminho = None
+
+    def _dentro(self, pos):
+        return 0 <= pos[0] < self.linhas and 0 <= pos[1] < self.colunas
+
+    def _custo(self, pos):
+        """Custo de pisar em `pos`, ou None se ela não for transitável."""
+        cel = self.mapa[pos[0]][pos[1]]
+        if self.walkable and cel not in self.walkable:
+            return None
+        return self.terrain_costs.get(cel, 9999)
+
+    def _vizinhos(self, pos):
+        x, y = pos
+        for vizinho in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if self._dentro(vizinho):
+                yield vizinho
+
+    def _chave(self, pos):
+        """(min(g, rhs) + h, min(g, rhs)): ordem de correção das células."""
+        m = min(self.g.get(pos, float("inf")), self.rhs.get(pos, float("inf")))
+        h = self.fator * (abs(pos[0] - self.goal[0]) + abs(pos[1] - self.goal[1]))
+        return m + h, m
+
+    def _atualizar_no(self, pos):
+        """Recalcula rhs(pos) e recoloca a célula na fila se ficou inconsistente."""
+        g = self.g
+        if pos != self.start:
+            custo = self._custo(pos)
+            rhs = None
+            if custo is not None:
+                # Células fora do mapa nunca têm g, então não precisam ser filtradas
+                x, y = pos
+                for vizinho in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                    g_vizinho = g.get(vizinho)
+                    if g_vizinho is not None and (rhs is None or g_vizinho + custo < rhs):
+                        rhs = g_vizinho + custo
+            if rhs is None:
+                self.rhs.pop(pos, None)
+            else:
+                self.rhs[pos] = rhs
+        if g.get(pos) != self.rhs.get(pos):
+            heapq.heappush(self.open_set, (self._chave(pos), pos))
+            self.empilhados += 1
+
+    def notificar(self, celulas):
+        """Informa as células cujo terreno mudou desde o último `calcular`."""
+        for pos in celulas:
+            if self._dentro(pos):
+                self._atualizar_no(pos)
+
+    def calcular(self, estatisticas=None):
+        """Corrige as células afetadas e retorna (caminho, custo).
+
+        `estatisticas` recebe os contadores desta correção (ver
+        `zelda_motor.somar_estatisticas`); "expandidos" conta as células
+        corrigidas, que são zero quando a edição não afeta o trecho.
+
+        O reparo supõe passos de custo positivo. Com terrenos de custo 0, um
+        platô que perdeu a ligação com o start pode continuar apoiando o
+        próprio g; quando o caminho não chega ao start, a busca é refeita do
+        zero.
+        """
+        if not self._valido:
+            return None, float("inf")
+        inicio = time.perf_counter()
+        g, rhs, open_set, goal = self.g, self.rhs, self.open_set, self.goal
+        inf = float("inf")
+        no_caminho = self._no_caminho
+        refazer = no_caminho is None
+        expandidos = obsoletos = 0
+        empilhados = self.empilhados
+        heap_maximo = len(open_set)
+        # Células empatadas com o goal também são corrigidas: com passos de
+        # custo 0, uma delas pode ainda sustentar o g do goal
+        while open_set and (open_set[0][0] <= self._chave(goal)
+                            or g.get(goal, inf) != rhs.get(goal, inf)):
+            chave, atual = heapq.heappop(open_set)
+            g_atual, rhs_atual = g.get(atual, inf), rhs.get(atual, inf)
+            # Entradas antigas: a célula já foi corrigida ou mudou de chave
+            if g_atual == rhs_atual or chave != self._chave(atual):
+                obsoletos += 1
+                continue
+            expandidos += 1
+            if not refazer and atual in no_caminho:
+                refazer = True
+            if g_atual > rhs_atual:
+                g[atual] = rhs_atual
+            else:
+                g.pop(atual, None)
+                self._atualizar_no(atual)
+            for vizinho in self._vizinhos(atual):
+                self._atualizar_no(vizinho)
+            if len(open_set) > heap_maximo:
+                heap_maximo = len(open_set)
+
+        trecho = self._reconstruir() if refazer else (self.caminho, self.custo)
+        somar_estatisticas(estatisticas, expandidos, self.empilhados - empilhados, obsoletos,
+                           heap_maximo, time.perf_counter() - inicio)
+        if trecho is None:
+            self._reiniciar()
+            return self.calcular(estatisticas)
+        if refazer:
+            self.caminho, self.custo = trecho
+            self._no_caminho = set(self.caminho or ()) | {goal}
+        return self.caminho, self.custo
+
+    def _reconstruir(self):
+        """Caminho de menor custo, do goal até o start pelos predecessores válidos.
+
+        Retorna (caminho, custo), (None, inf) se o goal for inalcançável, ou
+        None se algum g não levar de volta ao start.
+        """
+        custo = self.g.get(self.goal, float("inf"))
+        if custo == float("inf"):
+            return None, float("inf")
+        caminho = [self.goal]
+        while caminho[-1] != self.start:
+            trecho = self._descer(caminho[-1])
+            if trecho is None:
+                return None
+            caminho.extend(trecho)
+        caminho.reverse()
+        return caminho, custo
+
+    def _descer(self, pos):
+        """Células depois de `pos`, rumo ao start, até uma de g menor (ou o start).
+
+        Um vizinho u precede v quando g(u) + custo(v) == g(v). Em platôs de
+        passos de custo 0, vários vizinhos têm o mesmo g e podem apontar uns
+        para os outros; a busca em largura pelo platô acha a saída sem andar
+        em círculos (como `zelda_campo.CampoCustos._descer`). Retorna None se
+        o platô não tiver saída.
+        """
+        g = self.g
+        anterior = {pos: None}
+        fila = deque([pos])
+        while fila:
+            v = fila.popleft()
+            g_v = g[v]
+            custo = self._custo(v)
+            for u in self._vizinhos(v):
+                g_u = g.get(u)
+                if u in anterior or g_u is None or g_u + custo != g_v:
+                    continue
+                anterior[u] = v
+                if g_u < g_v or u == self.start:
+                    trecho = [u]
+                    while anterior[trecho[-1]] != pos:
+                        trecho.append(anterior[trecho[-1]])
+                    trecho.reverse()
+                    return trecho
+                fila.append(u)
+        return None
+
+
+class PlanejadorIncremental:
+    """Missão completa mantida por buscas incrementais.
+
+    Guarda uma `BuscaIncremental` para cada trecho do mapa principal que
+    alguma ordem pode usar e uma para cada masmorra (Entrada -> Pingente).
+    `resultado` tem o mesmo formato de `planejar_missao`. As edições passam
+    por `editar` (mapa principal) e `editar_masmorra`, que aplicam as
+    mudanças com `editar` do próprio mapa (ver `zelda_indice.ComIndice`).
+    """
+
+    def __init__(self, mapa, masmorras, modo_ordenacao="auto"):
+        """Resolve a missão uma vez, guardando o estado de cada trecho.
+
+        `mapa` e as masmorras precisam ser `Mapa` ou `GradeCompacta`.
+        """
+        if not isinstance(masmorras, Mapping):
+            masmorras = dict(enumerate(masmorras, start=1))
+        self.mapa = mapa
+        self.masmorras = dict(masmorras)
+        self.modo_ordenacao = modo_ordenacao
+        self.ids = sorted(self.masmorras)
+        self.custos_mapa = custos_mapa_principal(self.ids)
+        self.trechos = {}
+        self.matriz = {}
+        self.buscas_masmorras = {}
+        self.trechos_masmorras = {}
+        self._montar_trechos()
+        for k in self.ids:
+            self._montar_masmorra(k)
+        self.resultado = self._montar()
+
+    def _pontos(self):
+        """Nomes e posições dos pontos da missão: L, M<k> (na ordem de ids) e LW."""
+        indexado = com_indice(self.mapa)
+        entradas = indexado.marcadores(RE_ENTRADA_MASMORRA)
+        faltando = [f"M{k}" for k in self.ids if k not in entradas]
+        if faltando:
+            raise ValueError(f"Erro: Não foi possível encontrar as entradas {', '.join(faltando)} "
+                             "no Mapa.txt.")
+        return (
+            [("L", indexado.posicao("L"))]
+            + [(f"M{k}", entradas[k]) for k in self.ids]
+            + [("LW", indexado.posicao("LW"))]
+        )
+
+    def _montar_trechos(self):
+        """Cria as buscas de todos os trechos (os mesmos de `calcular_matriz_trechos`)."""
+        self.pontos = self._pontos()
+        n = len(self.ids)
+        self.trechos = {}
+        for origem in range(n + 1):
+            for destino in range(1, n + 2):
+                if destino == origem or (origem == 0 and destino == n + 1 and n > 0):
+                    continue
+                self.trechos[(origem, destino)] = BuscaIncremental(
+                    self.mapa, self.pontos[origem][1], self.pontos[destino][1],
+                    self.custos_mapa,
+                )
+
+    def _montar_masmorra(self, k):
+        masmorra = self.masmorras[k]
+        entrada, pingente = pontos_masmorra(masmorra)
+        self.buscas_masmorras[k] = BuscaIncremental(
+            masmorra, entrada, pingente, CUSTOS_MASMORRA, WALKABLE_MASMORRA
+        )
+
+    def _montar(self, estatisticas=None):
+        """Atualiza os trechos e monta o resultado da missão (None se inviável)."""
+        for par, busca in self.trechos.items():
+            self.matriz[par] = busca.calcular(estatisticas)
+        solucoes = []
+        for k in self.ids:
+            busca = self.buscas_masmorras[k]
+            self.trechos_masmorras[k] = busca.calcular(estatisticas)
+            solucoes.append(montar_solucao_masmorra(
+                self.masmorras[k], busca.start, busca.goal, self.trechos_masmorras[k]
+            ))
+        if any(s is None for s in solucoes):
+            return None
+        return montar_missao(self.ids, solucoes, self.matriz, self.modo_ordenacao)
+
+    def editar(self, edicoes, estatisticas=None):
+        """Aplica edições {(i, j): símbolo} ao mapa principal e replaneja.
+
+        Retorna um dicionário com "trechos" (pares de pontos, como
+        ("L", "M1"), cujo caminho ou custo mudou), "masmorras" (ids das
+        masmorras cuja solução mudou), "ordem_alterada", "ordem_anterior",
+        "resultado" (o novo `resultado`) e "tempo". Se a edição mover algum ponto da
+        missão, os trechos são recriados do zero.
+        """
+        inicio = time.perf_counter()
+        alteradas = self.mapa.editar(edicoes)
+        if alteradas and self._pontos() != self.pontos:
+            self._montar_trechos()
+        else:
+            for busca in self.trechos.values():
+                busca.notificar(alteradas)
+        return self._replanejar(inicio, estatisticas)
+
+    def editar_masmorra(self, k, edicoes, estatisticas=None):
+        """Aplica edições à masmorra k e replaneja; retorna o mesmo que `editar`."""
+        inicio = time.perf_counter()
+        masmorra = self.masmorras[k]
+        busca = self.buscas_masmorras[k]
+        alteradas = masmorra.editar(edicoes)
+        if alteradas and pontos_masmorra(masmorra) != (busca.start, busca.goal):
+            self._montar_masmorra(k)
+        else:
+            busca.notificar(alteradas)
+        return self._replanejar(inicio, estatisticas)
+
+    def _replanejar(self, inicio, estatisticas):
+        matriz_anterior = dict(self.matriz)
+        masmorras_anteriores = dict(self.trechos_masmorras)
+        anterior = self.resultado
+        self.resultado = self._montar(estatisticas)
+
+        nomes = [nome for nome, _ in self.pontos]
+        ordem_anterior = anterior["ordem"] if anterior else None
+        return {
+            "trechos": [
+                (nomes[a], nomes[b]) for (a, b), trecho in self.matriz.items()
+                if matriz_anterior.get((a, b)) != trecho
+            ],
+            "masmorras": [
+                k for k, trecho in self.trechos_masmorras.items()
+                if masmorras_anteriores.get(k) != trecho
+            ],
+            "ordem_alterada": ordem_anterior != (self.resultado["ordem"] if self.resultado else None),
+            "ordem_anterior": ordem_anterior,
+            "resultado": self.resultado,
+            "tempo": time.perf_counter() - inicio,
+        }
@@ -0,0 +1,91 @@
+"""
+Índice de pontos de interesse dos mapas do projeto Zelda.
+
+Marcadores (L, LW, M1, E, P, ...) são todos os símbolos que não são um
+terreno comum. O índice símbolo -> posições é montado uma única vez, na
+leitura do mapa, e todas as buscas por marcadores passam por ele.
+"""
+
+from bisect import insort
+
+# Terrenos comuns: aparecem em grande quantidade e não são indexados
+SIMBOLOS_TERRENO = frozenset({"G", "S", "F", "M", "A", "X", "CC"})
+
+
+class ComIndice:
+    """Consulta de marcadores para mapas com um atributo `indice`.
+
+    `indice` é um dicionário símbolo -> lista de posições (i, j) e `nome`
+    identifica o mapa nas mensagens de erro. Para `editar`, a subclasse
+    implementa `_trocar(i, j, simbolo)`, que grava o símbolo na célula e
+    retorna o anterior.
+    """
+
+    indice = None
+    nome = "mapa"
+
+    def posicoes(self, simbolo):
+        """Todas as posições do marcador `simbolo` (lista vazia se não houver)."""
+        return list(self.indice.get(simbolo, ()))
+
+    def posicao(self, simbolo):
+        """Posição única do marcador `simbolo`.
+
+        Lança ValueError se o marcador não existir ou aparecer mais de uma vez.
+        """
+        encontradas = self.indice.get(simbolo, ())
+        if not encontradas:
+            raise ValueError(f"Marcador '{simbolo}' não encontrado em {self.nome}.")
+        if len(encontradas) > 1:
+            lista = ", ".join(str(list(p)) for p in encontradas[:5])
+            raise ValueError(
+                f"Marcador '{simbolo}' aparece {len(encontradas)} vezes em {self.nome} "
+                f"({lista}); esperado apenas um."
+            )
+        return encontradas[0]
+
+    def marcadores(self, padrao):
+        """{grupo numérico: posição} dos marcadores que casam com a regex `padrao`.
+
+        Usado para as entradas `M<k>`; cada marcador precisa ser único.
+        """
+        encontrados = {}
+        for simbolo in self.indice:
+            achou = padrao.fullmatch(simbolo)
+            if achou:
+                encontrados[int(achou.group(1))] = self.posicao(simbolo)
+        return encontrados
+
+    def editar(self, edicoes):
+        """Troca o símbolo de células do mapa, mantendo o índice em dia.
+
+        `edicoes` é um dicionário {(i, j): símbolo} ou uma sequência de
+        pares ((i, j), símbolo). Retorna a lista das posições que realmente
+        mudaram, na ordem das edições. Lança ValueError para posições fora
+        do mapa.
+        """
+        if hasattr(edicoes, "items"):
+            edicoes = edicoes.items()
+        alteradas = []
+        for (i, j), simbolo in edicoes:
+            if not (0 <= i < len(self) and 0 <= j < len(self[i])):
+                raise ValueError(f"Posição {(i, j)} fora de {self.nome}.")
+            antigo = self._trocar(i, j, simbolo)
+            if antigo == simbolo:
+                continue
+            if antigo not in SIMBOLOS_TERRENO:
+                posicoes = self.indice[antigo]
+                posicoes.remove((i, j))
+                if not posicoes:
+                    del self.indice[antigo]
+            if simbolo not in SIMBOLOS_TERRENO:
+                insort(self.indice.setdefault(simbolo, []), (i, j))
+            alteradas.append((i, j))
+        return alteradas
+
+
+def indexar_linha(indice, i, linha):
+    """Acrescenta ao `indice` os marcadores da linha i."""
+    for j, cel in enumerate(linha):
+        if cel not in SIMBOLOS_TERRENO:
+            indice.setdefault(cel, []).append((i, j))
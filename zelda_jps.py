@@ -0,0 +1,175 @@
+"""
+Jump Point Search (JPS) para grades de custo uniforme do projeto Zelda.
+
+Nas masmorras todo terreno transitável (CC, P, E) custa MASMORRA_COST, e
+em grades de custo uniforme há muitos caminhos ótimos equivalentes que só
+trocam a ordem dos passos. O JPS considera um único deles (o canônico) e
+salta em linha reta sobre as células intermediárias, empilhando apenas os
+"pontos de salto".
+
+Versão para 4 vizinhos: um trecho vertical pode virar para os lados em
+qualquer célula, mas um trecho horizontal só termina no objetivo ou num
+vizinho forçado (célula acima/abaixo livre cuja vizinha anterior estava
+bloqueada). Um salto vertical para na primeira célula de onde um salto
+horizontal encontra um ponto de salto.
+"""
+
+import heapq
+import time
+
+from zelda_grade import GradeCompacta
+from zelda_motor import somar_estatisticas
+
+
+def custo_uniforme(terrain_costs, walkable):
+    """Custo comum a todos os terrenos de `walkable`, ou None se não houver.
+
+    Sem `walkable` qualquer símbolo é transitável (os desconhecidos custam
+    9999), então o custo nunca é considerado uniforme.
+    """
+    if not walkable:
+        return None
+    custos = {terrain_costs.get(s, 9999) for s in walkable}
+    return custos.pop() if len(custos) == 1 else None
+
+
+def _grade_livre(mapa, walkable, largura):
+    """bytearray plano com 1 nas células transitáveis e uma borda de zeros."""
+    if isinstance(mapa, GradeCompacta):
+        # A cópia com borda do motor já tem o formato certo (borda = CODIGO_BORDA)
+        tabela = bytes(1 if s in walkable else 0 for s in mapa.simbolos).ljust(256, b"\0")
+        return mapa.motor().codigos.translate(tabela)
+
+    livre = bytearray(largura * (len(mapa) + 2))
+    for i, linha in enumerate(mapa):
+        inicio = (i + 1) * largura + 1
+        livre[inicio:inicio + largura - 2] = bytes(cel in walkable for cel in linha)
+    return livre
+
+
+def a_estrela_jps(mapa, start, goal, terrain_costs, walkable, estatisticas=None,
+                  ao_expandir=None):
+    """JPS que retorna (caminho, custo) ou (None, inf), como `a_estrela`.
+
+    O custo é sempre o mesmo de `a_estrela` (o caminho pode ser outro de
+    mesmo custo). Lança ValueError se os terrenos de `walkable` não tiverem
+    todos o mesmo custo. `estatisticas` e `ao_expandir` funcionam como em
+    `a_estrela`, contando apenas os pontos de salto.
+    """
+    passo = custo_uniforme(terrain_costs, walkable)
+    if passo is None:
+        raise ValueError("O JPS exige o mesmo custo para todos os terrenos de walkable.")
+
+    linhas = len(mapa)
+    colunas = len(mapa[0]) if linhas else 0
+    if not (0 <= start[0] < linhas and 0 <= start[1] < colunas
+            and 0 <= goal[0] < linhas and 0 <= goal[1] < colunas):
+        return None, float("inf")
+    if start == goal:
+        return [start], 0
+
+    inicio = time.perf_counter()
+    largura = colunas + 2
+    livre = _grade_livre(mapa, walkable, largura)
+    origem = (start[0] + 1) * largura + start[1] + 1
+    destino = (goal[0] + 1) * largura + goal[1] + 1
+    gx, gy = goal[0] + 1, goal[1] + 1
+
+    def saltar_horizontal(i, d):
+        """Ponto de salto andando `d` (+-1) a partir de i, ou -1."""
+        while True:
+            i += d
+            if not livre[i]:
+                return -1
+            if i == destino:
+                return i
+            if (livre[i - largura] and not livre[i - d - largura]) or (
+                livre[i + largura] and not livre[i - d + largura]
+            ):
+                return i
+
+    def saltar_vertical(i, d):
+        """Ponto de salto andando `d` (+-largura) a partir de i, ou -1."""
+        while True:
+            i += d
+            if not livre[i]:
+                return -1
+            if i == destino or saltar_horizontal(i, 1) >= 0 or saltar_horizontal(i, -1) >= 0:
+                return i
+
+    g = {origem: 0}
+    pai = {origem: -1}
+    fechados = set()
+    open_set = [(0, 0, origem)]
+    expandidos = 0
+    empilhados = 1
+    obsoletos = 0
+    heap_maximo = 1
+    while open_set:
+        _, _, atual = heapq.heappop(open_set)
+        if atual in fechados:
+            obsoletos += 1
+            continue
+        if atual == destino:
+            break
+        fechados.add(atual)
+        expandidos += 1
+        if ao_expandir is not None:
+            x, y = divmod(atual, largura)
+            ao_expandir((x - 1, y - 1))
+
+        # Direções podadas de acordo com o sentido de chegada
+        anterior = pai[atual]
+        if anterior == -1:
+            saltos = [saltar_horizontal(atual, 1), saltar_horizontal(atual, -1),
+                      saltar_vertical(atual, largura), saltar_vertical(atual, -largura)]
+        elif abs(atual - anterior) < largura:
+            d = 1 if atual > anterior else -1
+            saltos = [saltar_horizontal(atual, d)]
+            if livre[atual - largura] and not livre[atual - d - largura]:
+                saltos.append(saltar_vertical(atual, -largura))
+            if livre[atual + largura] and not livre[atual - d + largura]:
+                saltos.append(saltar_vertical(atual, largura))
+        else:
+            d = largura if atual > anterior else -largura
+            saltos = [saltar_vertical(atual, d), saltar_horizontal(atual, 1),
+                      saltar_horizontal(atual, -1)]
+
+        g_atual = g[atual]
+        for salto in saltos:
+            if salto < 0 or salto in fechados:
+                continue
+            distancia = abs(salto - atual)
+            if distancia >= largura:
+                distancia //= largura
+            tentative_g = g_atual + passo * distancia
+            if tentative_g < g.get(salto, float("inf")):
+                g[salto] = tentative_g
+                pai[salto] = atual
+                sx, sy = divmod(salto, largura)
+                h = passo * (abs(sx - gx) + abs(sy - gy))
+                heapq.heappush(open_set, (tentative_g + h, -tentative_g, salto))
+                empilhados += 1
+                if len(open_set) > heap_maximo:
+                    heap_maximo = len(open_set)
+
+    somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                       time.perf_counter() - inicio)
+    if destino not in g:
+        return None, float("inf")
+
+    # Reconstrói as células entre pontos de salto consecutivos
+    caminho = []
+    atual = destino
+    while pai[atual] != -1:
+        anterior = pai[atual]
+        d = 1 if abs(atual - anterior) < largura else largura
+        if atual < anterior:
+            d = -d
+        while atual != anterior:
+            x, y = divmod(atual, largura)
+            caminho.append((x - 1, y - 1))
+            atual -= d
+    caminho.append(start)
+    caminho.reverse()
+    return caminho, g[destino]
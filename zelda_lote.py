@@ -0,0 +1,183 @@
+"""
+Planejamento em lote de muitos cenários de missão do projeto Zelda.
+
+Um cenário é um diretório com `Mapa.txt` e os arquivos `Masmorra <k>.txt`.
+A entrada é um diretório de cenários (cada subdiretório é um cenário), um
+único cenário, ou um manifesto: arquivo texto com um diretório por linha
+(relativo ao manifesto; linhas vazias e começadas por `#` são ignoradas).
+
+Os cenários são planejados num pool de processos e cada resultado é escrito
+como uma linha JSON assim que fica pronto, em qualquer ordem. Os cenários
+são lidos da entrada à medida que há vaga no pool e cada processo carrega
+os mapas do próprio disco, então o uso de memória não cresce com o tamanho
+do lote.
+
+    python zelda_lote.py cenarios/ --trabalhadores 8 --saida resultados.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from zelda_cache import cache_padrao
+from zelda_ordenacao import RESOLVEDORES
+from zelda_pathfinder import carregar_missao, planejar_missao
+
+
+def listar_cenarios(entrada):
+    """Gera os diretórios de cenário de `entrada` (diretório ou manifesto)."""
+    if os.path.isfile(entrada):
+        base = os.path.dirname(entrada)
+        with open(entrada, "r", encoding="utf-8") as f:
+            for linha in f:
+                linha = linha.strip()
+                if linha and not linha.startswith("#"):
+                    yield os.path.join(base, linha)
+    elif os.path.isfile(os.path.join(entrada, "Mapa.txt")):
+        yield entrada
+    elif os.path.isdir(entrada):
+        with os.scandir(entrada) as itens:
+            nomes = sorted(item.name for item in itens if item.is_dir())
+        for nome in nomes:
+            diretorio = os.path.join(entrada, nome)
+            if os.path.isfile(os.path.join(diretorio, "Mapa.txt")):
+                yield diretorio
+    else:
+        raise FileNotFoundError(f"Entrada '{entrada}' não encontrada.")
+
+
+def planejar_cenario(diretorio, modo_ordenacao="auto", usar_cache=False):
+    """Planeja um cenário e retorna o resumo serializável em JSON.
+
+    O resumo tem "cenario", "ordem", "custo_total", "trechos" (custo de cada
+    trecho do mapa principal e de cada masmorra, na ordem percorrida) e
+    "tempos" (em segundos). Se o cenário falhar, tem "erro" no lugar do
+    resultado, no formato "Tipo: mensagem" de qualquer exceção (arquivo
+    ausente, mapa malformado ou falha do planejamento), para um cenário
+    ruim não parar o lote.
+    """
+    inicio = time.perf_counter()
+    resumo = {"cenario": diretorio}
+    try:
+        # Avisos de leitura vão para stderr, para não misturar com o JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            cache = cache_padrao() if usar_cache else None
+            mapa, masmorras = carregar_missao(diretorio, cache=cache)
+            lido = time.perf_counter()
+            resultado = planejar_missao(mapa, masmorras, modo_ordenacao, cache)
+    except Exception as erro:  # pylint: disable=broad-except
+        resumo["erro"] = _descrever_erro(erro)
+        return resumo
+    fim = time.perf_counter()
+
+    if resultado is None:
+        resumo["erro"] = "Nenhum caminho válido encontrado."
+        return resumo
+
+    trechos = []
+    for segmento in resultado["segmentos"]:
+        if segmento["type"] == "main_map":
+            trechos.append({"tipo": "mapa", "custo": segmento["custo"]})
+        else:
+            trechos.append(
+                {"tipo": "masmorra", "id": segmento["id"], "custo": segmento["custo_total"]}
+            )
+    resumo.update(
+        ordem=resultado["ordem"],
+        custo_total=resultado["custo_total"],
+        trechos=trechos,
+        ordenacao=resultado["ordenacao"]["modo"],
+        tempos={
+            "leitura": lido - inicio,
+            "planejamento": fim - lido,
+            "ordenacao": resultado["ordenacao"]["tempo"],
+            "total": fim - inicio,
+        },
+    )
+    return resumo
+
+
+def _descrever_erro(erro):
+    """"Tipo: mensagem" de uma exceção, para o campo "erro" do resumo."""
+    return f"{type(erro).__name__}: {erro}"
+
+
+def planejar_lote(cenarios, trabalhadores=None, pendentes=None, modo_ordenacao="auto",
+                  usar_cache=False):
+    """Gera o resumo de cada cenário assim que ele termina.
+
+    No máximo `pendentes` cenários (padrão: 2 por processo) ficam em
+    andamento ao mesmo tempo; o próximo só é lido de `cenarios` quando um
+    deles termina. Com um único trabalhador, tudo roda no processo atual.
+    Um cenário cujo processo falhar gera um resumo com "erro", e o lote segue.
+    """
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores == 1:
+        for diretorio in cenarios:
+            yield planejar_cenario(diretorio, modo_ordenacao, usar_cache)
+        return
+
+    pendentes = pendentes or 2 * trabalhadores
+    cenarios = iter(cenarios)
+    with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+        # Futuro -> diretório do cenário, para descrever as falhas
+        em_andamento = {}
+        while True:
+            for diretorio in cenarios:
+                futuro = executor.submit(planejar_cenario, diretorio, modo_ordenacao, usar_cache)
+                em_andamento[futuro] = diretorio
+                if len(em_andamento) >= pendentes:
+                    break
+            if not em_andamento:
+                return
+            prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                diretorio = em_andamento.pop(futuro)
+                try:
+                    yield futuro.result()
+                except Exception as erro:  # pylint: disable=broad-except
+                    yield {"cenario": diretorio, "erro": _descrever_erro(erro)}
+
+
+def main(argv=None):
+    """Planeja todos os cenários da entrada e escreve um JSON por linha."""
+    parser = argparse.ArgumentParser(
+        description="Planeja a rota de Link para muitos cenários, com saída JSON Lines."
+    )
+    parser.add_argument("entrada", help="diretório de cenários, um cenário ou um manifesto")
+    parser.add_argument("--saida", help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("--trabalhadores", type=int, default=None,
+                        help="processos do pool (padrão: número de CPUs)")
+    parser.add_argument("--pendentes", type=int, default=None,
+                        help="cenários em andamento ao mesmo tempo (padrão: 2 por processo)")
+    parser.add_argument("--ordenacao", default="auto", choices=["auto", *RESOLVEDORES],
+                        help="resolvedor da ordem das masmorras")
+    parser.add_argument("--cache", action="store_true",
+                        help="usa o cache de trechos em disco")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total = falhas = 0
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    try:
+        for resumo in planejar_lote(listar_cenarios(args.entrada), args.trabalhadores,
+                                    args.pendentes, args.ordenacao, args.cache):
+            saida.write(json.dumps(resumo, ensure_ascii=False) + "\n")
+            saida.flush()
+            total += 1
+            falhas += "erro" in resumo
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    print(f"{total} cenários em {time.perf_counter() - inicio:.2f} s, {falhas} com erro.",
+          file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Motor A* de alto desempenho sobre grades compactas.
+
+O motor trabalha com índices inteiros de célula numa cópia da grade com
+uma borda de células bloqueadas, o que permite usar uma tabela fixa de
+deslocamentos de vizinhos sem testar limites. Os vetores de custo (g) e de
+pai são alocados uma única vez; um contador de geração marca quais entradas
+pertencem à consulta atual, então nada precisa ser limpo entre consultas.
+
+A fila de abertos usa remoção preguiçosa: uma célula que melhora de g é
+inserida de novo e a entrada antiga é descartada quando sai da fila, pois
+a célula já estará fechada. Com o heapq (em C) isso é mais rápido que um
+heap indexado com diminuição de chave escrito em Python.
+"""
+
+import heapq
+import time
+from array import array
+from functools import partial
+
+from zelda_grade import CODIGO_BORDA
+
+# Maior valor do contador de geração antes de zerar os vetores
+_GERACAO_MAXIMA = 2 ** 32 - 1
+
+
+def somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos=0, heap_maximo=0,
+                       tempo=0.0):
+    """Acumula os contadores de uma busca no dicionário `estatisticas`.
+
+    Soma "buscas", "expandidos", "empilhados", "obsoletos" (entradas
+    descartadas ao sair da fila por serem de células já expandidas) e
+    "tempo" (segundos);
+    "heap_maximo" guarda o maior tamanho da fila entre as buscas somadas.
+    """
+    if estatisticas is not None:
+        estatisticas["buscas"] = estatisticas.get("buscas", 0) + 1
+        estatisticas["expandidos"] = estatisticas.get("expandidos", 0) + expandidos
+        estatisticas["empilhados"] = estatisticas.get("empilhados", 0) + empilhados
+        estatisticas["obsoletos"] = estatisticas.get("obsoletos", 0) + obsoletos
+        estatisticas["heap_maximo"] = max(estatisticas.get("heap_maximo", 0), heap_maximo)
+        estatisticas["tempo"] = estatisticas.get("tempo", 0.0) + tempo
+
+
+class FilaBaldes:
+    """Fila de prioridade em baldes para chaves com poucos valores distintos.
+
+    Os custos do jogo são inteiros pequenos (múltiplos de 10), então muitas
+    entradas têm o mesmo f. Cada f distinto ganha um balde (lista) e só os
+    valores de f ficam num heap; inserir e retirar de um balde que já existe
+    não compara nada. Dentro de um balde a última entrada inserida sai
+    primeiro, o que favorece os nós mais profundos.
+
+    As entradas são tuplas cuja primeira posição é a chave, como no heap.
+    """
+
+    def __init__(self):
+        self._baldes = {}
+        self._chaves = []
+        self._tamanho = 0
+
+    def inserir(self, entrada):
+        """Acrescenta `entrada` ao balde da sua chave."""
+        balde = self._baldes.get(entrada[0])
+        if balde is None:
+            self._baldes[entrada[0]] = [entrada]
+            heapq.heappush(self._chaves, entrada[0])
+        else:
+            balde.append(entrada)
+        self._tamanho += 1
+
+    def retirar(self):
+        """Remove e retorna uma entrada de menor chave."""
+        chave = self._chaves[0]
+        balde = self._baldes[chave]
+        entrada = balde.pop()
+        if not balde:
+            del self._baldes[chave]
+            heapq.heappop(self._chaves)
+        self._tamanho -= 1
+        return entrada
+
+    def __len__(self):
+        return self._tamanho
+
+
+def nova_fila(fila="heap"):
+    """Cria a fila de abertos: retorna (fila, inserir, retirar).
+
+    `fila` é "heap" (heapq com remoção preguiçosa) ou "baldes" (`FilaBaldes`).
+    """
+    if fila == "heap":
+        abertos = []
+        return abertos, partial(heapq.heappush, abertos), partial(heapq.heappop, abertos)
+    if fila == "baldes":
+        abertos = FilaBaldes()
+        return abertos, abertos.inserir, abertos.retirar
+    raise ValueError(f"Fila desconhecida: {fila}")
+
+
+class MotorAEstrela:
+    """A* reutilizável para uma `GradeCompacta`.
+
+    Um motor não deve ser usado por duas threads ao mesmo tempo, pois os
+    vetores de trabalho são compartilhados entre as consultas.
+    """
+
+    def __init__(self, grade):
+        """Prepara a grade com borda e os vetores de trabalho."""
+        self.grade = grade
+        self.largura = grade.colunas + 2
+        total = (grade.linhas + 2) * self.largura
+        self.codigos = bytearray([CODIGO_BORDA]) * total
+        for i in range(grade.linhas):
+            origem = i * grade.colunas
+            destino = (i + 1) * self.largura + 1
+            self.codigos[destino:destino + grade.colunas] = grade.codigos[
+                origem:origem + grade.colunas
+            ]
+        self.deslocamentos = (-self.largura, self.largura, -1, 1)
+
+        self.g = array("q", bytes(8 * total))
+        self.pai = array("l", bytes(array("l").itemsize * total))
+        self.geracao = array("L", bytes(array("L").itemsize * total))
+        # Células expandidas: fechado[v] == geração da consulta atual
+        self.fechado = array("L", bytes(array("L").itemsize * total))
+        self.geracao_atual = 0
+
+    def _nova_geracao(self):
+        """Avança o contador de geração, zerando os vetores se ele estourar."""
+        if self.geracao_atual >= _GERACAO_MAXIMA:
+            self.geracao = array("L", bytes(len(self.geracao) * self.geracao.itemsize))
+            self.fechado = array("L", bytes(len(self.fechado) * self.fechado.itemsize))
+            self.geracao_atual = 0
+        self.geracao_atual += 1
+        return self.geracao_atual
+
+    def buscar(self, start, goal, terrain_costs, walkable=None, heuristica=None,
+               estatisticas=None, ao_expandir=None, fila="heap"):
+        """Executa o A* e retorna (caminho, custo) ou (None, inf), como `a_estrela`.
+
+        Sem `heuristica`, usa a Manhattan escalada pelo menor custo entre os
+        símbolos da grade (o `custo_minimo` com `simbolos`, como na matriz),
+        calculada diretamente sobre os índices; com ela, chama
+        `heuristica(pos, goal)` para cada célula empilhada. `estatisticas`,
+        `ao_expandir` e `fila` funcionam como em `a_estrela`.
+        """
+        inicio = time.perf_counter()
+        linhas, colunas = self.grade.linhas, self.grade.colunas
+        if not (0 <= start[0] < linhas and 0 <= start[1] < colunas
+                and 0 <= goal[0] < linhas and 0 <= goal[1] < colunas):
+            return None, float("inf")
+
+        custos = self.grade.tabela_custos(terrain_costs, walkable)
+        fator = min((c for c in custos if c is not None), default=0)
+        codigos = self.codigos
+        largura = self.largura
+        # A nova geração pode trocar os vetores: só depois dela eles viram locais
+        gen = self._nova_geracao()
+        g, pai, geracao, fechado = self.g, self.pai, self.geracao, self.fechado
+
+        origem = (start[0] + 1) * largura + start[1] + 1
+        destino = (goal[0] + 1) * largura + goal[1] + 1
+        gx, gy = goal[0] + 1, goal[1] + 1
+        g[origem] = 0
+        pai[origem] = -1
+        geracao[origem] = gen
+
+        # Entradas (f, -g, célula): empates em f saem pelo maior g
+        open_set, inserir, retirar = nova_fila(fila)
+        inserir((0, 0, origem))
+        expandidos = 0
+        empilhados = 1
+        obsoletos = 0
+        heap_maximo = 1
+        while open_set:
+            _, _, atual = retirar()
+            if fechado[atual] == gen:
+                # Entrada antiga de uma célula já expandida com g menor
+                obsoletos += 1
+                continue
+            if atual == destino:
+                somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos,
+                                   heap_maximo, time.perf_counter() - inicio)
+                caminho = []
+                while atual != -1:
+                    x, y = divmod(atual, largura)
+                    caminho.append((x - 1, y - 1))
+                    atual = pai[atual]
+                caminho.reverse()
+                return caminho, g[destino]
+
+            expandidos += 1
+            fechado[atual] = gen
+            if ao_expandir is not None:
+                x, y = divmod(atual, largura)
+                ao_expandir((x - 1, y - 1))
+            g_atual = g[atual]
+            for desloc in self.deslocamentos:
+                vizinho = atual + desloc
+                cost = custos[codigos[vizinho]]
+                if cost is None or fechado[vizinho] == gen:
+                    continue
+                tentative_g = g_atual + cost
+                if geracao[vizinho] != gen or tentative_g < g[vizinho]:
+                    geracao[vizinho] = gen
+                    g[vizinho] = tentative_g
+                    pai[vizinho] = atual
+                    vx, vy = divmod(vizinho, largura)
+                    if heuristica is None:
+                        h = fator * (abs(vx - gx) + abs(vy - gy))
+                    else:
+                        h = heuristica((vx - 1, vy - 1), goal)
+                    inserir((tentative_g + h, -tentative_g, vizinho))
+                    empilhados += 1
+                    if len(open_set) > heap_maximo:
+                        heap_maximo = len(open_set)
+        somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                           time.perf_counter() - inicio)
+        return None, float("inf")
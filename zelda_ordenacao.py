@@ -0,0 +1,234 @@
+"""
+Resolvedores da ordem de visita das masmorras.
+
+Os resolvedores trabalham sobre uma matriz de custos `custos` de tamanho
+(n+2) x (n+2), em que o nó 0 é a casa do Link, os nós 1..n são as entradas
+das masmorras e o nó n+1 é Lost Woods. O custo de um trecho inviável é
+`float("inf")`. Todos retornam um dicionário com a ordem encontrada (nós
+1..n), o custo dos trechos, o tempo de resolução e os estados expandidos.
+"""
+
+import time
+from itertools import permutations
+
+# Acima deste número de masmorras o Held-Karp (O(2^n * n^2)) fica lento demais
+LIMITE_HELD_KARP = 16
+
+
+def _resultado(modo, ordem, custo, inicio, estados):
+    """Monta o dicionário de resultado comum a todos os resolvedores."""
+    return {
+        "modo": modo,
+        "ordem": list(ordem) if ordem is not None else None,
+        "custo": custo,
+        "tempo": time.perf_counter() - inicio,
+        "estados": estados,
+    }
+
+
+def forca_bruta(custos):
+    """Testa todas as permutações (só é viável para poucas masmorras)."""
+    inicio = time.perf_counter()
+    n = len(custos) - 2
+    melhor_custo = float("inf")
+    melhor_ordem = None
+    estados = 0
+    for ordem in permutations(range(1, n + 1)):
+        estados += 1
+        nos = (0,) + ordem + (n + 1,)
+        custo = sum(custos[a][b] for a, b in zip(nos, nos[1:]))
+        if custo < melhor_custo:
+            melhor_custo = custo
+            melhor_ordem = ordem
+    return _resultado("forca-bruta", melhor_ordem, melhor_custo, inicio, estados)
+
+
+def held_karp(custos):
+    """Programação dinâmica de Held-Karp sobre subconjuntos de masmorras.
+
+    `melhor[mask * n + j]` guarda o menor custo para sair do início, visitar
+    exatamente as masmorras de `mask` e parar na masmorra j.
+    """
+    inicio = time.perf_counter()
+    n = len(custos) - 2
+    fim = n + 1
+    if n == 0:
+        return _resultado("held-karp", [], custos[0][fim], inicio, 0)
+    if n > LIMITE_HELD_KARP:
+        raise ValueError(
+            f"Held-Karp suporta até {LIMITE_HELD_KARP} masmorras (recebeu {n})."
+        )
+
+    inf = float("inf")
+    total = 1 << n
+    melhor = [inf] * (total * n)
+    pai = [-1] * (total * n)
+    for j in range(n):
+        melhor[(1 << j) * n + j] = custos[0][j + 1]
+
+    estados = 0
+    for mask in range(1, total):
+        base = mask * n
+        for j in range(n):
+            custo_j = melhor[base + j]
+            if custo_j == inf:
+                continue
+            estados += 1
+            linha = custos[j + 1]
+            for k in range(n):
+                if mask & (1 << k):
+                    continue
+                novo = custo_j + linha[k + 1]
+                idx = (mask | (1 << k)) * n + k
+                if novo < melhor[idx]:
+                    melhor[idx] = novo
+                    pai[idx] = j
+
+    cheio = total - 1
+    melhor_custo = inf
+    ultimo = -1
+    for j in range(n):
+        custo = melhor[cheio * n + j] + custos[j + 1][fim]
+        if custo < melhor_custo:
+            melhor_custo = custo
+            ultimo = j
+
+    if ultimo < 0:
+        return _resultado("held-karp", None, inf, inicio, estados)
+
+    ordem = []
+    mask = cheio
+    while ultimo >= 0:
+        ordem.append(ultimo + 1)
+        anterior = pai[mask * n + ultimo]
+        mask &= ~(1 << ultimo)
+        ultimo = anterior
+    ordem.reverse()
+    return _resultado("held-karp", ordem, melhor_custo, inicio, estados)
+
+
+def vizinho_mais_proximo(custos, prefixo=()):
+    """Ordem gulosa: a partir do `prefixo`, vai sempre à masmorra mais barata.
+
+    Retorna (ordem, custo); serve de limite superior para o branch-and-bound.
+    """
+    n = len(custos) - 2
+    ordem = list(prefixo)
+    custo = 0
+    no = 0
+    for prox in prefixo:
+        custo += custos[no][prox]
+        no = prox
+    restantes = [v for v in range(1, n + 1) if v not in ordem]
+    while restantes:
+        prox = min(restantes, key=lambda v, a=no: custos[a][v])
+        custo += custos[no][prox]
+        ordem.append(prox)
+        restantes.remove(prox)
+        no = prox
+    return ordem, custo + custos[no][n + 1]
+
+
+def branch_and_bound(custos, prefixo=(), limite_superior=float("inf")):
+    """Busca em profundidade com poda por limite inferior.
+
+    O limite inferior é o maior entre duas somas: a do menor custo de
+    chegada em cada masmorra ainda não visitada e no fim, e a do menor custo
+    de saída do nó atual e de cada masmorra não visitada.
+    A solução inicial vem da heurística do vizinho mais próximo. `prefixo`
+    fixa as primeiras masmorras da ordem (útil para dividir a busca em
+    subárvores) e `limite_superior` permite podar com um custo já conhecido.
+    """
+    inicio = time.perf_counter()
+    n = len(custos) - 2
+    fim = n + 1
+    inf = float("inf")
+
+    menor_chegada = [inf] * (n + 2)
+    for v in range(1, n + 2):
+        menor_chegada[v] = min(
+            (custos[u][v] for u in range(n + 1) if u != v and not (u == 0 and v == fim and n)),
+            default=inf,
+        )
+
+    menor_saida = [inf] * (n + 2)
+    for u in range(n + 1):
+        menor_saida[u] = min(
+            (custos[u][v] for v in range(1, n + 2) if u != v and not (u == 0 and v == fim and n)),
+            default=inf,
+        )
+
+    visitados = [False] * (n + 2)
+    custo_prefixo = 0
+    atual = 0
+    for no in prefixo:
+        custo_prefixo += custos[atual][no]
+        visitados[no] = True
+        atual = no
+
+    melhor = {"custo": limite_superior, "ordem": None}
+
+    # Solução inicial gulosa (vizinho mais próximo) para ter um bom limite cedo
+    guloso, custo_guloso = vizinho_mais_proximo(custos, prefixo)
+    if custo_guloso < melhor["custo"]:
+        melhor["custo"] = custo_guloso
+        melhor["ordem"] = guloso
+
+    faltam = [v for v in range(1, n + 1) if not visitados[v]]
+    chegada_restante = sum(menor_chegada[v] for v in faltam) + menor_chegada[fim]
+    saida_restante = sum(menor_saida[v] for v in faltam)
+    caminho = list(prefixo)
+    estados = 0
+
+    def expandir(no_atual, custo_atual, chegada, saida):
+        nonlocal estados
+        if len(caminho) == n:
+            total = custo_atual + custos[no_atual][fim]
+            if total < melhor["custo"]:
+                melhor["custo"] = total
+                melhor["ordem"] = list(caminho)
+            return
+        filhos = sorted(
+            (v for v in range(1, n + 1) if not visitados[v]),
+            key=lambda v: custos[no_atual][v],
+        )
+        for v in filhos:
+            estados += 1
+            novo_custo = custo_atual + custos[no_atual][v]
+            nova_chegada = chegada - menor_chegada[v]
+            nova_saida = saida - menor_saida[v]
+            limite = max(nova_chegada, menor_saida[v] + nova_saida)
+            if novo_custo + limite >= melhor["custo"]:
+                continue
+            visitados[v] = True
+            caminho.append(v)
+            expandir(v, novo_custo, nova_chegada, nova_saida)
+            caminho.pop()
+            visitados[v] = False
+
+    expandir(atual, custo_prefixo, chegada_restante, saida_restante)
+
+    return _resultado("branch-and-bound", melhor["ordem"], melhor["custo"], inicio, estados)
+
+
+RESOLVEDORES = {
+    "forca-bruta": forca_bruta,
+    "held-karp": held_karp,
+    "branch-and-bound": branch_and_bound,
+}
+
+
+def resolver_ordem(custos, modo="auto"):
+    """Resolve a ordem de visita com o resolvedor escolhido.
+
+    `modo` pode ser "auto", "forca-bruta", "held-karp" ou "branch-and-bound".
+    No modo automático usa Held-Karp até LIMITE_HELD_KARP masmorras e
+    branch-and-bound acima disso.
+    """
+    if modo == "auto":
+        modo = "held-karp" if len(custos) - 2 <= LIMITE_HELD_KARP else "branch-and-bound"
+    try:
+        resolvedor = RESOLVEDORES[modo]
+    except KeyError as exc:
+        raise ValueError(f"Modo de ordenação desconhecido: {modo}") from exc
+    return resolvedor(custos)
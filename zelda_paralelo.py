@@ -0,0 +1,140 @@
+"""
+Planejamento paralelo com processos para o projeto Zelda.
+
+O A* e o Dijkstra são Python puro e ficam presos ao GIL em threads, então
+o paralelismo é feito com um `ProcessPoolExecutor`. Os mapas da missão são
+entregues a cada processo uma única vez, pelo inicializador do pool (com
+`fork` eles são herdados sem nem serem serializados); cada tarefa envia só
+o nome do mapa, as pontas e a tabela de custos.
+
+Criar o pool custa algumas dezenas de milissegundos, então o modo paralelo
+compensa em mapas grandes ou com muitas masmorras, não no 42x42 do jogo.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from zelda_ordenacao import (
+    LIMITE_HELD_KARP,
+    branch_and_bound,
+    resolver_ordem,
+    vizinho_mais_proximo,
+)
+from zelda_pathfinder import (
+    TabelaMasmorras,
+    buscar_destinos,
+    planejar_missao,
+)
+
+# Mapas da missão dentro de cada processo do pool: {"principal": mapa, k: masmorra}
+_MAPAS = {}
+
+
+def _inicializar(mapas):
+    """Guarda os mapas da missão no processo trabalhador."""
+    _MAPAS.clear()
+    _MAPAS.update(mapas)
+
+
+def _buscar(tarefa):
+    """Executa uma busca de uma origem até seus destinos num processo trabalhador."""
+    chave_mapa, origem, destinos, terrain_costs, walkable = tarefa
+    return buscar_destinos(_MAPAS[chave_mapa], origem, destinos, terrain_costs, walkable)
+
+
+def _subarvore(argumentos):
+    """Resolve, num processo trabalhador, as ordens que começam por uma masmorra."""
+    custos, primeiro, limite = argumentos
+    return branch_and_bound(custos, (primeiro,), limite)
+
+
+class PlanejadorParalelo:
+    """Pool de processos com os mapas de uma missão já carregados.
+
+    `trabalhadores` define o número de processos (padrão: número de CPUs).
+    Use como gerenciador de contexto para encerrar o pool ao final:
+
+        with PlanejadorParalelo(mapa, masmorras, trabalhadores=8) as p:
+            resultado = planejar_missao(mapa, masmorras, planejador=p)
+    """
+
+    def __init__(self, mapa, masmorras=None, trabalhadores=None):
+        """Cria o pool e entrega os mapas a cada processo."""
+        mapas = {"principal": mapa}
+        if masmorras:
+            if not hasattr(masmorras, "items"):
+                masmorras = dict(enumerate(masmorras, start=1))
+            mapas.update(masmorras.items())
+        # Mapas disponíveis nos processos, para validar as tarefas antes de enviá-las
+        self.mapas = frozenset(mapas)
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.trabalhadores, initializer=_inicializar, initargs=(mapas,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        """Encerra os processos do pool."""
+        self.executor.shutdown()
+
+    def buscar(self, tarefas):
+        """Executa as buscas em paralelo, na ordem recebida.
+
+        Cada tarefa é (chave_mapa, origem, destinos, terrain_costs, walkable);
+        o resultado de cada uma é um dicionário destino -> (caminho, custo).
+        Lança ValueError, antes de enviar qualquer tarefa, se alguma usar um
+        mapa que não foi entregue ao pool (masmorras fora do construtor).
+        """
+        tarefas = list(tarefas)
+        faltando = sorted({str(t[0]) for t in tarefas if t[0] not in self.mapas})
+        if faltando:
+            raise ValueError(
+                f"Mapas {', '.join(faltando)} não foram entregues ao planejador paralelo; "
+                f"passe as masmorras ao criar o PlanejadorParalelo."
+            )
+        return list(self.executor.map(_buscar, tarefas))
+
+    def resolver_ordem(self, custos, modo="auto"):
+        """Resolve a ordem de visita, dividindo o branch-and-bound em subárvores.
+
+        Held-Karp e força bruta rodam no processo atual. No branch-and-bound,
+        cada processo explora as ordens que começam por uma masmorra, todas
+        podadas pelo custo da solução gulosa.
+        """
+        n = len(custos) - 2
+        if modo == "auto":
+            modo = "held-karp" if n <= LIMITE_HELD_KARP else "branch-and-bound"
+        if modo != "branch-and-bound" or n < 2:
+            return resolver_ordem(custos, modo)
+
+        inicio = time.perf_counter()
+        melhor_ordem, melhor_custo = vizinho_mais_proximo(custos)
+        estados = 0
+        argumentos = [(custos, primeiro, melhor_custo) for primeiro in range(1, n + 1)]
+        for resultado in self.executor.map(_subarvore, argumentos):
+            estados += resultado["estados"]
+            if resultado["ordem"] is not None and resultado["custo"] < melhor_custo:
+                melhor_custo = resultado["custo"]
+                melhor_ordem = resultado["ordem"]
+        return {
+            "modo": "branch-and-bound-paralelo",
+            "ordem": melhor_ordem,
+            "custo": melhor_custo,
+            "tempo": time.perf_counter() - inicio,
+            "estados": estados,
+        }
+
+
+def planejar_missao_paralela(mapa, masmorras, trabalhadores=None, modo_ordenacao="auto",
+                             cache=None):
+    """`planejar_missao` com as buscas e a ordenação num pool de processos."""
+    # Masmorras já resolvidas (TabelaMasmorras) não precisam ir para o pool
+    resolvidas = isinstance(masmorras, TabelaMasmorras)
+    with PlanejadorParalelo(mapa, None if resolvidas else masmorras, trabalhadores) as p:
+        return planejar_missao(mapa, masmorras, modo_ordenacao, cache, planejador=p)
@@ -4,8 +4,19 @@ Contém leitura de mapas, implementação A* e utilitários para
 exibir caminhos no terminal.
 """
 
+import argparse
 import heapq
-from itertools import permutations
+import os
+import re
+import time
+from collections.abc import Mapping
+
+from zelda_cache import cache_padrao, chave_trecho, impressao_digital
+from zelda_grade import GradeCompacta
+from zelda_indice import ComIndice, indexar_linha
+from zelda_jps import a_estrela_jps, custo_uniforme
+from zelda_motor import nova_fila, somar_estatisticas
+from zelda_ordenacao import resolver_ordem
 
 # Custos dos terrenos
 TERRAIN_COSTS = {
@@ -22,30 +33,125 @@ TERRAIN_COSTS = {
 }
 
 MASMORRA_COST = 10  # Caminho claro dentro das masmorras
+CUSTOS_MASMORRA = {"CC": MASMORRA_COST, "P": MASMORRA_COST, "E": MASMORRA_COST}
+WALKABLE_MASMORRA = {"CC", "P", "E"}
 
+# Entradas das masmorras no mapa principal (M1, M2, ...) e seus arquivos
+RE_ENTRADA_MASMORRA = re.compile(r"M(\d+)")
+RE_ARQUIVO_MASMORRA = re.compile(r"Masmorra (\d+)\.txt")
 
-def ler_mapa(path, size):
-    """Lê um mapa de arquivo texto e retorna uma matriz (lista de listas).
+# Mapas texto a partir deste tamanho (bytes) são lidos como `GradeCompacta`
+LIMITE_GRADE = 1 << 20
 
-    Cada linha do arquivo deve conter células separadas por vírgula.
-    Retorna uma matriz vazia de tamanho `size` em caso de arquivo não encontrado.
+
+class Mapa(ComIndice, list):
+    """Matriz de símbolos (lista de listas) com o índice de marcadores.
+
+    `indice` mapeia cada marcador (L, LW, M1, E, P, ...) para suas posições
+    e é montado junto com a leitura; `posicao(simbolo)` consulta o índice e
+    falha com uma mensagem clara se o marcador faltar ou estiver repetido.
+    O índice não acompanha alterações feitas diretamente nas células; para
+    alterar o mapa já carregado, use `editar`.
     """
-    mapa = []
+
+    def __init__(self, linhas=(), nome="mapa", indice=None):
+        """Cria o mapa; sem `indice`, ele é montado percorrendo as linhas."""
+        super().__init__(linhas)
+        self.nome = nome
+        if indice is None:
+            indice = {}
+            for i, linha in enumerate(self):
+                indexar_linha(indice, i, linha)
+        self.indice = indice
+
+    def _trocar(self, i, j, simbolo):
+        antigo = self[i][j]
+        self[i][j] = simbolo
+        return antigo
+
+
+def com_indice(mapa):
+    """Retorna `mapa` se ele já tem índice de marcadores, ou um `Mapa` indexado."""
+    return mapa if isinstance(mapa, ComIndice) else Mapa(mapa)
+
+
+def ler_mapa(path, size=None):
+    """Lê um mapa de arquivo texto e retorna um `Mapa` (lista de listas indexada).
+
+    Cada linha do arquivo deve conter células separadas por vírgula, e todas
+    as linhas o mesmo número de células que a primeira; com `size`, o mapa
+    precisa ser `size` x `size`. Lança ValueError com o nome do arquivo se
+    não for. Retorna uma matriz vazia de tamanho `size` em caso de arquivo
+    não encontrado.
+    """
+    linhas = []
+    indice = {}
     try:
         with open(path, "r", encoding="utf-8") as f:
             for linha in f:
                 linha = linha.strip()
                 if linha:
-                    mapa.append([x.strip() for x in linha.split(",")])
+                    celulas = [x.strip() for x in linha.split(",")]
+                    if linhas and len(celulas) != len(linhas[0]):
+                        raise ValueError(
+                            f"Mapa {path}, linha {len(linhas) + 1}: {len(celulas)} colunas; "
+                            f"esperado {len(linhas[0])}."
+                        )
+                    indexar_linha(indice, len(linhas), celulas)
+                    linhas.append(celulas)
     except FileNotFoundError:
         print(f"Aviso: Arquivo '{path}' não encontrado. O programa pode falhar.")
         # Retorna uma "matriz vazia" com o número de linhas esperado,
         # para manter compatibilidade com quem chama ler_mapa.
-        return [[] for _ in range(size)]
+        return Mapa([[] for _ in range(size or 0)], path, {})
 
-    if len(mapa) != size and len(mapa) > 0:
+    if size is not None and linhas and (len(linhas) != size or len(linhas[0]) != size):
         raise ValueError(f"Mapa {path} não tem tamanho {size}x{size}")
-    return mapa
+    return Mapa(linhas, path, indice)
+
+
+def carregar_mapa(path, size=None, compacto=None):
+    """Lê um mapa com `ler_mapa` ou, se ele for grande, como `GradeCompacta`.
+
+    Com `compacto` None, arquivos de pelo menos LIMITE_GRADE bytes são lidos
+    por `zelda_carregador.carregar_grade`, que mantém um binário mapeado ao
+    lado do texto; True ou False força uma das leituras.
+    """
+    if compacto is None:
+        try:
+            compacto = os.path.getsize(path) >= LIMITE_GRADE
+        except OSError:
+            compacto = False
+    if not compacto:
+        return ler_mapa(path, size)
+    # Importado aqui: zelda_carregador depende deste módulo
+    from zelda_carregador import carregar_grade  # pylint: disable=import-outside-toplevel
+
+    return carregar_grade(path, size, size)
+
+
+def descobrir_masmorras(diretorio="."):
+    """Procura os arquivos `Masmorra <k>.txt` e retorna {k: caminho} ordenado por k."""
+    encontradas = {}
+    for nome in os.listdir(diretorio):
+        achou = RE_ARQUIVO_MASMORRA.fullmatch(nome)
+        if achou:
+            encontradas[int(achou.group(1))] = os.path.join(diretorio, nome)
+    return dict(sorted(encontradas.items()))
+
+
+def carregar_missao(diretorio=".", tamanho_mapa=None, tamanho_masmorra=None, cache=None,
+                    compacto=None):
+    """Lê o `Mapa.txt` e todas as masmorras encontradas em `diretorio`.
+
+    Retorna (mapa, tabela), em que `tabela` é uma `TabelaMasmorras` com as
+    masmorras já resolvidas. `compacto` escolhe a leitura dos arquivos,
+    como em `carregar_mapa`.
+    """
+    mapa = carregar_mapa(os.path.join(diretorio, "Mapa.txt"), tamanho_mapa, compacto)
+    tabela = TabelaMasmorras(diretorio, tamanho_masmorra, cache, compacto)
+    tabela.atualizar()
+    return mapa, tabela
 
 
 def print_mapa(mapa, caminho=None):
@@ -68,35 +174,147 @@ def heuristica(a, b):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 
-def vizinhos(pos, size):
-    """Retorna vizinhos válidos (vertical/horizontal) para uma posição."""
+def custo_minimo(terrain_costs, walkable=None, simbolos=None):
+    """Menor custo de passo possível com `terrain_costs` restrito a `walkable`.
+
+    Sem `walkable`, qualquer símbolo pode ser pisado e os símbolos sem custo
+    definido custam 9999, então o mínimo é o menor valor da tabela. Com
+    `simbolos` (os símbolos do mapa, ver `simbolos_presentes`), só eles
+    contam, e o mínimo pode ser bem maior: num mapa só de água, é 180.
+    """
+    if simbolos is not None:
+        return min(
+            (terrain_costs.get(s, 9999) for s in simbolos if not walkable or s in walkable),
+            default=0,
+        )
+    if walkable:
+        return min(terrain_costs.get(s, 9999) for s in walkable)
+    return min(terrain_costs.values(), default=9999)
+
+
+def simbolos_presentes(mapa):
+    """Símbolos usados nas células de `mapa` (matriz ou `GradeCompacta`)."""
+    if isinstance(mapa, GradeCompacta):
+        return mapa.simbolos
+    return set().union(*mapa)
+
+
+def heuristica_escalada(terrain_costs, walkable=None, simbolos=None):
+    """Manhattan multiplicada pelo menor custo de passo (continua admissível).
+
+    Como cada passo custa pelo menos `custo_minimo`, a estimativa nunca passa
+    do custo real e é cerca de 10x mais informativa que a Manhattan pura com
+    os custos do jogo. `simbolos` restringe o mínimo aos símbolos do mapa.
+    """
+    fator = custo_minimo(terrain_costs, walkable, simbolos)
+
+    def h(a, b):
+        return fator * (abs(a[0] - b[0]) + abs(a[1] - b[1]))
+
+    h.fator = fator
+    return h
+
+
+def vizinhos(pos, size, colunas=None):
+    """Retorna vizinhos válidos (vertical/horizontal) para uma posição.
+
+    O mapa tem `size` linhas e `colunas` colunas (`size`, se omitido).
+    """
+    if colunas is None:
+        colunas = size
     x, y = pos
     for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
         nx, ny = x + dx, y + dy
-        if 0 <= nx < size and 0 <= ny < size:
+        if 0 <= nx < size and 0 <= ny < colunas:
             yield (nx, ny)
 
 
-def a_estrela(mapa, start, goal, terrain_costs, walkable=None):
-    """Busca A* genérica que retorna (caminho, custo) ou (None, inf)."""
+def a_estrela(mapa, start, goal, terrain_costs, walkable=None, heuristica=None,
+              estatisticas=None, ao_expandir=None, fila="heap", modo="padrao"):
+    """Busca A* genérica que retorna (caminho, custo) ou (None, inf).
+
+    `mapa` pode ser uma matriz de símbolos ou uma `GradeCompacta`; neste
+    caso a busca é feita pelo motor de índices planos da grade
+    (`zelda_motor.MotorAEstrela`), que retorna o mesmo resultado.
+
+    `heuristica(pos, goal)` substitui a estimativa padrão, que é a
+    `heuristica_escalada` para `terrain_costs`/`walkable` com o menor custo
+    entre os símbolos do mapa (o mesmo fator na matriz e na grade). Se
+    `estatisticas` for um dicionário, os contadores da busca são somados
+    nele (ver `zelda_motor.somar_estatisticas`). `ao_expandir(pos)` é
+    chamada para cada célula expandida, na ordem de expansão; por exemplo,
+    `ao_expandir=fechados.append` registra o conjunto fechado numa lista.
+
+    Entre células com o mesmo f, a de maior g (mais perto do objetivo) é
+    expandida primeiro; entradas antigas de células já expandidas são
+    descartadas ao sair da fila. `fila` escolhe a fila de abertos: "heap"
+    ou "baldes" (ver `zelda_motor.nova_fila`).
+
+    `modo` escolhe o algoritmo: "padrao" (o A* descrito acima), "jps"
+    (`zelda_jps.a_estrela_jps`, só para custo uniforme em `walkable`),
+    "bidirecional" (`zelda_bidirecional.a_estrela_bidirecional`) ou "auto".
+    Sem `heuristica` própria, "auto" usa o JPS quando os custos de
+    `walkable` são uniformes e, nos outros casos, o bidirecional numa
+    matriz e o motor da grade numa `GradeCompacta`. O custo é o mesmo em
+    todos os modos, mas o caminho pode ser outro de mesmo custo;
+    `heuristica` e `fila` só valem no modo "padrao".
+    """
+    if modo == "auto":
+        if heuristica is not None:
+            modo = "padrao"
+        elif custo_uniforme(terrain_costs, walkable) is not None:
+            modo = "jps"
+        else:
+            modo = "padrao" if isinstance(mapa, GradeCompacta) else "bidirecional"
+    if modo == "jps":
+        return a_estrela_jps(mapa, start, goal, terrain_costs, walkable, estatisticas,
+                             ao_expandir)
+    if modo == "bidirecional":
+        # Importado aqui: zelda_bidirecional depende deste módulo
+        from zelda_bidirecional import (  # pylint: disable=import-outside-toplevel
+            a_estrela_bidirecional,
+        )
+
+        return a_estrela_bidirecional(mapa, start, goal, terrain_costs, walkable,
+                                      estatisticas, ao_expandir)
+    if modo != "padrao":
+        raise ValueError(f"Modo de busca desconhecido: {modo}")
+
+    if isinstance(mapa, GradeCompacta):
+        return mapa.motor().buscar(
+            start, goal, terrain_costs, walkable, heuristica, estatisticas, ao_expandir, fila
+        )
+
     size = len(mapa)
+    colunas = len(mapa[0]) if size else 0
     if not (
         0 <= start[0] < size
-        and 0 <= start[1] < len(mapa[0])
+        and 0 <= start[1] < colunas
         and 0 <= goal[0] < size
-        and 0 <= goal[1] < len(mapa[0])
+        and 0 <= goal[1] < colunas
     ):
         return None, float("inf")
 
-    open_set = []
-    heapq.heappush(open_set, (0, start))
+    inicio = time.perf_counter()
+    h = heuristica or heuristica_escalada(terrain_costs, walkable, simbolos_presentes(mapa))
+    open_set, inserir, retirar = nova_fila(fila)
+    inserir((h(start, goal), 0, start))
     came_from = {}
     g_score = {start: 0}
-    f_score = {start: heuristica(start, goal)}
+    fechados = set()
+    expandidos = 0
+    empilhados = 1
+    obsoletos = 0
+    heap_maximo = 1
 
     while open_set:
-        _, current = heapq.heappop(open_set)
+        _, _, current = retirar()
+        if current in fechados:
+            obsoletos += 1
+            continue
         if current == goal:
+            somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                               time.perf_counter() - inicio)
             caminho = [current]
             while current in came_from:
                 current = came_from[current]
@@ -104,144 +322,526 @@ def a_estrela(mapa, start, goal, terrain_costs, walkable=None):
             caminho.reverse()
             return caminho, g_score.get(goal, 0)
 
-        for neighbor in vizinhos(current, size):
+        expandidos += 1
+        fechados.add(current)
+        if ao_expandir is not None:
+            ao_expandir(current)
+        g_atual = g_score[current]
+        for neighbor in vizinhos(current, size, colunas):
+            if neighbor in fechados:
+                continue
             x, y = neighbor
             cel = mapa[x][y]
             if walkable and cel not in walkable:
                 continue
             cost = terrain_costs.get(cel, 9999)
-            tentative_g = g_score.get(current, float("inf")) + cost
+            tentative_g = g_atual + cost
             if tentative_g < g_score.get(neighbor, float("inf")):
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristica(neighbor, goal)
-                heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                inserir((tentative_g + h(neighbor, goal), -tentative_g, neighbor))
+                empilhados += 1
+                if len(open_set) > heap_maximo:
+                    heap_maximo = len(open_set)
+    somar_estatisticas(estatisticas, expandidos, empilhados, obsoletos, heap_maximo,
+                       time.perf_counter() - inicio)
     return None, float("inf")
 
 
-def main():
-    """Exemplo de execução: lê mapas e calcula melhor ordem de masmorras."""
-    # Lê mapas
-    mapa = ler_mapa("Mapa.txt", 42)
-    masmorra1 = ler_mapa("Masmorra 1.txt", 28)
-    masmorra2 = ler_mapa("Masmorra 2.txt", 28)
-    masmorra3 = ler_mapa("Masmorra 3.txt", 28)
+def a_estrela_em_cache(mapa, start, goal, terrain_costs, walkable=None, cache=None,
+                       modo="padrao"):
+    """`a_estrela` memoizado: consulta `cache` antes de buscar e guarda o resultado.
 
-    if not all(m for m in [mapa, masmorra1, masmorra2, masmorra3]):
-        print("Erro: Um ou mais arquivos de mapa não puderam ser lidos. Encerrando.")
-        return
+    A chave usa o conteúdo do mapa (não a identidade do objeto), então um
+    mapa recarregado sem alterações continua acertando o cache. Sem `cache`,
+    equivale a chamar `a_estrela` diretamente. `modo` é repassado para
+    `a_estrela`.
+    """
+    if cache is None:
+        return a_estrela(mapa, start, goal, terrain_costs, walkable, modo=modo)
+    chave = chave_trecho(impressao_digital(mapa), start, goal, terrain_costs, walkable)
+    trecho = cache.obter(chave)
+    if trecho is None:
+        trecho = a_estrela(mapa, start, goal, terrain_costs, walkable, modo=modo)
+        cache.guardar(chave, trecho)
+    return trecho
+
+
+def _dijkstra(mapa, start, terrain_costs, walkable=None, pendentes=None):
+    """Busca de custo uniforme a partir de `start`.
+
+    Para quando todas as posições de `pendentes` tiverem custo definitivo
+    (ou expande o mapa inteiro, se `pendentes` for None). Retorna
+    (g_score, came_from, fechados).
+    """
+    linhas = len(mapa)
+    colunas = len(mapa[0]) if linhas else 0
+    open_set = [(0, start)]
+    came_from = {}
+    g_score = {start: 0}
+    fechados = set()
 
-    # Localiza pontos de interesse no mapa
-    start = next((i, j) for i, r in enumerate(mapa) for j, c in enumerate(r) if c == "L")
-    lost_woods = next(
-        (i, j) for i, r in enumerate(mapa) for j, c in enumerate(r) if c == "LW"
+    while open_set and (pendentes is None or pendentes):
+        g, current = heapq.heappop(open_set)
+        if current in fechados:
+            continue
+        fechados.add(current)
+        if pendentes is not None:
+            pendentes.discard(current)
+
+        x, y = current
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if not (0 <= nx < linhas and 0 <= ny < colunas):
+                continue
+            cel = mapa[nx][ny]
+            if walkable and cel not in walkable:
+                continue
+            tentative_g = g + terrain_costs.get(cel, 9999)
+            neighbor = (nx, ny)
+            if tentative_g < g_score.get(neighbor, float("inf")):
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g
+                heapq.heappush(open_set, (tentative_g, neighbor))
+    return g_score, came_from, fechados
+
+
+def custos_a_partir_de(mapa, start, terrain_costs, walkable=None):
+    """Custo mínimo de `start` até cada célula alcançável: {posição: custo}."""
+    linhas = len(mapa)
+    if not (0 <= start[0] < linhas and 0 <= start[1] < len(mapa[0])):
+        return {}
+    g_score, _, fechados = _dijkstra(mapa, start, terrain_costs, walkable)
+    return {pos: g_score[pos] for pos in fechados}
+
+
+def dijkstra_multiplos_alvos(mapa, start, alvos, terrain_costs, walkable=None):
+    """Busca de custo uniforme de `start` até todos os `alvos` de uma só vez.
+
+    Expande a partir da origem até que todos os alvos tenham custo definitivo
+    e reconstrói cada caminho a partir do mesmo `came_from`. Retorna um
+    dicionário alvo -> (caminho, custo), com (None, inf) para alvos
+    inalcançáveis ou fora do mapa.
+    """
+    linhas = len(mapa)
+    colunas = len(mapa[0]) if linhas else 0
+    resultado = {alvo: (None, float("inf")) for alvo in alvos}
+    if not (0 <= start[0] < linhas and 0 <= start[1] < colunas):
+        return resultado
+
+    pendentes = {
+        alvo for alvo in resultado if 0 <= alvo[0] < linhas and 0 <= alvo[1] < colunas
+    }
+    g_score, came_from, fechados = _dijkstra(
+        mapa, start, terrain_costs, walkable, pendentes
     )
-    try:
-        entrada1 = next((i, j) for i, r in enumerate(mapa) for j, c in enumerate(r) if c == "M1")
-        entrada2 = next((i, j) for i, r in enumerate(mapa) for j, c in enumerate(r) if c == "M2")
-        entrada3 = next((i, j) for i, r in enumerate(mapa) for j, c in enumerate(r) if c == "M3")
-        entradas = [entrada1, entrada2, entrada3]
-    except StopIteration as exc:
-        raise ValueError("Erro: Não foi possível encontrar as entradas M1, M2 e M3 "
-                         "no Mapa.txt.") from exc
-
-    if start is None or lost_woods is None or len(entradas) < 3:
-        raise ValueError("Não foi possível encontrar todos os pontos de interesse no mapa.")
-
-    pingentes = [
-        next((i, j) for i, r in enumerate(m) for j, c in enumerate(r) if c == "P")
-        for m in [masmorra1, masmorra2, masmorra3]
+
+    for alvo in resultado:
+        if alvo not in fechados:
+            continue
+        caminho = [alvo]
+        current = alvo
+        while current in came_from:
+            current = came_from[current]
+            caminho.append(current)
+        caminho.reverse()
+        resultado[alvo] = (caminho, g_score[alvo])
+    return resultado
+
+
+def buscar_destinos(mapa, start, destinos, terrain_costs, walkable=None):
+    """Trechos de `start` até cada um dos `destinos`: {destino: (caminho, custo)}.
+
+    Um único destino é buscado com `a_estrela` no modo "auto" (JPS ou A*
+    bidirecional); vários, com uma só `dijkstra_multiplos_alvos`.
+    """
+    if len(destinos) == 1:
+        return {destinos[0]: a_estrela(mapa, start, destinos[0], terrain_costs, walkable,
+                                       modo="auto")}
+    return dijkstra_multiplos_alvos(mapa, start, destinos, terrain_costs, walkable)
+
+
+def calcular_matriz_trechos(mapa, inicio, entradas, fim, terrain_costs, walkable=None,
+                            cache=None, planejador=None):
+    """Calcula uma única vez o caminho e o custo de cada trecho da missão.
+
+    Os pontos são numerados como 0 = `inicio`, 1..n = `entradas` e
+    n+1 = `fim`. Retorna um dicionário (origem, destino) -> (caminho, custo)
+    com todos os trechos que alguma ordem de visita pode usar. Cada origem
+    faz uma única busca até todos os seus destinos (n+1 buscas no total,
+    ver `buscar_destinos`).
+    Com um `cache` (ver `zelda_cache`), só os trechos ausentes são buscados.
+    Com um `planejador` (ver `zelda_paralelo`), as buscas de cada origem
+    rodam em paralelo nos processos dele, sobre o mapa "principal".
+    """
+    pontos = [inicio] + list(entradas) + [fim]
+    n = len(entradas)
+    matriz = {}
+    impressao = impressao_digital(mapa) if cache is not None else None
+    pendentes = []
+
+    for origem in range(n + 1):
+        destinos = [d for d in range(1, n + 2) if d != origem]
+        if origem == 0 and n > 0:
+            destinos.remove(n + 1)
+
+        chaves = {}
+        if cache is not None:
+            for destino in destinos:
+                chaves[destino] = chave_trecho(
+                    impressao, pontos[origem], pontos[destino], terrain_costs, walkable
+                )
+                trecho = cache.obter(chaves[destino])
+                if trecho is not None:
+                    matriz[(origem, destino)] = trecho
+            destinos = [d for d in destinos if (origem, d) not in matriz]
+
+        if destinos:
+            pendentes.append((origem, destinos, chaves))
+
+    tarefas = [
+        (pontos[origem], [pontos[d] for d in destinos]) for origem, destinos, _ in pendentes
     ]
+    if planejador is not None:
+        resultados = planejador.buscar(
+            [("principal", o, ds, terrain_costs, walkable) for o, ds in tarefas]
+        )
+    else:
+        resultados = [
+            buscar_destinos(mapa, o, ds, terrain_costs, walkable) for o, ds in tarefas
+        ]
+
+    for (origem, destinos, chaves), trechos in zip(pendentes, resultados):
+        for destino in destinos:
+            matriz[(origem, destino)] = trechos[pontos[destino]]
+            if cache is not None:
+                cache.guardar(chaves[destino], trechos[pontos[destino]])
+    return matriz
+
+
+def resolver_masmorra(masmorra, cache=None):
+    """Resolve uma masmorra: caminho Entrada -> Pingente e o retorno à entrada.
+
+    Retorna um dicionário com o caminho de ida, o de volta (o inverso da
+    ida) e o custo total, ou None se o pingente for inalcançável. Como o
+    terreno transitável da masmorra tem custo uniforme, a busca usa o JPS.
+    """
+    entrada, pingente = pontos_masmorra(masmorra)
+    trecho = a_estrela_em_cache(
+        masmorra, entrada, pingente, CUSTOS_MASMORRA, WALKABLE_MASMORRA, cache, modo="auto"
+    )
+    return montar_solucao_masmorra(masmorra, entrada, pingente, trecho)
+
+
+def pontos_masmorra(masmorra):
+    """Posições (entrada, pingente) de uma masmorra."""
+    indexada = com_indice(masmorra)
+    return indexada.posicao("E"), indexada.posicao("P")
+
+
+def montar_solucao_masmorra(masmorra, entrada, pingente, trecho):
+    """Monta a solução de `resolver_masmorra` a partir do trecho Entrada -> Pingente."""
+    caminho_ida, custo_ida = trecho
+    if caminho_ida is None:
+        return None
+
+    caminho_volta = caminho_ida[::-1]
+    custo_volta = custo_ida
+    return {
+        "mapa": masmorra,
+        "entrada": entrada,
+        "pingente": pingente,
+        "custo_total": custo_ida + custo_volta,
+        "caminho_ida": caminho_ida,
+        "caminho_volta": caminho_volta,
+    }
+
+
+class TabelaMasmorras(Mapping):
+    """Tabela com a solução de cada masmorra, calculada uma vez ao carregar.
+
+    Funciona como um dicionário {k: masmorra} somente leitura e guarda, para
+    cada masmorra, o resultado de `resolver_masmorra` (entrada, pingente,
+    custo de ida e volta e caminhos), que pode ser compartilhado por quantos
+    planejamentos forem necessários. `atualizar` relê só os arquivos
+    `Masmorra <k>.txt` que mudaram desde a última leitura, e só resolve de
+    novo as masmorras cujo conteúdo realmente mudou. Os arquivos são lidos
+    por `carregar_mapa`, com o `compacto` da tabela.
+    """
 
-    menor_custo = float("inf")
-    melhor_ordem = None
-    melhor_caminho = None
-    melhor_percurso_masmorras = []
-
-    for ordem in permutations([0, 1, 2]):
-        pos = start
-        total_caminho = []
-        total_custo = 0
-        percurso_masmorras_atual = []
-
-        mapas_ordenados = [masmorra1, masmorra2, masmorra3]
-        entradas_ordem = [entradas[i] for i in ordem]
-        pingentes_ordem = [pingentes[i] for i in ordem]
-        masmorras_ordem = [mapas_ordenados[i] for i in ordem]
-
-        caminho_inviavel = False
-        for idx in range(3):
-            caminho, custo = a_estrela(mapa, pos, entradas_ordem[idx], TERRAIN_COSTS)
-            if caminho is None:
-                caminho_inviavel = True
-                break
-
-            # Usando a lógica original de concatenação de listas que é mais segura
-            if total_caminho:
-                total_caminho += caminho[1:]
-            else:
-                total_caminho += caminho
-            total_custo += custo
-
-            entrada_masmorra = next(
-                (ii, jj)
-                for ii, rr in enumerate(masmorras_ordem[idx])
-                for jj, cc in enumerate(rr)
-                if cc == "E"
+    def __init__(self, diretorio=None, tamanho=None, cache=None, compacto=None):
+        """Cria uma tabela vazia, opcionalmente ligada a um diretório de mapas."""
+        self.diretorio = diretorio
+        self.tamanho = tamanho
+        self.cache = cache
+        self.compacto = compacto
+        self._masmorras = {}
+        self._solucoes = {}
+        self._arquivos = {}
+        self._assinaturas = {}
+
+    @classmethod
+    def de_mapas(cls, masmorras, cache=None, planejador=None):
+        """Monta a tabela a partir de um dicionário {k: masmorra} ou de uma lista.
+
+        Com um `planejador` (ver `zelda_paralelo`), as masmorras que não
+        estão no cache são resolvidas em paralelo.
+        """
+        if not isinstance(masmorras, Mapping):
+            masmorras = dict(enumerate(masmorras, start=1))
+        tabela = cls(cache=cache)
+        if planejador is None:
+            for k, masmorra in masmorras.items():
+                tabela.definir(k, masmorra)
+            return tabela
+
+        tarefas = []
+        for k, masmorra in masmorras.items():
+            tabela._masmorras[k] = masmorra
+            tabela._solucoes[k] = None
+            if not masmorra:
+                continue
+            entrada, pingente = pontos_masmorra(masmorra)
+            chave = None
+            if cache is not None:
+                chave = chave_trecho(
+                    impressao_digital(masmorra), entrada, pingente,
+                    CUSTOS_MASMORRA, WALKABLE_MASMORRA,
+                )
+                trecho = cache.obter(chave)
+                if trecho is not None:
+                    tabela._solucoes[k] = montar_solucao_masmorra(
+                        masmorra, entrada, pingente, trecho
+                    )
+                    continue
+            tarefas.append((k, entrada, pingente, chave))
+
+        resultados = planejador.buscar(
+            [(k, e, [p], CUSTOS_MASMORRA, WALKABLE_MASMORRA) for k, e, p, _ in tarefas]
+        )
+        for (k, entrada, pingente, chave), trechos in zip(tarefas, resultados):
+            if cache is not None:
+                cache.guardar(chave, trechos[pingente])
+            tabela._solucoes[k] = montar_solucao_masmorra(
+                masmorras[k], entrada, pingente, trechos[pingente]
             )
+        return tabela
+
+    def __getitem__(self, k):
+        return self._masmorras[k]
+
+    def __iter__(self):
+        return iter(sorted(self._masmorras))
+
+    def __len__(self):
+        return len(self._masmorras)
+
+    def solucao(self, k):
+        """Solução da masmorra k (ver `resolver_masmorra`), ou None se inviável."""
+        return self._solucoes[k]
+
+    def definir(self, k, masmorra):
+        """Guarda a masmorra k e resolve seu trecho Entrada -> Pingente."""
+        anterior = self._masmorras.get(k)
+        if anterior is not None and impressao_digital(anterior) == impressao_digital(masmorra):
+            self._masmorras[k] = masmorra
+            return False
+        self._masmorras[k] = masmorra
+        self._solucoes[k] = resolver_masmorra(masmorra, self.cache) if masmorra else None
+        return True
+
+    def remover(self, k):
+        """Tira a masmorra k da tabela."""
+        self._masmorras.pop(k, None)
+        self._solucoes.pop(k, None)
+        self._arquivos.pop(k, None)
+        self._assinaturas.pop(k, None)
+
+    def recarregar(self, k):
+        """Relê o arquivo da masmorra k e a resolve de novo se o conteúdo mudou.
+
+        Retorna True se a solução da masmorra foi recalculada.
+        """
+        arquivo = self._arquivos.get(k)
+        if arquivo is None:
+            arquivo = os.path.join(self.diretorio or ".", f"Masmorra {k}.txt")
+        try:
+            estado = os.stat(arquivo)
+        except FileNotFoundError:
+            estado = None
+        self._arquivos[k] = arquivo
+        self._assinaturas[k] = (estado.st_mtime_ns, estado.st_size) if estado else None
+        return self.definir(k, carregar_mapa(arquivo, self.tamanho, self.compacto))
+
+    def atualizar(self):
+        """Sincroniza a tabela com os arquivos do diretório.
+
+        Masmorras novas são lidas e resolvidas, as removidas saem da tabela e
+        as existentes só são relidas se a data ou o tamanho do arquivo
+        mudaram. Retorna a lista de ids cuja solução mudou.
+        """
+        arquivos = descobrir_masmorras(self.diretorio or ".")
+        alteradas = []
+        for k in [k for k in self._arquivos if k not in arquivos]:
+            self.remover(k)
+            alteradas.append(k)
+        for k, arquivo in arquivos.items():
+            estado = os.stat(arquivo)
+            if self._assinaturas.get(k) == (estado.st_mtime_ns, estado.st_size):
+                continue
+            self._arquivos[k] = arquivo
+            if self.recarregar(k):
+                alteradas.append(k)
+        return sorted(alteradas)
 
-            custos_dungeon = {"CC": MASMORRA_COST, "P": MASMORRA_COST, "E": MASMORRA_COST}
-            walkable_dungeon = {"CC", "P", "E"}
 
-            caminho_m, custo_m = a_estrela(
-                masmorras_ordem[idx],
-                entrada_masmorra,
-                pingentes_ordem[idx],
-                custos_dungeon,
-                walkable_dungeon,
-            )
-            if caminho_m is None:
-                caminho_inviavel = True
-                break
+def custos_mapa_principal(ids):
+    """Custos do mapa principal com as entradas `M<k>` das masmorras `ids`.
+
+    Entradas além de M1-M3 custam o mesmo que uma entrada genérica (MA).
+    """
+    return {**{f"M{k}": TERRAIN_COSTS["MA"] for k in ids}, **TERRAIN_COSTS}
+
+
+def planejar_missao(mapa, masmorras, modo_ordenacao="auto", cache=None, planejador=None):
+    """Calcula a ordem de masmorras de menor custo para a missão completa.
+
+    `masmorras` é uma `TabelaMasmorras`, um dicionário {k: masmorra} ou uma
+    lista (numerada a partir de 1); a masmorra k é acessada pela entrada
+    `M<k>` do mapa. Com uma `TabelaMasmorras`, as masmorras já resolvidas
+    são reaproveitadas sem nova busca.
+    Cada trecho do mapa principal e cada masmorra são resolvidos uma única
+    vez; a ordem é escolhida sobre a matriz de custos resultante pelo
+    resolvedor `modo_ordenacao` (ver `zelda_ordenacao.resolver_ordem`).
+    Com um `cache` de trechos (ver `zelda_cache`), trechos já conhecidos
+    não são buscados de novo. Com um `planejador` (ver `zelda_paralelo`), as
+    buscas e, em problemas grandes, a ordenação rodam em vários processos.
+
+    Retorna None se nenhuma ordem for viável, ou um dicionário com
+    "custo_total", "ordem" (ids das masmorras), "segmentos" (trechos do mapa
+    principal, com seu "custo", e das masmorras, na ordem) e "ordenacao"
+    (modo, tempo e estados expandidos pelo resolvedor).
+    """
+    if not isinstance(masmorras, TabelaMasmorras):
+        masmorras = TabelaMasmorras.de_mapas(masmorras, cache, planejador)
+    ids = sorted(masmorras)
+
+    # Localiza pontos de interesse pelo índice do mapa
+    indexado = com_indice(mapa)
+    start = indexado.posicao("L")
+    lost_woods = indexado.posicao("LW")
+    posicoes_entradas = indexado.marcadores(RE_ENTRADA_MASMORRA)
+    faltando = [f"M{k}" for k in ids if k not in posicoes_entradas]
+    if faltando:
+        raise ValueError(f"Erro: Não foi possível encontrar as entradas {', '.join(faltando)} "
+                         "no Mapa.txt.")
+    entradas = [posicoes_entradas[k] for k in ids]
+
+    solucoes = [masmorras.solucao(k) for k in ids]
+    if any(s is None for s in solucoes):
+        return None
+
+    custos_mapa = custos_mapa_principal(ids)
+    matriz = calcular_matriz_trechos(
+        mapa, start, entradas, lost_woods, custos_mapa, cache=cache, planejador=planejador
+    )
+    return montar_missao(ids, solucoes, matriz, modo_ordenacao, planejador)
 
-            caminho_m2 = caminho_m[::-1]
-            custo_m2 = custo_m
 
-            total_custo += custo_m + custo_m2
+def montar_missao(ids, solucoes, matriz, modo_ordenacao="auto", planejador=None):
+    """Escolhe a ordem e monta o resultado de `planejar_missao`.
 
-            percurso_masmorras_atual.append(
+    `solucoes[i]` é a solução da masmorra `ids[i]` e `matriz` tem os trechos
+    do mapa principal, como em `calcular_matriz_trechos`.
+    """
+    n = len(ids)
+    custos = [[float("inf")] * (n + 2) for _ in range(n + 2)]
+    for (a, b), (_, custo) in matriz.items():
+        custos[a][b] = custo
+
+    if planejador is not None:
+        ordenacao = planejador.resolver_ordem(custos, modo_ordenacao)
+    else:
+        ordenacao = resolver_ordem(custos, modo_ordenacao)
+    if ordenacao["ordem"] is None or ordenacao["custo"] == float("inf"):
+        return None
+
+    segmentos = []
+    nos = [0] + ordenacao["ordem"] + [n + 1]
+    for passo, (a, b) in enumerate(zip(nos, nos[1:])):
+        caminho = matriz[(a, b)][0]
+        segmentos.append(
+            {
+                "type": "main_map",
+                "custo": custos[a][b],
+                "path": caminho if passo == 0 else caminho[1:],
+            }
+        )
+        if b <= n:
+            solucao = solucoes[b - 1]
+            segmentos.append(
                 {
-                    "id": ordem[idx] + 1,
-                    "mapa": masmorras_ordem[idx],
-                    "custo_total": custo_m + custo_m2,
-                    "caminho_ida": caminho_m,
-                    "caminho_volta": caminho_m2,
+                    "type": "dungeon",
+                    "id": ids[b - 1],
+                    **solucao,
+                    "path": solucao["caminho_ida"] + solucao["caminho_volta"][1:],
                 }
             )
-            pos = entradas_ordem[idx]
 
-        if caminho_inviavel:
-            continue
+    return {
+        "custo_total": ordenacao["custo"] + sum(s["custo_total"] for s in solucoes),
+        "ordem": [ids[no - 1] for no in ordenacao["ordem"]],
+        "segmentos": segmentos,
+        "ordenacao": {k: ordenacao[k] for k in ("modo", "tempo", "estados")},
+    }
 
-        caminho, custo = a_estrela(mapa, pos, lost_woods, TERRAIN_COSTS)
-        if caminho is None:
-            continue
 
-        total_caminho += caminho[1:]
-        total_custo += custo
+def main(argv=None):
+    """Exemplo de execução: lê mapas e calcula melhor ordem de masmorras."""
+    parser = argparse.ArgumentParser(description="Calcula a melhor rota de Link.")
+    parser.add_argument(
+        "--trabalhadores", type=int, default=1,
+        help="processos para as buscas e a ordenação (1 = sem paralelismo)",
+    )
+    args = parser.parse_args(argv)
+
+    # Lê o mapa principal e resolve uma vez cada masmorra do diretório
+    cache = cache_padrao()
+    mapa, masmorras = carregar_missao(cache=cache)
+
+    if not mapa or not masmorras or not all(masmorras.values()):
+        print("Erro: Um ou mais arquivos de mapa não puderam ser lidos. Encerrando.")
+        return
+
+    if args.trabalhadores > 1:
+        # Importado aqui: zelda_paralelo depende deste módulo
+        from zelda_paralelo import PlanejadorParalelo  # pylint: disable=import-outside-toplevel
+
+        with PlanejadorParalelo(mapa, trabalhadores=args.trabalhadores) as planejador:
+            resultado = planejar_missao(mapa, masmorras, cache=cache, planejador=planejador)
+    else:
+        resultado = planejar_missao(mapa, masmorras, cache=cache)
+    if resultado is None:
+        print("Nenhum caminho válido encontrado.")
+        return
 
-        if total_custo < menor_custo:
-            menor_custo = total_custo
-            melhor_ordem = ordem
-            melhor_caminho = total_caminho
-            melhor_percurso_masmorras = percurso_masmorras_atual
+    melhor_caminho = []
+    for segmento in resultado["segmentos"]:
+        if segmento["type"] == "main_map":
+            melhor_caminho += segmento["path"]
+    melhor_percurso_masmorras = [s for s in resultado["segmentos"] if s["type"] == "dungeon"]
 
     # Exibe resultado
     print("=" * 40)
     print("         RESULTADO DA BUSCA")
     print("=" * 40)
-    print(f"Melhor ordem de masmorras: {[x+1 for x in melhor_ordem]}")
-    print(f"Custo total da jornada: {menor_custo}")
+    print(f"Melhor ordem de masmorras: {resultado['ordem']}")
+    print(f"Custo total da jornada: {resultado['custo_total']}")
+    ordenacao = resultado["ordenacao"]
+    print(f"Ordenação: {ordenacao['modo']} ({ordenacao['estados']} estados, "
+          f"{ordenacao['tempo'] * 1000:.2f} ms)")
+    uso_cache = cache.estatisticas()
+    print(f"Cache de trechos: {uso_cache['acertos']} acertos em memória, "
+          f"{uso_cache['acertos_proximo']} em disco, {uso_cache['faltas']} faltas")
     print("\nCaminho percorrido (mapa principal):")
     print_mapa(mapa, melhor_caminho)
 
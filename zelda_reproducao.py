@@ -0,0 +1,73 @@
+"""
+Relógio da animação do percurso de Link.
+
+`Reproducao` converte tempo decorrido em passos do percurso. A interface
+chama `avancar` a cada quadro com o tempo desde o quadro anterior e
+desenha só até o passo retornado. Em velocidades altas, um quadro cobre
+vários passos; os intermediários não ganham quadro próprio. Assim o
+trabalho por quadro acompanha a velocidade, não o tamanho do percurso. O
+módulo não depende do Tk.
+"""
+
+from bisect import bisect_right
+
+# Maior intervalo entre dois quadros levado em conta (segundos): se a
+# interface travar, a animação não dá um salto ao voltar
+ATRASO_MAXIMO = 0.25
+
+
+class Reproducao:
+    """Posição da animação ao longo dos segmentos de um percurso.
+
+    Os passos vão de 0 a `total` - 1 e seguem, em ordem, o "path" de cada
+    segmento; `inicios[s]` é o primeiro passo do segmento s. `velocidade`
+    é dada em passos por segundo e pode mudar durante a animação.
+    """
+
+    def __init__(self, segmentos, velocidade=25.0):
+        """Prepara a reprodução parada no primeiro passo."""
+        self.segmentos = segmentos
+        self.inicios = []
+        total = 0
+        for segmento in segmentos:
+            self.inicios.append(total)
+            total += len(segmento["path"])
+        self.total = total
+        self.velocidade = velocidade
+        self._posicao = 0.0
+
+    @property
+    def passo(self):
+        """Passo atual."""
+        return min(int(self._posicao), self.total - 1)
+
+    @property
+    def terminou(self):
+        """True quando o último passo já foi alcançado."""
+        return self._posicao >= self.total - 1
+
+    def avancar(self, decorrido):
+        """Avança `decorrido` segundos na velocidade atual e retorna o passo."""
+        self._posicao = min(
+            self._posicao + min(decorrido, ATRASO_MAXIMO) * self.velocidade,
+            self.total - 1,
+        )
+        return self.passo
+
+    def ir_para(self, passo):
+        """Salta para `passo` (limitado ao percurso) e retorna o passo."""
+        self._posicao = float(max(0, min(passo, self.total - 1)))
+        return self.passo
+
+    def segmento(self, passo):
+        """Índice do segmento que contém `passo`."""
+        return bisect_right(self.inicios, passo) - 1
+
+    def limites(self, indice):
+        """(primeiro passo, passo seguinte ao último) do segmento `indice`."""
+        return self.inicios[indice], self.inicios[indice] + len(self.segmentos[indice]["path"])
+
+    def posicao(self, passo):
+        """(índice do segmento, célula) do passo."""
+        indice = self.segmento(passo)
+        return indice, self.segmentos[indice]["path"][passo - self.inicios[indice]]